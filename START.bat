@@ -15,6 +15,11 @@ start "BioSync Backend" cmd /k "node server.js"
 
 timeout /t 3 /nobreak >nul
 
+echo.
+echo Starting Sync Scheduler...
+cd /d "%~dp0"
+start "BioSync Scheduler" cmd /k "python -m biosync.scheduler --daemon"
+
 echo.
 echo Starting Frontend...
 cd /d "%~dp0"
@@ -38,6 +43,7 @@ echo Press any key to stop all servers...
 pause >nul
 
 taskkill /F /IM node.exe 2>nul
+taskkill /FI "WINDOWTITLE eq BioSync Scheduler*" /T /F 2>nul
 echo.
 echo Servers stopped.
 pause
@@ -0,0 +1,127 @@
+"""
+🧪 Fake ZKTeco device for load tests
+===================================
+Drop-in stand-in for ``zk.ZK``: same connect() / read_sizes() / get_users() /
+get_attendance() / disconnect() surface, with configurable record count and
+latency. Latency is spent in ``time.sleep`` (like real socket I/O, it releases
+the GIL). Open sessions are counted so tests can check how many concurrent
+sessions the proxy opens against the device.
+
+    reader.zk = FakeZK(records=20000, latency=3.0)
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class _User:
+    def __init__(self, user_id, name):
+        self.uid = int(user_id)
+        self.user_id = user_id
+        self.name = name
+        self.privilege = 0
+        self.password = ''
+        self.group_id = ''
+        self.card = 0
+
+
+class _Attendance:
+    def __init__(self, user_id, timestamp, status, punch):
+        self.uid = 0
+        self.user_id = user_id
+        self.timestamp = timestamp
+        self.status = status
+        self.punch = punch
+
+
+def generate_attendance(records, users, start=datetime(2026, 1, 1)):
+    """Two punches per employee per day (≈07:00 in, ≈16:00 out), oldest first."""
+    logs = []
+    day = 0
+    while len(logs) < records:
+        base = start + timedelta(days=day)
+        for punch_in in (True, False):
+            for i in range(users):
+                if len(logs) >= records:
+                    break
+                offset = (i * 37) % 90
+                if punch_in:
+                    timestamp = base + timedelta(hours=7, minutes=offset - 30, seconds=i % 60)
+                    logs.append(_Attendance(str(i + 1), timestamp, 15, 0))
+                else:
+                    timestamp = base + timedelta(hours=16, minutes=offset, seconds=i % 60)
+                    logs.append(_Attendance(str(i + 1), timestamp, 1, 1))
+        day += 1
+    return logs
+
+
+class FakeZK:
+    def __init__(self, records=10000, users=70, latency=0.0, connect_latency=0.0):
+        self.records = records
+        self.user_count = users
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self._lock = threading.Lock()
+        self._attendance = None
+        self.open_sessions = 0
+        self.max_sessions = 0
+        self.total_sessions = 0
+        self.attendance_pulls = 0
+        self.user_pulls = 0
+
+    def connect(self):
+        time.sleep(self.connect_latency)
+        with self._lock:
+            self.open_sessions += 1
+            self.total_sessions += 1
+            self.max_sessions = max(self.max_sessions, self.open_sessions)
+        return _FakeConnection(self)
+
+    def _attendance_logs(self):
+        with self._lock:
+            if self._attendance is None:
+                self._attendance = generate_attendance(self.records, self.user_count)
+            return list(self._attendance)
+
+    def stats(self):
+        return {
+            'openSessions': self.open_sessions,
+            'maxConcurrentSessions': self.max_sessions,
+            'totalSessions': self.total_sessions,
+            'attendancePulls': self.attendance_pulls,
+            'userPulls': self.user_pulls
+        }
+
+
+class _FakeConnection:
+    def __init__(self, device):
+        self.device = device
+        self.users = device.user_count
+        self.fingers = device.user_count
+        self.cards = 0
+        self.faces = 0
+        self.records = device.records
+        self._open = True
+
+    def read_sizes(self):
+        return True
+
+    def get_users(self):
+        self.device.user_pulls += 1
+        return [_User(str(i + 1), f"Employee {i + 1}") for i in range(self.device.user_count)]
+
+    def get_attendance(self):
+        self.device.attendance_pulls += 1
+        time.sleep(self.device.latency)
+        return self.device._attendance_logs()
+
+    def enable_device(self):
+        return True
+
+    def disconnect(self):
+        if self._open:
+            self._open = False
+            with self.device._lock:
+                self.device.open_sessions -= 1
+        return True
@@ -0,0 +1,175 @@
+"""
+📈 Health-check latency during a full device pull
+================================================
+Runs the proxy in-process against a fake ZK device (fake_zk.py) and polls
+/api/health from many concurrent clients, first while idle and then while a
+slow /api/sync device download is running. Reports p50/p95/p99 for both
+phases and fails (exit code 1) if the p99 during the pull rises by more than
+``--max-p99-increase-ms`` over idle.
+
+    python loadtest.py                       # ASGI server (proxy_asgi.py)
+    python loadtest.py --server flask        # threaded Flask app, for comparison
+    python loadtest.py --records 50000 --device-latency 10 --clients 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from fake_zk import FakeZK
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        'count': len(samples),
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'max_ms': max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def setup_proxy(args):
+    """Imports the proxy with an isolated cache/punch log and the fake device plugged in."""
+    import proxy_server
+    scratch = tempfile.mkdtemp()
+    proxy_server.directory.path = os.path.join(scratch, 'user_directory.json')
+    proxy_server.punch_log.path = os.path.join(scratch, 'punches.bin')
+    device = FakeZK(records=args.records, users=args.users, latency=args.device_latency)
+    proxy_server.reader.zk = device
+    proxy_server.reader.conn = None
+    return proxy_server, device
+
+
+# ─── ASGI driver (in-process, same event loop as the server) ───────
+
+async def asgi_get(app, path, query=b''):
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query, 'headers': []}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]['status']
+
+
+async def asgi_run(args):
+    import proxy_asgi
+    app = proxy_asgi.app
+    results = {'idle': [], 'sync': []}
+    errors = 0
+    phase = 'idle'
+    stop = asyncio.Event()
+
+    async def poller():
+        nonlocal errors
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            status = await asgi_get(app, '/api/health')
+            results[phase].append(time.perf_counter() - t0)
+            if status != 200:
+                errors += 1
+            await asyncio.sleep(args.interval)
+
+    pollers = [asyncio.create_task(poller()) for _ in range(args.clients)]
+    await asyncio.sleep(args.idle_seconds)
+    phase = 'sync'
+    t0 = time.perf_counter()
+    sync_status = await asgi_get(app, '/api/sync')
+    sync_seconds = time.perf_counter() - t0
+    stop.set()
+    await asyncio.gather(*pollers)
+    return results, errors, sync_status, sync_seconds
+
+
+# ─── Flask driver (threads + test client) ──────────────────────────
+
+def flask_run(args, proxy_server):
+    app = proxy_server.app
+    results = {'idle': [], 'sync': []}
+    errors = [0]
+    phase = ['idle']
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def poller():
+        client = app.test_client()
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            status = client.get('/api/health').status_code
+            elapsed = time.perf_counter() - t0
+            with lock:
+                results[phase[0]].append(elapsed)
+                if status != 200:
+                    errors[0] += 1
+            time.sleep(args.interval)
+
+    threads = [threading.Thread(target=poller, daemon=True) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.idle_seconds)
+    phase[0] = 'sync'
+    t0 = time.perf_counter()
+    sync_status = app.test_client().get('/api/sync').status_code
+    sync_seconds = time.perf_counter() - t0
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return results, errors[0], sync_status, sync_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('asgi', 'flask'), default='asgi')
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=70)
+    parser.add_argument('--device-latency', type=float, default=3.0, help='seconds spent in get_attendance')
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.05, help='pause between polls per client')
+    parser.add_argument('--idle-seconds', type=float, default=2.0)
+    parser.add_argument('--max-p99-increase-ms', type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    proxy_server, device = setup_proxy(args)
+    if args.server == 'asgi':
+        results, errors, sync_status, sync_seconds = asyncio.run(asgi_run(args))
+    else:
+        results, errors, sync_status, sync_seconds = flask_run(args, proxy_server)
+
+    idle = summarize(results['idle'])
+    during = summarize(results['sync'])
+    increase = during['p99_ms'] - idle['p99_ms']
+
+    print("\n" + "="*60)
+    print(f"📈 /api/health latency ({args.server}, {args.clients} clients)")
+    print("="*60)
+    print(f"Device pull: {sync_seconds:.2f}s, status {sync_status}, {args.records} records")
+    for label, stats in (('idle', idle), ('during pull', during)):
+        print(f"  {label:<12} n={stats['count']:<6} p50={stats['p50_ms']:.2f}ms "
+              f"p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms max={stats['max_ms']:.2f}ms")
+    print(f"Errors: {errors}   Device sessions (max concurrent): {device.max_sessions}")
+    print(f"p99 increase during pull: {increase:.2f}ms (limit {args.max_p99_increase_ms:.0f}ms)")
+
+    ok = errors == 0 and sync_status == 200 and increase <= args.max_p99_increase_ms
+    print("✅ PASS" if ok else "❌ FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
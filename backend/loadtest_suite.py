@@ -0,0 +1,380 @@
+"""
+📊 Proxy load-test suite
+========================
+Runs the proxy in-process against the fake ZK device (fake_zk.py) and drives
+it with N concurrent clients, one scenario after another:
+
+    health    BackendManager-style /api/health polling
+    queries   dashboard reads: /api/records (per employee and punch-log day
+              ranges), /api/reports/monthly, /api/employees, /api/employees/search
+    sync      kiosks all pressing "Sync": concurrent /api/sync
+    mixed     all of the above at once (weights in SCENARIOS)
+
+Per endpoint it reports requests, throughput, p50/p95/p99 and error rate; per
+scenario the device sessions opened, the most open at once and the attendance
+downloads. Each scenario runs --runs times and reports the median of every
+figure (the worst for errors and sessions): a single p99 of the threaded Flask
+app swings 2-3x between identical runs.
+
+The results are compared with loadtest_baseline.json (per server): a p99
+above baseline * (1 + --tolerance) + --slack-ms, throughput below
+baseline / (1 + --tolerance) or a higher error rate fails the run (exit
+code 1). Real regressions are far larger than that - with the result cache
+off, report p99s grow 10-40x. The baseline is only compared when it was
+recorded with the same settings; record one per machine with
+--update-baseline.
+
+More than one device session open at once always fails, baseline or not
+(the proxies guarantee one session at a time; a second one is a leaked or
+racing connection), and is never recorded as a baseline.
+
+    python loadtest_suite.py                                  # ASGI, every scenario
+    python loadtest_suite.py --server flask --scenario sync
+    python loadtest_suite.py --records 100000 --device-latency 5 --clients 50 --json capacity.json
+    python loadtest_suite.py --no-result-cache                # reports recomputed on every request
+    python loadtest_suite.py --update-baseline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+from loadtest import asgi_get, percentile, setup_proxy
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'loadtest_baseline.json')
+
+# scenario -> {request group: weight}
+SCENARIOS = {
+    'health': {'health': 1},
+    'queries': {'records': 3, 'records_range': 2, 'monthly': 2, 'employees': 1, 'search': 2},
+    'sync': {'sync': 1},
+    'mixed': {'health': 4, 'records': 2, 'records_range': 1, 'monthly': 2, 'employees': 1, 'search': 2,
+              'sync': 1},
+}
+SEARCH_QUERIES = ['employee 1', 'emp', '12', 'employe 7', 'x']
+
+
+def request_groups(snapshot, users):
+    """Request group -> [(path, query)] over the data of the warm-up sync."""
+    days = sorted({r['timestamp'][:10] for r in snapshot['records']})
+    months = sorted({day[:7] for day in days})
+    return {
+        'health': [('/api/health', '')],
+        'sync': [('/api/sync', '')],
+        'records': [('/api/records', f'employeeId={i}') for i in range(1, users + 1)],
+        'records_range': [('/api/records', f'from={day}&to={day}') for day in days[-14:]],
+        'monthly': [('/api/reports/monthly', f'month={month}') for month in months] + [('/api/reports/monthly', '')],
+        'employees': [('/api/employees', '')],
+        'search': [('/api/employees/search', f'q={q}&limit=10') for q in SEARCH_QUERIES],
+    }
+
+
+class Recorder:
+    """Latencies and errors per request group, from any number of clients."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def add(self, group, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(group, []).append(seconds)
+            if not ok:
+                self.errors[group] = self.errors.get(group, 0) + 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for group, samples in sorted(self.latencies.items()):
+            endpoints[group] = {
+                'requests': len(samples),
+                'rps': len(samples) / elapsed,
+                'p50_ms': percentile(samples, 50) * 1000,
+                'p95_ms': percentile(samples, 95) * 1000,
+                'p99_ms': percentile(samples, 99) * 1000,
+                'errorRate': self.errors.get(group, 0) / len(samples),
+            }
+        return endpoints
+
+
+def _picker(weights, groups, seed):
+    rnd = random.Random(seed)
+    names = list(weights)
+    cum_weights = list(itertools.accumulate(weights[name] for name in names))
+
+    def pick():
+        group = rnd.choices(names, cum_weights=cum_weights)[0]
+        path, query = rnd.choice(groups[group])
+        return group, path, query
+    return pick
+
+
+# ─── Drivers ───────────────────────────────────────────────────────
+
+async def asgi_scenario(app, weights, groups, args):
+    recorder = Recorder()
+    deadline = time.perf_counter() + args.duration
+
+    async def client(seed):
+        pick = _picker(weights, groups, seed)
+        while time.perf_counter() < deadline:
+            group, path, query = pick()
+            t0 = time.perf_counter()
+            try:
+                ok = await asgi_get(app, path, query.encode('utf-8')) == 200
+            except Exception:
+                ok = False
+            recorder.add(group, time.perf_counter() - t0, ok)
+            await asyncio.sleep(args.think)  # also yields: in-process requests never block on I/O
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(seed) for seed in range(args.clients)))
+    return recorder, time.perf_counter() - t0
+
+
+def flask_scenario(app, weights, groups, args):
+    recorder = Recorder()
+    deadline = time.perf_counter() + args.duration
+
+    def client(seed):
+        http = app.test_client()
+        pick = _picker(weights, groups, seed)
+        while time.perf_counter() < deadline:
+            group, path, query = pick()
+            t0 = time.perf_counter()
+            try:
+                ok = http.get(path, query_string=query).status_code == 200
+            except Exception:
+                ok = False
+            recorder.add(group, time.perf_counter() - t0, ok)
+            time.sleep(args.think)
+
+    threads = [threading.Thread(target=client, args=(seed,), daemon=True) for seed in range(args.clients)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - t0
+
+
+def _result(recorder, elapsed, device, before):
+    sessions, pulls = before
+    return {
+        'seconds': elapsed,
+        'endpoints': recorder.summary(elapsed),
+        'device': {
+            'sessions': device.total_sessions - sessions,
+            'maxConcurrent': device.max_sessions,
+            'attendancePulls': device.attendance_pulls - pulls,
+        },
+    }
+
+
+def _median_result(runs):
+    """Scenario runs -> one result: median figures, worst errors and device sessions."""
+    endpoints = {}
+    for group in runs[0]['endpoints']:
+        stats = [run['endpoints'][group] for run in runs if group in run['endpoints']]
+        endpoints[group] = {key: statistics.median(s[key] for s in stats) for key in stats[0]}
+        endpoints[group]['errorRate'] = max(s['errorRate'] for s in stats)
+    return {
+        'seconds': statistics.median(run['seconds'] for run in runs),
+        'endpoints': endpoints,
+        'device': {key: max(run['device'][key] for run in runs) for key in runs[0]['device']},
+    }
+
+
+def _device_mark(device):
+    device.max_sessions = device.open_sessions  # max concurrent sessions from here on
+    return device.total_sessions, device.attendance_pulls
+
+
+def run_suite(args, proxy_server, device, out=None):
+    """Warm-up sync, then every scenario in args.scenario; returns {scenario: result}."""
+    results = {}
+    out = out or sys.stdout
+
+    if args.server == 'asgi':
+        import proxy_asgi
+
+        async def run_all():
+            if await asgi_get(proxy_asgi.app, '/api/sync') != 200:
+                raise RuntimeError('warm-up /api/sync failed')
+            groups = request_groups(proxy_server.current_snapshot(), args.users)
+            for name in args.scenario:
+                runs = []
+                for _ in range(args.runs):
+                    before = _device_mark(device)
+                    recorder, elapsed = await asgi_scenario(proxy_asgi.app, SCENARIOS[name], groups, args)
+                    runs.append(_result(recorder, elapsed, device, before))
+                results[name] = _median_result(runs)
+                print_scenario(name, results[name], args, out)
+        asyncio.run(run_all())
+        return results
+
+    if proxy_server.app.test_client().get('/api/sync').status_code != 200:
+        raise RuntimeError('warm-up /api/sync failed')
+    groups = request_groups(proxy_server.current_snapshot(), args.users)
+    for name in args.scenario:
+        runs = []
+        for _ in range(args.runs):
+            before = _device_mark(device)
+            recorder, elapsed = flask_scenario(proxy_server.app, SCENARIOS[name], groups, args)
+            runs.append(_result(recorder, elapsed, device, before))
+        results[name] = _median_result(runs)
+        print_scenario(name, results[name], args, out)
+    return results
+
+
+# ─── Reporting and baseline ────────────────────────────────────────
+
+def print_scenario(name, result, args, out=None):
+    lines = [
+        f"\n━━ {name} ({args.server}, {args.clients} clients, {result['seconds']:.1f}s, "
+        f"median of {args.runs}) ━━",
+        f"  {'endpoint':<15}{'requests':>9}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>9}",
+    ]
+    for group, stats in result['endpoints'].items():
+        lines.append(f"  {group:<15}{stats['requests']:>9}{stats['rps']:>10.1f}{stats['p50_ms']:>9.2f}"
+                     f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['errorRate']:>8.1%}")
+    device = result['device']
+    lines.append(f"  device: {device['sessions']} sessions (max {device['maxConcurrent']} at once), "
+                 f"{device['attendancePulls']} attendance downloads")
+    print('\n'.join(lines), file=out, flush=True)
+
+
+def settings(args):
+    """What the numbers depend on; a baseline only applies to the same settings."""
+    return {
+        'records': args.records, 'users': args.users, 'deviceLatency': args.device_latency,
+        'connectLatency': args.connect_latency, 'clients': args.clients, 'duration': args.duration,
+        'think': args.think, 'runs': args.runs, 'resultCache': not args.no_result_cache,
+    }
+
+
+MAX_DEVICE_SESSIONS = 1
+
+
+def session_failures(results):
+    """Scenarios that had more than MAX_DEVICE_SESSIONS device sessions open at once, as messages."""
+    return [f"{name}: {result['device']['maxConcurrent']} concurrent device sessions "
+            f"(at most {MAX_DEVICE_SESSIONS} allowed)"
+            for name, result in results.items() if result['device']['maxConcurrent'] > MAX_DEVICE_SESSIONS]
+
+
+def compare(results, baseline, tolerance, slack_ms):
+    """Regressions of ``results`` against one server's baseline scenarios, as messages."""
+    failures = session_failures(results)
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for group, stats in result['endpoints'].items():
+            ref = base['endpoints'].get(group)
+            if ref is None:
+                continue
+            limit = ref['p99_ms'] * (1 + tolerance) + slack_ms
+            if stats['p99_ms'] > limit:
+                failures.append(f"{name}/{group}: p99 {stats['p99_ms']:.2f}ms > {limit:.2f}ms "
+                                f"(baseline {ref['p99_ms']:.2f}ms)")
+            floor = ref['rps'] / (1 + tolerance)
+            if stats['rps'] < floor:
+                failures.append(f"{name}/{group}: {stats['rps']:.1f} req/s < {floor:.1f} "
+                                f"(baseline {ref['rps']:.1f})")
+            if stats['errorRate'] > ref['errorRate']:
+                failures.append(f"{name}/{group}: error rate {stats['errorRate']:.2%} "
+                                f"(baseline {ref['errorRate']:.2%})")
+    return failures
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('asgi', 'flask'), default='asgi')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help='repeatable (default: all)')
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=70)
+    parser.add_argument('--device-latency', type=float, default=0.5, help='seconds spent in get_attendance')
+    parser.add_argument('--connect-latency', type=float, default=0.05, help='seconds spent in connect')
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per scenario run')
+    parser.add_argument('--runs', type=int, default=3, help='runs per scenario (medians are reported)')
+    parser.add_argument('--think', type=float, default=0.0, help='pause between requests per client')
+    parser.add_argument('--no-result-cache', action='store_true', help='recompute reports on every request')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help='allowed relative change: 1.0 = p99 up to 2x, throughput down to 1/2')
+    parser.add_argument('--slack-ms', type=float, default=5.0, help='allowed absolute p99 increase')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--verbose', action='store_true', help="show the proxy's own output")
+    args = parser.parse_args(argv)
+    args.scenario = args.scenario or list(SCENARIOS)
+
+    proxy_server, device = setup_proxy(args)
+    device.connect_latency = args.connect_latency
+    if args.no_result_cache:
+        proxy_server.result_cache.max_bytes = 0
+
+    out = sys.stdout
+    with contextlib.redirect_stdout(out if args.verbose else open(os.devnull, 'w', encoding='utf-8')):
+        results = run_suite(args, proxy_server, device, out)
+    report = {'server': args.server, 'settings': settings(args), 'scenarios': results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    baselines = load_baseline(args.baseline)
+    print("\n" + "="*60)
+    if args.update_baseline:
+        failures = session_failures(results)
+        if failures:
+            for failure in failures:
+                print(f"❌ {failure}")
+            print(f"❌ FAIL: baseline for {args.server} not written")
+            return 1
+        current = baselines.get(args.server, {})
+        scenarios = {**(current.get('scenarios', {}) if current.get('settings') == report['settings'] else {}),
+                     **results}
+        baselines[args.server] = {'settings': report['settings'], 'scenarios': scenarios}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"📌 Baseline for {args.server} written to {args.baseline}")
+        return 0
+
+    baseline = baselines.get(args.server)
+    if baseline is None or baseline['settings'] != report['settings']:
+        print(f"⚠️  No {args.server} baseline with these settings in {args.baseline} - nothing compared "
+              f"(record one with --update-baseline)")
+        failures = session_failures(results)
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1 if failures else 0
+
+    failures = compare(results, baseline['scenarios'], args.tolerance, args.slack_ms)
+    for failure in failures:
+        print(f"❌ {failure}")
+    print("✅ PASS: no regression against the baseline" if not failures else "❌ FAIL")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
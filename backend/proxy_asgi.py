@@ -0,0 +1,164 @@
+"""
+⚡ ASGI mode for the READ-ONLY ZKTeco proxy
+==========================================
+
+Same endpoints as proxy_server.py, served by an asyncio event loop:
+
+✅ Device I/O (/api/sync, first /api/employees) runs in a dedicated
+   single-thread executor - exactly one device session at a time
+✅ Concurrent /api/sync calls share the pull that is already running
+✅ /api/health, /api/metrics, /api/records, /api/reports/monthly and cached
+   /api/employees(/search) are answered without ever waiting behind the device
+✅ /api/records and /api/reports/monthly come from the proxy's result cache
+   (biosync.result_cache) while the employees/months they cover are unchanged
+
+Run:
+    python proxy_server.py --asgi
+    uvicorn proxy_asgi:app --host 0.0.0.0 --port 5000
+
+⚠️ SAFETY: the device is only ever read, exactly like proxy_server.py.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+import proxy_server as core
+
+# One thread = one device session; everything else stays on the event loop
+device_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='zk-device')
+
+_sync_in_flight = None
+
+JSON_HEADERS = [
+    (b'content-type', b'application/json'),
+    (b'access-control-allow-origin', b'*'),
+]
+CORS_PREFLIGHT_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+    (b'access-control-allow-methods', b'GET, OPTIONS'),
+    (b'access-control-allow-headers', b'*'),
+]
+
+
+def _encode(payload):
+    return core.serializer.dumps(payload, pretty=False)
+
+
+def _sync_blocking(profile=None):
+    """Runs in the device executor: pull + process + encode, all off the event loop."""
+    print("\n🚀 [PROFESSIONAL SYNC] Starting real-time data retrieval (ASGI)...")
+    try:
+        with core.sync_profiler(profile), core.metrics.run('proxy_sync') as run:
+            payload, status = core.sync_payload(run)
+            body = _encode(payload)
+            run.lap('jsonify')
+            run.size('response', len(body))
+            return body, status
+    except Exception as e:
+        print(f"\n❌ Sync error: {e}\n")
+        return _encode({'success': False, 'error': str(e)}), 500
+
+
+async def _sync(profile=None):
+    """Coalesces concurrent /api/sync calls onto the pull that is already running.
+
+    ``?profile=1`` only profiles a pull it starts, not one it joins."""
+    global _sync_in_flight
+    if _sync_in_flight is None:
+        loop = asyncio.get_running_loop()
+        _sync_in_flight = loop.run_in_executor(device_executor, _sync_blocking, profile)
+        _sync_in_flight.add_done_callback(_clear_in_flight)
+    return await asyncio.shield(_sync_in_flight)
+
+
+def _clear_in_flight(_future):
+    global _sync_in_flight
+    _sync_in_flight = None
+
+
+async def _employees():
+    if core.employees_cached():
+        payload, status = core.employees_payload()
+    else:
+        loop = asyncio.get_running_loop()
+        payload, status = await loop.run_in_executor(device_executor, core.employees_payload)
+    return _encode(payload), status
+
+
+async def _employee_search(args):
+    if core.employees_cached():
+        payload, status = core.employee_search_payload(args)
+    else:
+        loop = asyncio.get_running_loop()
+        payload, status = await loop.run_in_executor(device_executor, core.employee_search_payload, args)
+    return _encode(payload), status
+
+
+async def _report(endpoint, args):
+    # Cache misses (filtering, numpy work, encoding) and the version check
+    # after a sync run on a worker thread, off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, core.report_body, endpoint, args)
+
+
+async def _health():
+    payload, status = core.health_payload()
+    return _encode(payload), status
+
+
+async def _respond(send, status, body, headers=JSON_HEADERS):
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            device_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    method = scope['method']
+    path = scope['path'].rstrip('/')
+
+    if method == 'OPTIONS':
+        return await _respond(send, 204, b'', CORS_PREFLIGHT_HEADERS)
+    if method != 'GET':
+        return await _respond(send, 405, _encode({'success': False, 'error': 'Method not allowed'}))
+
+    if path == '/api/health':
+        body, status = await _health()
+    elif path == '/api/sync':
+        args = dict(parse_qsl(scope.get('query_string', b'').decode('utf-8')))
+        body, status = await _sync(args.get('profile'))
+    elif path == '/api/records':
+        args = dict(parse_qsl(scope.get('query_string', b'').decode('utf-8')))
+        body, status = await _report('records', args)
+    elif path == '/api/reports/monthly':
+        args = dict(parse_qsl(scope.get('query_string', b'').decode('utf-8')))
+        body, status = await _report('reports/monthly', args)
+    elif path == '/api/employees':
+        body, status = await _employees()
+    elif path == '/api/employees/search':
+        args = dict(parse_qsl(scope.get('query_string', b'').decode('utf-8')))
+        body, status = await _employee_search(args)
+    elif path == '/api/metrics':
+        text = (core.metrics.render_prometheus() + core.result_cache.render_prometheus()).encode('utf-8')
+        return await _respond(send, 200, text, [
+            (b'content-type', b'text/plain; version=0.0.4'),
+            (b'access-control-allow-origin', b'*'),
+        ])
+    else:
+        body, status = _encode({'success': False, 'error': 'Not found'}), 404
+
+    await _respond(send, status, body)
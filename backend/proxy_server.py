@@ -7,26 +7,111 @@ This server uses the ZK Protocol (Port 4370) for professional reliability.
 It is STRICTLY READ-ONLY. It will NEVER modify, delete, or update device data.
 
 Intelligence:
-✅ Maps Fingerprint IDs to Actual Names
+✅ Maps Fingerprint IDs to Actual Names (cached user directory)
 ✅ Filters only 2026+ records
-✅ Deduplicates records to prevent "19,000 logs" redundancy
+✅ Deduplicates records and collapses double taps (BIOSYNC_DEBOUNCE_SECONDS)
 ✅ Fast & Reliable protocol connection
+✅ One device session at a time: concurrent /api/sync calls share the pull
+   that is already running
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from zk import ZK, const
-from datetime import datetime
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+import functools
+import threading
 import time
 import os
+import sys
+
+# Shared helpers live in the project root (biosync package)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from biosync import serializer
+from biosync.analytics import PunchColumns, monthly_report
+from biosync.debounce import DebounceStats, debounce
+from biosync.employee_search import EmployeeIndex
+from biosync.leader import DeviceOwner, LeaderLock
+from biosync.metrics import Metrics
+from biosync.profiling import Profiler, mode_from_env
+from biosync.punch_log import PunchLog
+from biosync.punches import Punch
+from biosync.result_cache import DataVersions, ResultCache, month_range
+from biosync.shifts import ShiftSchedule, epoch_seconds
+from biosync.snapshot_store import SnapshotStore
+from biosync.user_directory import UserDirectory
+
+class SerializerJSONProvider(JSONProvider):
+    """
+    jsonify() through biosync.serializer (orjson/msgspec when installed), always compact
+    """
+    def dumps(self, obj, **kwargs):
+        return serializer.dumps(obj, pretty=False).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(serializer.dumps(obj, pretty=False), mimetype='application/json')
 
 app = Flask(__name__)
+app.json = SerializerJSONProvider(app)
 CORS(app)
 
 # Configuration
 DEVICE_IP = os.environ.get('VITE_DEVICE_IP', '10.10.1.127')
 DEVICE_PORT = 4370
 START_YEAR = 2026
+USER_CACHE_PATH = os.path.join(PROJECT_ROOT, 'data', 'user_directory.json')
+PROFILE_DIR = os.path.join(PROJECT_ROOT, 'data', 'profiles')
+PROFILE_MODE = mode_from_env('BIOSYNC_PROFILE')  # sample|cprofile[+alloc]: /api/sync?profile=1 is profiled
+SHIFTS_PATH = os.path.join(PROJECT_ROOT, 'data', 'shifts.json')
+PUNCH_LOG_PATH = os.path.join(PROJECT_ROOT, 'data', 'punches.bin')  # binary mirror for range queries
+
+# Multi-worker mode: set BIOSYNC_SHARED_STORE to a SQLite path shared by all workers
+SHARED_STORE_PATH = os.environ.get('BIOSYNC_SHARED_STORE')
+SHARED_SYNC_TIMEOUT = float(os.environ.get('BIOSYNC_SYNC_TIMEOUT', '120'))
+
+directory = UserDirectory(USER_CACHE_PATH)
+search_index = EmployeeIndex()  # follows the directory, see employee_search_payload()
+metrics = Metrics()
+punch_log = PunchLog(PUNCH_LOG_PATH)
+result_cache = ResultCache()  # BIOSYNC_RESULT_CACHE_MB, see report_body()
+data_versions = DataVersions()
+
+def format_record(punch):
+    """
+    Punch -> record in the format the frontend expects
+    """
+    # punch == 0 or 1 typically means check-in, 2 or 3 means check-out
+    # This varies by device, but we'll use a common mapping
+    record = {
+        'id': f"{punch.user_id}_{punch.timestamp.strftime('%Y%m%d%H%M%S')}",  # user_id + timestamp
+        'employeeId': punch.user_id,
+        'employeeName': directory.get(punch.user_id, f"User {punch.user_id}"),
+        'timestamp': punch.timestamp.isoformat(),
+        'type': 'check-in' if punch.punch_state in [0, 1] else 'check-out',  # Frontend expects 'type' field
+        'deviceId': punch.device_id
+    }
+    if punch.collapsed:
+        record['collapsed'] = punch.collapsed  # audit: taps merged into this one
+    return record
+
+def _one_session(method):
+    """
+    Holds the reader's session lock: ``conn`` belongs to one caller at a time
+    (two threads sharing it leak a device session each time one overwrites it)
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.session:
+            return method(self, *args, **kwargs)
+    return locked
 
 class ProfessionalZKReader:
     def __init__(self, ip, port=4370):
@@ -34,6 +119,7 @@ class ProfessionalZKReader:
         self.port = port
         self.zk = ZK(ip, port=port, timeout=10, force_udp=False)
         self.conn = None
+        self.session = threading.Lock()
 
     def connect(self):
         try:
@@ -55,71 +141,77 @@ class ProfessionalZKReader:
                 pass
             self.conn = None
 
-    def get_intelligent_data(self):
+    @_one_session
+    def refresh_directory(self):
+        """
+        Refreshes the cached user directory without pulling attendance.
+        """
+        if not self.connect():
+            return False
+
+        try:
+            directory.refresh(self.conn)
+            return True
+        except Exception as e:
+            print(f"❌ Error while reading users: {e}")
+            return False
+        finally:
+            self.disconnect()
+
+    @_one_session
+    def get_intelligent_data(self, run):
         """
         Reads users and logs, then combines them intelligently.
+        Stage timings and record counts are recorded on ``run``.
         """
         if not self.connect():
             return None, None
+        run.lap('connect')
 
         try:
-            # 1. Fetch Users to build Name Map (ID -> Name)
-            print("👥 Fetching user profiles for name mapping...")
-            users = self.conn.get_users()
-            user_map = {u.user_id: u.name for u in users}
-            
-            # Format employees for frontend
-            formatted_employees = []
-            for u in users:
-                formatted_employees.append({
-                    'id': str(u.user_id),  # Convert to string for consistency
-                    'name': u.name if u.name else f"User {u.user_id}",
-                    'department': 'Not Specified', # Device doesn't always store department in basic user object
-                    'position': 'Staff'
-                })
-
+            # 1. Refresh the cached Name Map (ID -> Name) only if the roster changed
+            if directory.refresh(self.conn):
+                print(f"👥 User directory reloaded ({len(directory)} users)")
+            else:
+                print(f"👥 User directory unchanged ({len(directory)} users, cached)")
+            formatted_employees = directory.employees()
+            run.lap('get_users')
+            run.count('employees', len(formatted_employees))
 
             # 2. Fetch Attendance Logs
             print("📊 Fetching attendance logs (Read-Only)...")
             attendance = self.conn.get_attendance()
             print(f"✅ Retrieved {len(attendance)} total logs from device")
+            run.lap('get_attendance')
+            run.count('device_records', len(attendance))
 
             # 3. Intelligent Filtering (2026+ and Deduplication)
             print(f"📅 Filtering for year {START_YEAR}+ and organizing...")
             
-            processed_logs = []
-            seen_records = set() # To avoid duplicates in the same sync
-
-            for log in attendance:
-                # Year Filter
-                if log.timestamp.year < START_YEAR:
-                    continue
-
-                # Unique ID for deduplication: user_id + timestamp
-                record_id = f"{log.user_id}_{log.timestamp.strftime('%Y%m%d%H%M%S')}"
-                
-                if record_id in seen_records:
-                    continue
-                seen_records.add(record_id)
-
-                # Map ID to Name
-                user_name = user_map.get(log.user_id, f"User {log.user_id}")
-                
-                # Convert punch code to type
-                # punch == 0 or 1 typically means check-in, 2 or 3 means check-out
-                # This varies by device, but we'll use a common mapping
-                record_type = 'check-in' if log.punch in [0, 1] else 'check-out'
-
-                processed_logs.append({
-                    'id': record_id,
-                    'employeeId': str(log.user_id),  # Convert to string for consistency
-                    'employeeName': user_name,
-                    'timestamp': log.timestamp.isoformat(),
-                    'type': record_type,  # Frontend expects 'type' field
-                    'deviceId': 'uFace800-Main'
-                })
-
-            print(f"✨ Intelligent processing complete. {len(processed_logs)} records ready.")
+            debounce_stats = DebounceStats()
+            recent = sorted(
+                (log for log in attendance if log.timestamp.year >= START_YEAR),
+                key=lambda log: log.timestamp
+            )
+
+            # Double taps (same user, same punch state, within seconds) collapse into one punch
+            punches = list(debounce((Punch.from_log(log) for log in recent), stats=debounce_stats))
+
+            # Map IDs to names and punch codes to types
+            processed_logs = [format_record(punch) for punch in punches]
+
+            print(f"✨ Intelligent processing complete. {len(processed_logs)} records ready "
+                  f"({debounce_stats.collapsed} double taps collapsed).")
+            run.lap('process')
+            run.count('records', len(processed_logs))
+            run.count('collapsed_punches', debounce_stats.collapsed)
+
+            # 4. Mirror new punches into the binary log used by range queries
+            try:
+                run.count('punch_log_appended', punch_log.append(punches))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Punch log not updated: {e}")
+            run.lap('punch_log')
             return formatted_employees, processed_logs
 
 
@@ -131,30 +223,345 @@ class ProfessionalZKReader:
 
 reader = ProfessionalZKReader(DEVICE_IP, DEVICE_PORT)
 
+# Last successful sync, served by the query endpoints without touching the device
+latest_snapshot = {'employees': [], 'records': [], 'timestamp': None}
+
+DEVICE_ERROR = 'Failed to connect to biometric device. Check IP and network.'
+OWNER_TIMEOUT_ERROR = 'Timed out waiting for the device-owner worker.'
+
+def _owner_pull():
+    """
+    Device pull done by the device-owner worker only (multi-worker mode).
+    """
+    with metrics.run('proxy_device_pull') as run:
+        employees, records = reader.get_intelligent_data(run)
+        if employees is None:
+            run.status = 'error'
+            raise RuntimeError(DEVICE_ERROR)
+        return employees, records
+
+# Multi-worker mode: one worker (holder of the lock file) owns the device session,
+# publishes snapshots to the shared store, and every worker serves reads from it.
+store = None
+device_owner = None
+if SHARED_STORE_PATH:
+    store = SnapshotStore(SHARED_STORE_PATH)
+    device_owner = DeviceOwner(store, LeaderLock(SHARED_STORE_PATH + '.lock'), _owner_pull).start()
+
+def current_snapshot():
+    if store is not None:
+        return store.latest() or {'employees': [], 'records': [], 'timestamp': None}
+    return latest_snapshot
+
+def _shared_sync(run):
+    """
+    Multi-worker mode: queue a request for the device owner and wait for its snapshot.
+    """
+    snapshot = store.wait_for(store.request_sync(), timeout=SHARED_SYNC_TIMEOUT)
+    run.lap('wait_for_owner')
+    if snapshot is None:
+        run.status = 'error'
+        return {'success': False, 'error': OWNER_TIMEOUT_ERROR}, 504
+    if not snapshot['ok']:
+        run.status = 'error'
+        return {'success': False, 'error': snapshot['error']}, 500
+    run.count('records', len(snapshot['records']))
+    return {
+        'success': True,
+        'employees': snapshot['employees'],
+        'records': snapshot['records'],
+        'timestamp': snapshot['timestamp']
+    }, 200
+
+# ─── Endpoint logic (shared by the Flask app and proxy_asgi.py) ───
+
+def sync_profiler(requested):
+    """Profiler for one /api/sync: only with BIOSYNC_PROFILE set and ``?profile=1``."""
+    mode = PROFILE_MODE if requested not in (None, '', '0', 'false') else None
+    return Profiler.from_mode('proxy_sync', mode, out_dir=PROFILE_DIR)
+
+class SharedPull:
+    """
+    Concurrent callers of run() share the pull that is already running
+    (the Flask twin of proxy_asgi's in-flight sync)
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._future = None
+
+    def run(self, pull):
+        with self._lock:
+            future = self._future
+            if future is None:
+                future = self._future = Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(pull())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._future = None
+        return future.result()
+
+shared_sync = SharedPull()
+
+def sync_payload(run):
+    """
+    Pulls from the device and returns (payload, HTTP status).
+    """
+    global latest_snapshot
+
+    if store is not None:
+        return _shared_sync(run)
+
+    employees, records = reader.get_intelligent_data(run)
+
+    if employees is None:
+        run.status = 'error'
+        return {'success': False, 'error': DEVICE_ERROR}, 500
+
+    timestamp = datetime.now().isoformat()
+    latest_snapshot = {'employees': employees, 'records': records, 'timestamp': timestamp}
+    return {
+        'success': True,
+        'employees': employees,
+        'records': records,
+        'timestamp': timestamp
+    }, 200
+
+# Precision of a ?to= value (by length) -> step that makes it an exclusive bound
+_TO_STEPS = {10: timedelta(days=1), 13: timedelta(hours=1), 16: timedelta(minutes=1), 19: timedelta(seconds=1)}
+
+def _log_bounds(start, end):
+    """
+    ?from=/?to= -> (start, exclusive end) datetimes; ValueError if malformed
+    """
+    start_dt = datetime.fromisoformat(start) if start else None
+    end_dt = None
+    if end:
+        if len(end) not in _TO_STEPS:
+            raise ValueError(end)
+        end_dt = datetime.fromisoformat(end) + _TO_STEPS[len(end)]
+    return start_dt, end_dt
+
+def _log_records(employee_id, start, end):
+    """
+    Range query on the binary punch log (bisect on time, no JSON parsing)
+    """
+    start_dt, end_dt = _log_bounds(start, end)
+    return [format_record(p) for p in punch_log.range(start_dt, end_dt, employee_id)]
+
+def records_payload(args):
+    """
+    Records filtered by
+    ?employeeId=..&from=YYYY-MM-DD[THH:MM:SS]&to=YYYY-MM-DD[THH:MM:SS] (inclusive).
+    Time ranges are answered from the binary punch log when it exists,
+    everything else from the last sync.
+    """
+    snapshot = current_snapshot()
+    records = snapshot['records']
+    employee_id = args.get('employeeId')
+    start = args.get('from')
+    end = args.get('to')
+
+    if (start or end) and len(punch_log):
+        try:
+            records = _log_records(employee_id, start, end)
+        except ValueError:
+            return {'success': False, 'error': 'Invalid from/to, expected YYYY-MM-DD[THH:MM[:SS]]'}, 400
+        return {'success': True, 'records': records, 'timestamp': snapshot['timestamp']}, 200
+
+    if employee_id:
+        records = [r for r in records if r['employeeId'] == employee_id]
+    if start:
+        records = [r for r in records if r['timestamp'] >= start]
+    if end:
+        records = [r for r in records if r['timestamp'][:len(end)] <= end]
+
+    return {'success': True, 'records': records, 'timestamp': snapshot['timestamp']}, 200
+
+def _check_month(month):
+    """
+    ?month= must be exactly YYYY-MM; ValueError otherwise (also with no records to report on)
+    """
+    if datetime.strptime(month, '%Y-%m').strftime('%Y-%m') != month:
+        raise ValueError(month)
+
+def monthly_report_payload(args):
+    """
+    Per-employee monthly metrics (late days, hours, overtime, missing checkouts)
+    computed per shift (data/shifts.json) from the last sync, optionally for one ?month=YYYY-MM
+    """
+    snapshot = current_snapshot()
+    month = args.get('month')
+    names = {e['id']: e['name'] for e in snapshot['employees']}
+    try:
+        if month:
+            _check_month(month)
+        columns = PunchColumns.from_records(snapshot['records'], names)
+        rows = monthly_report(columns, month, ShiftSchedule.load(SHIFTS_PATH))
+    except ValueError:
+        return {'success': False, 'error': f"Invalid month '{month}', expected YYYY-MM"}, 400
+    return {'success': True, 'month': month, 'report': rows, 'timestamp': snapshot['timestamp']}, 200
+
+# Cached endpoints -> (payload function, query parameters that select the result)
+REPORT_ENDPOINTS = {
+    'records': (records_payload, ('employeeId', 'from', 'to')),
+    'reports/monthly': (monthly_report_payload, ('month',)),
+}
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _report_stamp(endpoint, args):
+    """
+    Versions of exactly the data a report reads: the months (and employee)
+    it covers, plus the shift file or the punch-log range it depends on
+    """
+    if endpoint == 'reports/monthly':
+        month = args['month']
+        if month:
+            _check_month(month)  # a bad month is never stamped, so never cached
+        return data_versions.stamp(months=[month] if month else None), _mtime(SHIFTS_PATH)
+
+    employee, start, end = args['employeeId'], args['from'], args['to']
+    months = month_range(start[:7], end[:7]) if start and end else None
+    stamp = data_versions.stamp(employee, months)
+    if (start or end) and len(punch_log):
+        # The log is also appended by the sync scripts: count what is in range
+        start_dt, end_dt = _log_bounds(start, end)
+        stamp = stamp, punch_log.count(
+            None if start_dt is None else epoch_seconds(start_dt),
+            None if end_dt is None else epoch_seconds(end_dt),
+        )
+    return stamp
+
+def _with_timestamp(body, timestamp):
+    # Bodies are cached without the sync timestamp, so a sync that changes
+    # nothing a report reads keeps its entry
+    return body[:-1] + b',"timestamp":' + serializer.dumps(timestamp, pretty=False) + b'}'
+
+def report_body(endpoint, args):
+    """
+    (encoded body, HTTP status) of a REPORT_ENDPOINTS endpoint, from the
+    result cache while the employees/months it covers are unchanged
+    """
+    build, names = REPORT_ENDPOINTS[endpoint]
+    params = {name: (args.get(name) or '').strip() or None for name in names}
+    snapshot = current_snapshot()
+    data_versions.observe(snapshot['records'])  # no-op until the next sync
+    try:
+        stamp = _report_stamp(endpoint, params)
+    except ValueError:
+        payload, status = build(params)  # malformed parameters: the 400 comes from build()
+        return serializer.dumps(payload, pretty=False), status
+
+    key = (endpoint, tuple(params.items()))
+    body = result_cache.get(key, stamp)
+    if body is not None:
+        return _with_timestamp(body, snapshot['timestamp']), 200
+
+    payload, status = build(params)
+    timestamp = payload.pop('timestamp', None)
+    body = serializer.dumps(payload, pretty=False)
+    if status != 200:
+        return body, status
+    result_cache.put(key, stamp, body)
+    return _with_timestamp(body, timestamp), 200
+
+def employees_payload():
+    """
+    Served from the cached user directory
+    (the device is only contacted if the cache is still empty)
+    """
+    if store is not None:
+        snapshot = store.latest()
+        if snapshot is None:
+            snapshot = store.wait_for(store.request_sync(), timeout=SHARED_SYNC_TIMEOUT)
+        if snapshot is None or not snapshot['ok']:
+            return {'success': False, 'error': snapshot['error'] if snapshot else OWNER_TIMEOUT_ERROR}, 500
+        return {'success': True, 'employees': snapshot['employees']}, 200
+
+    if not len(directory) and not reader.refresh_directory():
+        return {'success': False, 'error': DEVICE_ERROR}, 500
+
+    return {'success': True, 'employees': directory.employees()}, 200
+
+def employee_search_payload(args):
+    """
+    Ranked name/ID matches for ?q=..&limit=.. from the in-memory index of the user directory
+    """
+    query = (args.get('q') or '').strip()
+    if not query:
+        return {'success': False, 'error': "Missing search query 'q'"}, 400
+    try:
+        limit = max(1, min(int(args.get('limit', 20)), 200))
+    except ValueError:
+        return {'success': False, 'error': "Invalid 'limit', expected a number"}, 400
+
+    payload, status = employees_payload()
+    if status != 200:
+        return payload, status
+    # No-op while the roster is unchanged; otherwise re-indexes only the changed employees
+    search_index.refresh(payload['employees'])
+    return {'success': True, 'query': query, 'results': search_index.search(query, limit)}, 200
+
+def employees_cached():
+    """
+    True when employees_payload() can answer without waiting on the device.
+    """
+    if store is not None:
+        return store.latest() is not None
+    return bool(len(directory))
+
+def health_payload():
+    payload = {
+        'status': 'healthy',
+        'protocol': 'ZK (Port 4370)',
+        'mode': 'READ-ONLY',
+        'device': DEVICE_IP,
+        'safety': 'Device data remains untouched'
+    }
+    if device_owner is not None:
+        payload['worker'] = {
+            'pid': os.getpid(),
+            'role': 'device-owner' if device_owner.is_leader else 'reader'
+        }
+    return payload, 200
+
+# ─── Flask routes ─────────────────────────────────────────────────
+
 @app.route('/api/sync', methods=['GET'])
 def sync_device():
     """
-    Sync endpoint - Uses ZK Protocol for real data
+    Sync endpoint - Uses ZK Protocol for real data.
+    Calls arriving during a pull share it (``?profile=1`` only profiles a pull it starts).
     """
-    try:
+    profile = request.args.get('profile')
+
+    def pull():
         print("\n🚀 [PROFESSIONAL SYNC] Starting real-time data retrieval...")
         print("⚠️  SAFETY GUARANTEE: Device data will NOT be modified\n")
-        
-        employees, records = reader.get_intelligent_data()
-        
-        if employees is None:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to connect to biometric device. Check IP and network.'
-            }), 500
-        
-        return jsonify({
-            'success': True,
-            'employees': employees,
-            'records': records,
-            'timestamp': datetime.now().isoformat()
-        })
-        
+
+        with sync_profiler(profile), metrics.run('proxy_sync') as run:
+            payload, status = sync_payload(run)
+            body = serializer.dumps(payload, pretty=False)
+            run.lap('jsonify')
+            run.size('response', len(body))
+            return body, status
+
+    try:
+        body, status = shared_sync.run(pull)
+        return Response(body, status=status, mimetype='application/json')
+
     except Exception as e:
         print(f"\n❌ Sync error: {e}\n")
         return jsonify({
@@ -162,15 +569,51 @@ def sync_device():
             'error': str(e)
         }), 500
 
+@app.route('/api/records', methods=['GET'])
+def list_records():
+    """
+    Records endpoint - Served from the last sync (no device access)
+    """
+    body, status = report_body('records', request.args)
+    return Response(body, status=status, mimetype='application/json')
+
+@app.route('/api/reports/monthly', methods=['GET'])
+def monthly_report_endpoint():
+    """
+    Monthly attendance report - Served from the last sync (no device access)
+    """
+    body, status = report_body('reports/monthly', request.args)
+    return Response(body, status=status, mimetype='application/json')
+
+@app.route('/api/employees', methods=['GET'])
+def list_employees():
+    """
+    Employees endpoint - Served from the cached user directory
+    """
+    payload, status = employees_payload()
+    return jsonify(payload), status
+
+@app.route('/api/employees/search', methods=['GET'])
+def search_employees():
+    """
+    Employee search - ranked name/ID matches from the cached user directory
+    """
+    payload, status = employee_search_payload(request.args)
+    return jsonify(payload), status
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Prometheus metrics - per-stage sync timings, record counts, payload sizes,
+    result cache hits/misses
+    """
+    text = metrics.render_prometheus() + result_cache.render_prometheus()
+    return Response(text, mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({
-        'status': 'healthy',
-        'protocol': 'ZK (Port 4370)',
-        'mode': 'READ-ONLY',
-        'device': DEVICE_IP,
-        'safety': 'Device data remains untouched'
-    })
+    payload, status = health_payload()
+    return jsonify(payload), status
 
 if __name__ == '__main__':
     print("\n" + "="*60)
@@ -179,7 +622,16 @@ if __name__ == '__main__':
     print(f"\n📍 Device: {DEVICE_IP}:{DEVICE_PORT}")
     print(f"📅 Year Filter: {START_YEAR}+")
     print(f"\n⚠️  SAFETY MODE: ZK Protocol (Read-Only)")
+    if PROFILE_MODE is not None:
+        print(f"🔬 Profiling /api/sync?profile=1 ({os.environ['BIOSYNC_PROFILE']}) -> {PROFILE_DIR}")
     print(f"\n🌐 Starting server on http://localhost:5000")
     print("="*60 + "\n")
     
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    if '--asgi' in sys.argv:
+        # Device I/O in a dedicated executor; health/cached reads never wait behind it
+        import uvicorn
+        from proxy_asgi import app as asgi_app
+        print("⚡ Server mode: ASGI (uvicorn)\n")
+        uvicorn.run(asgi_app, host='0.0.0.0', port=5000)
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,8 @@
+"""
+BioSync shared helpers
+======================
+Code shared by the sync scripts (sync_simple.py, sync_smart.py,
+sync_to_firebase.py, py.py) and backend/proxy_server.py.
+
+⚠️ Everything here is READ-ONLY towards the device.
+"""
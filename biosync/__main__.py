@@ -0,0 +1,7 @@
+"""python -m biosync <command> - see biosync.cli."""
+
+import sys
+
+from biosync.cli import main
+
+sys.exit(main())
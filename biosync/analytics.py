@@ -0,0 +1,320 @@
+"""
+Monthly attendance analytics
+============================
+Per-employee, per-month payroll metrics computed in one vectorized pass
+over a columnar punch array (numpy), instead of record by record:
+
+    daysPresent       shifts with a check-in
+    lateDays          first check-in after shift start + grace (08:30 for
+                      the default day shift, as getAttendanceStatus in
+                      services/firebaseSyncService.ts)
+    totalHours        sum of (last check-out - first check-in) per shift
+    overtimeHours     hours beyond the standard 8h day, summed per shift
+    missingCheckouts  shifts with a check-in but no later check-out
+    avgFirstIn        average first check-in time (HH:MM)
+
+A "day" is a shift instance (biosync.shifts), so night shifts that cross
+midnight are counted once, in the month they start.
+
+Input is data/employees/*.json, the binary punch log (--punch-log) or the
+proxy's sync records. Sealed months (biosync.archive) are not recomputed:
+their rows were stored with the archive when they were sealed.
+
+Usage:
+    python -m biosync.analytics --month 2026-01 --csv report.csv --json report.json
+"""
+
+import argparse
+import csv
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from biosync import serializer
+from biosync.archive import ARCHIVE_DIR, load_index, sync_start
+from biosync.employee_store import DATA_DIR, load_employees
+from biosync.punch_log import PUNCH_LOG_PATH, PunchLog
+from biosync.shifts import SHIFTS_PATH, ShiftIndex, ShiftSchedule, epoch_seconds
+from biosync.user_directory import UserDirectory
+
+WORKDAY_HOURS = 8.0
+
+REPORT_FIELDS = [
+    'employeeId', 'employeeName', 'month', 'daysPresent', 'lateDays',
+    'totalHours', 'overtimeHours', 'missingCheckouts', 'avgFirstIn',
+]
+
+_DAY = 86400
+_NO_IN = np.iinfo(np.int64).max
+_NO_OUT = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1)
+
+# biosync.punch_log.RECORD as a numpy dtype
+_LOG_DTYPE = np.dtype([('epoch', '<i8'), ('user', 'S9'), ('status', 'u1'), ('state', 'u1'),
+                       ('collapsed', 'u1'), ('device', '<u2'), ('pad', 'V2')])
+
+
+class PunchColumns:
+    """
+    Punches as parallel numpy arrays:
+        user     int index into ``user_ids``
+        seconds  int64 local wall-clock seconds since 1970-01-01
+        is_in    bool, True for check-in; None = classify by the shift
+                 cutoff, as sync_simple.py does (binary punch log)
+    """
+
+    def __init__(self, user_ids, user, seconds, is_in, names=None):
+        self.user_ids = user_ids
+        self.user = user
+        self.seconds = seconds
+        self.is_in = is_in
+        self.names = names or {}
+
+    def __len__(self):
+        return len(self.seconds)
+
+    @classmethod
+    def from_lists(cls, employee_ids, timestamps, types, names=None):
+        """``timestamps`` are ISO strings; only the first 19 chars (to the second) are used."""
+        user_ids, user = np.unique(np.asarray(employee_ids, dtype=str), return_inverse=True)
+        seconds = np.array([ts[:19] for ts in timestamps], dtype='datetime64[s]').astype(np.int64)
+        is_in = np.asarray(types, dtype=str) == 'check-in'
+        return cls(user_ids, user.astype(np.int64), seconds, is_in, names)
+
+    @classmethod
+    def from_employees(cls, employees, month=None):
+        """From load_employees(); ``month`` ('YYYY-MM') skips every other month up front."""
+        ids, stamps, types, names = [], [], [], {}
+        for user_id, data in employees.items():
+            names[user_id] = data['profile'].get('name', '')
+            for month_key, records in data['attendance'].items():
+                if month is not None and month_key != month:
+                    continue
+                ids.extend([user_id] * len(records))
+                stamps.extend(r['timestamp'] for r in records)
+                types.extend(r['type'] for r in records)
+        return cls.from_lists(ids, stamps, types, names)
+
+    @classmethod
+    def from_punch_log(cls, log, month=None, names=None, since=None):
+        """
+        From the binary punch log (biosync.punch_log), zero parsing: the
+        records are viewed as a numpy structured array. ``month`` reads only
+        that month (plus a day each side for overnight shifts), ``since``
+        (datetime) only the punches from then on.
+        """
+        start = None if since is None else epoch_seconds(since)
+        end = None
+        if month is not None:
+            start, end = _month_bounds(month)
+            start, end = start - _DAY, end + _DAY
+        raw = np.frombuffer(log.read(start, end), dtype=_LOG_DTYPE)
+        user_ids, user = np.unique(raw['user'], return_inverse=True)
+        return cls(np.char.decode(user_ids, 'ascii'), user.astype(np.int64),
+                   raw['epoch'].astype(np.int64), None, names)
+
+    @classmethod
+    def from_records(cls, records, names=None):
+        """From proxy sync records ({'employeeId', 'timestamp', 'type', ...})."""
+        return cls.from_lists(
+            [r['employeeId'] for r in records],
+            [r['timestamp'] for r in records],
+            [r['type'] for r in records],
+            names,
+        )
+
+
+def _month_bounds(month):
+    start = np.datetime64(month, 'M')
+    return (start.astype('datetime64[s]').astype(np.int64),
+            (start + 1).astype('datetime64[s]').astype(np.int64))
+
+
+def _shift_columns(columns, user, seconds, schedule):
+    """
+    Per punch (``user``/``seconds`` sorted by employee, then time): start,
+    late-after time, cutoff and calendar day of the shift instance it belongs to.
+    One ShiftIndex per distinct shift pattern, searched with np.searchsorted.
+    """
+    first = _EPOCH + timedelta(seconds=int(seconds.min()))
+    last = _EPOCH + timedelta(seconds=int(seconds.max()))
+    indexes = {}
+
+    inst_start = np.empty(len(seconds), np.int64)
+    inst_late = np.empty(len(seconds), np.int64)
+    inst_day = np.empty(len(seconds), np.int64)
+    inst_cutoff = np.empty(len(seconds), np.int64)
+    cuts = np.flatnonzero(np.r_[True, user[1:] != user[:-1], True])
+    for a, b in zip(cuts[:-1], cuts[1:]):
+        shifts = schedule.shifts_for(columns.user_ids[user[a]])
+        if shifts not in indexes:
+            index = ShiftIndex(shifts, first.date(), last.date())
+            indexes[shifts] = (
+                np.array(index.window_starts, np.int64),
+                np.array([i.start for i in index.instances], np.int64),
+                np.array([i.late_after for i in index.instances], np.int64),
+                np.array([(i.date - _EPOCH.date()).days for i in index.instances], np.int64),
+                np.array([i.cutoff for i in index.instances], np.int64),
+            )
+        window_starts, starts, late_after, days, cutoffs = indexes[shifts]
+        pos = np.searchsorted(window_starts, seconds[a:b], side='right') - 1
+        inst_start[a:b] = starts[pos]
+        inst_late[a:b] = late_after[pos]
+        inst_day[a:b] = days[pos]
+        inst_cutoff[a:b] = cutoffs[pos]
+    return inst_start, inst_late, inst_day, inst_cutoff
+
+
+def monthly_report(columns, month=None, schedule=None, workday_hours=WORKDAY_HOURS):
+    """
+    One row per (employee, month), sorted by employee id then month.
+    Days are shift instances from ``schedule`` (default: ShiftSchedule.load()),
+    so a 22:00-06:00 shift counts as one day of the month it starts in.
+    ``month`` ('YYYY-MM') restricts the report to that month.
+    """
+    schedule = schedule if schedule is not None else ShiftSchedule.load()
+    user, seconds, is_in = columns.user, columns.seconds, columns.is_in
+    if month is not None and len(seconds):
+        # Keep a day of margin: overnight shifts straddle the month boundary
+        start, end = _month_bounds(month)
+        mask = (seconds >= start - _DAY) & (seconds < end + _DAY)
+        user, seconds = user[mask], seconds[mask]
+        is_in = None if is_in is None else is_in[mask]
+    if not len(seconds):
+        return []
+
+    # 1. Sort by (employee, time), locate shift instances, cut into (employee, shift) runs
+    order = np.lexsort((seconds, user))
+    user, seconds = user[order], seconds[order]
+    inst_start, inst_late, inst_day, inst_cutoff = _shift_columns(columns, user, seconds, schedule)
+    is_in = seconds < inst_cutoff if is_in is None else is_in[order]
+    starts = np.flatnonzero(np.r_[True, (user[1:] != user[:-1]) | (inst_start[1:] != inst_start[:-1])])
+
+    # 2. First check-in / last check-out of each shift
+    first_in = np.minimum.reduceat(np.where(is_in, seconds, _NO_IN), starts)
+    last_out = np.maximum.reduceat(np.where(is_in, _NO_OUT, seconds), starts)
+    day_user = user[starts]
+    day = inst_day[starts]
+    late_after = inst_late[starts]
+
+    day_month = day.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    present = first_in != _NO_IN
+    if month is not None:
+        present &= day_month == np.datetime64(month, 'M').astype(np.int64)
+    day_user, day, day_month = day_user[present], day[present], day_month[present]
+    first_in, last_out, late_after = first_in[present], last_out[present], late_after[present]
+    if not len(day):
+        return []
+
+    in_clock = first_in - day * _DAY  # from midnight of the shift's date (> 24h after midnight)
+    has_out = last_out > first_in
+    hours = np.where(has_out, last_out - first_in, 0) / 3600.0
+    overtime = np.maximum(hours - workday_hours, 0.0)
+    late = first_in >= late_after + 60  # 08:30:xx is still on time, as in the app
+
+    # 3. Fold shifts into (employee, month)
+    group_starts = np.flatnonzero(np.r_[True, (day_user[1:] != day_user[:-1]) | (day_month[1:] != day_month[:-1])])
+    days_present = np.diff(np.r_[group_starts, len(day)])
+    late_days = np.add.reduceat(late.astype(np.int64), group_starts)
+    total_hours = np.add.reduceat(hours, group_starts)
+    overtime_hours = np.add.reduceat(overtime, group_starts)
+    missing = np.add.reduceat((~has_out).astype(np.int64), group_starts)
+    avg_in = np.add.reduceat(in_clock, group_starts) / days_present
+
+    months = day_month[group_starts].astype('datetime64[M]').astype(str)
+    users = columns.user_ids[day_user[group_starts]]
+
+    rows = []
+    for i in range(len(group_starts)):
+        user_id = str(users[i])
+        avg = int(round(avg_in[i]))
+        rows.append({
+            'employeeId': user_id,
+            'employeeName': columns.names.get(user_id, f"User {user_id}"),
+            'month': str(months[i]),
+            'daysPresent': int(days_present[i]),
+            'lateDays': int(late_days[i]),
+            'totalHours': round(float(total_hours[i]), 2),
+            'overtimeHours': round(float(overtime_hours[i]), 2),
+            'missingCheckouts': int(missing[i]),
+            'avgFirstIn': f"{avg // 3600 % 24:02d}:{avg % 3600 // 60:02d}",
+        })
+    return rows
+
+
+def write_csv(rows, path):
+    with open(path, mode='w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(rows, path):
+    with open(path, 'wb') as f:
+        f.write(serializer.dumps(rows))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Monthly attendance analytics from data/employees')
+    parser.add_argument('--month', help='YYYY-MM (default: every month)')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--punch-log', nargs='?', const=PUNCH_LOG_PATH,
+                        help='read the binary punch log instead of data/employees (default data/punches.bin)')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    parser.add_argument('--csv', help='write the report to this CSV file')
+    parser.add_argument('--json', help='write the report to this JSON file')
+    parser.add_argument('--shifts', default=SHIFTS_PATH, help='shift schedule (default data/shifts.json)')
+    parser.add_argument('--workday-hours', type=float, default=WORKDAY_HOURS)
+    args = parser.parse_args(argv)
+
+    sealed = load_index(args.archive_dir)
+    t0 = time.perf_counter()
+    if args.month in sealed:
+        # Sealed: computed when the month was archived, nothing to load
+        rows = sealed[args.month]['summary']['report']
+        punch_count = sealed[args.month]['records']
+        t_load = t_report = 0.0
+    else:
+        if args.punch_log:
+            names = {e['id']: e['name'] for e in UserDirectory().employees()}
+            since = sync_start(datetime.min, args.archive_dir) if sealed and not args.month else None
+            columns = PunchColumns.from_punch_log(PunchLog(args.punch_log), args.month, names, since)
+        else:
+            columns = PunchColumns.from_employees(
+                load_employees(args.data_dir, [args.month] if args.month else None), args.month)
+        t_load = time.perf_counter() - t0
+        rows = monthly_report(columns, args.month, ShiftSchedule.load(args.shifts), args.workday_hours)
+        if args.month is None and sealed:
+            rows = sorted([row for row in rows if row['month'] not in sealed]
+                          + [row for entry in sealed.values() for row in entry['summary']['report']],
+                          key=lambda row: (row['employeeId'], row['month']))
+        punch_count = len(columns)
+        t_report = time.perf_counter() - t0 - t_load
+
+    print("="*70)
+    print(f"التقرير الشهري - {args.month or 'جميع الأشهر'}")
+    print("="*70)
+    for row in rows:
+        print(f"{row['month']}  {row['employeeName'][:28]:<28} "
+              f"حضور: {row['daysPresent']:>2}  تأخير: {row['lateDays']:>2}  "
+              f"ساعات: {row['totalHours']:>7.2f}  إضافي: {row['overtimeHours']:>6.2f}  "
+              f"بدون خروج: {row['missingCheckouts']:>2}  أول دخول: {row['avgFirstIn']}")
+    print("="*70)
+    print(f"{punch_count} بصمة -> {len(rows)} صف  (تحميل {t_load:.3f}s، حساب {t_report:.3f}s)")
+
+    if args.csv:
+        write_csv(rows, args.csv)
+        print(f"✓ CSV: {args.csv}")
+    if args.json:
+        write_json(rows, args.json)
+        print(f"✓ JSON: {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""
+Sealed-month archive
+====================
+Retention for data/employees. Once a month is closed it is sealed into an
+immutable, compressed, columnar file with a precomputed summary and removed
+from the JSON store, so syncs, classification and reports only touch the
+open month(s):
+
+    open      data/employees/       JSON, rewritten by the syncs
+    sealed    data/archive/         written once, read on demand
+              index.json            {"months": {"2025-12": {"file", "codec", "records",
+                                     "employees", "bytes", "sha256", "sealedAt", "summary"}}}
+              2025-12.zst|.gz       one sealed month
+              sinks.json            {"firestore": ["2025-12", ...]}: the sealed months
+                                    each sink has received
+
+(data/punches.bin still holds every punch, for time-range queries.)
+
+A month is closed SEAL_AFTER_DAYS (BIOSYNC_SEAL_AFTER_DAYS, default 7)
+days after it ends, so late night-shift punches and corrections land
+first. Months are shift months, as in data/employees. seal() seals every
+closed month at once, so the sealed months are the oldest ones and the
+syncs only read the device log from sync_start() on.
+
+Sealing only moves the device window of the syncs. A sink that keeps its
+own copy (Firestore) uploads the sealed months it has not received from
+the archive (unpushed_months()), and records them with mark_pushed() once
+the push succeeded, so a month sealed before it was pushed still gets there.
+
+Sealed file, after decompression:
+
+    4 bytes   header length (little-endian)
+    header    JSON: month, count, users, devices, types, columns [[name, dtype, nbytes]]
+    columns   one raw array per column, rows sorted by (employee, time):
+                user       index into users
+                seconds    wall-clock seconds (biosync.shifts.epoch_seconds), delta-encoded
+                type       index into types ('check-in', 'check-out', ...)
+                status     device status code
+                collapsed  double taps merged into the punch
+                device     index into devices
+
+The summary lives in index.json, so reports never decompress a month:
+
+    records, employees, checkins, checkouts
+    perEmployee   {id: {name, records, checkins, checkouts, punchHash}}
+    report        biosync.analytics rows (shift schedule and workday hours
+                  in force when the month was sealed)
+
+Compression is zstd (pip install zstandard) when installed, gzip otherwise;
+BIOSYNC_ARCHIVE_CODEC=zstd|gzip forces one. A month is verified (decoded
+and compared record by record) before it leaves data/employees.
+
+    python -m biosync.archive seal [--before 2026-01] [--dry-run]
+    python -m biosync.archive list
+    python -m biosync.archive show 2025-12 [--employee 144]
+    python -m biosync.archive export 2025-12 --csv Attendance_2025-12.csv
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import os
+import struct
+import sys
+from datetime import datetime, timedelta
+
+from biosync import serializer
+from biosync.employee_store import DATA_DIR, drop_months, load_employees
+from biosync.punches import DEVICE_ID, Punch, make_record, punch_hash
+
+ARCHIVE_DIR = os.path.join('data', 'archive')
+INDEX_NAME = 'index.json'
+SINKS_NAME = 'sinks.json'
+SEAL_AFTER_DAYS = int(os.environ.get('BIOSYNC_SEAL_AFTER_DAYS', '7'))
+CODECS = ('zstd', 'gzip')
+FORMAT_VERSION = 1
+
+_HEADER_LENGTH = struct.Struct('<I')
+_EPOCH = datetime(1970, 1, 1)
+
+
+# ─── Compression ───────────────────────────────────────────────────
+
+def _zstd():
+    import zstandard
+
+    return (lambda data: zstandard.ZstdCompressor(level=19).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data))
+
+
+def _gzip():
+    return (lambda data: gzip.compress(data, compresslevel=9, mtime=0)), gzip.decompress
+
+
+_CODECS = {'zstd': _zstd, 'gzip': _gzip}
+_EXTENSIONS = {'zstd': 'zst', 'gzip': 'gz'}
+
+
+def codec(name=None):
+    """
+    (name, compress, decompress) for ``name``, or for the best installed
+    codec. Raises ImportError if ``name`` is not installed.
+    """
+    name = name or os.environ.get('BIOSYNC_ARCHIVE_CODEC') or None
+    if name and name not in _CODECS:
+        raise ValueError(f"Unknown archive codec '{name}', expected one of {CODECS}")
+    for candidate in (name,) if name else CODECS:
+        try:
+            return (candidate, *_CODECS[candidate]())
+        except ImportError:
+            if name:
+                raise
+
+
+def _atomic_write(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# ─── Index ─────────────────────────────────────────────────────────
+
+def load_index(archive_dir=ARCHIVE_DIR):
+    """{month: entry} of every sealed month (empty if nothing is sealed)."""
+    try:
+        return serializer.load(os.path.join(archive_dir, INDEX_NAME))['months']
+    except FileNotFoundError:
+        return {}
+
+
+def _save_index(months, archive_dir):
+    os.makedirs(archive_dir, exist_ok=True)
+    _atomic_write(os.path.join(archive_dir, INDEX_NAME),
+                  serializer.dumps({'version': FORMAT_VERSION, 'months': dict(sorted(months.items()))}))
+
+
+def seal_boundary(today=None, grace_days=None):
+    """First month that is still open: every month before it ('YYYY-MM') is closed."""
+    today = today or datetime.now()
+    grace_days = SEAL_AFTER_DAYS if grace_days is None else grace_days
+    return (today - timedelta(days=grace_days)).strftime('%Y-%m')
+
+
+def sync_start(start, archive_dir=ARCHIVE_DIR):
+    """
+    Where a sync reads the device log from: ``start``, or a day before the
+    first unsealed month (an overnight shift of the last sealed month still
+    has punches on its first day; the syncs drop them by shift month).
+    """
+    sealed = load_index(archive_dir)
+    if not sealed:
+        return start
+    last = datetime.strptime(max(sealed), '%Y-%m')
+    first_open = (last + timedelta(days=32)).replace(day=1)
+    return max(start, first_open - timedelta(days=1))
+
+
+def due_months(months, archive_dir=ARCHIVE_DIR, today=None):
+    """The closed, unsealed months among ``months`` (e.g. the months a sync just wrote)."""
+    boundary = seal_boundary(today)
+    sealed = load_index(archive_dir)
+    return sorted(month for month in set(months) if month < boundary and month not in sealed)
+
+
+def _load_sinks(archive_dir):
+    try:
+        return serializer.load(os.path.join(archive_dir, SINKS_NAME))
+    except FileNotFoundError:
+        return {}
+
+
+def unpushed_months(sink, archive_dir=ARCHIVE_DIR):
+    """The sealed months ``sink`` (e.g. 'firestore') has not received yet, oldest first."""
+    pushed = set(_load_sinks(archive_dir).get(sink, []))
+    return sorted(month for month in load_index(archive_dir) if month not in pushed)
+
+
+def mark_pushed(sink, months, archive_dir=ARCHIVE_DIR):
+    """Records that ``sink`` holds the sealed ``months`` (call it after a successful push)."""
+    if not months:
+        return
+    sinks = _load_sinks(archive_dir)
+    sinks[sink] = sorted(set(sinks.get(sink, [])) | set(months))
+    os.makedirs(archive_dir, exist_ok=True)
+    _atomic_write(os.path.join(archive_dir, SINKS_NAME), serializer.dumps(dict(sorted(sinks.items()))))
+
+
+# ─── Encoding ──────────────────────────────────────────────────────
+
+def _encode(month, records_by_user):
+    """{user_id: [record]} -> (raw file bytes before compression, row count)."""
+    import numpy as np  # only sealing and reading archived punches need it, not load_index()
+
+    users = sorted(records_by_user)
+    rows = [(u, r) for u, user_id in enumerate(users) for r in records_by_user[user_id]]
+    devices = sorted({r.get('deviceId', DEVICE_ID) for _, r in rows})
+    types = sorted({r['type'] for _, r in rows})
+    device_index = {d: i for i, d in enumerate(devices)}
+    type_index = {t: i for i, t in enumerate(types)}
+
+    user = np.array([u for u, _ in rows], np.uint32 if len(users) > 0xFFFF else np.uint16)
+    seconds = np.array([r['timestamp'][:19] for _, r in rows], dtype='datetime64[s]').astype(np.int64)
+    order = np.lexsort((seconds, user))  # stable: same-second records keep their order
+    columns = {
+        'user': user[order],
+        'seconds': np.diff(seconds[order], prepend=0).astype('<i8'),
+        'type': np.array([type_index[r['type']] for _, r in rows], np.uint8)[order],
+        'status': np.array([r.get('statusCode', 0) for _, r in rows], '<i2')[order],
+        'collapsed': np.array([r.get('collapsed', 0) for _, r in rows], '<u2')[order],
+        'device': np.array([device_index[r.get('deviceId', DEVICE_ID)] for _, r in rows], '<u2')[order],
+    }
+    header = serializer.dumps({
+        'version': FORMAT_VERSION,
+        'month': month,
+        'count': len(rows),
+        'users': users,
+        'devices': devices,
+        'types': types,
+        'columns': [[name, column.dtype.str, column.nbytes] for name, column in columns.items()],
+    }, pretty=False)
+    body = b''.join(column.tobytes() for column in columns.values())
+    return _HEADER_LENGTH.pack(len(header)) + header + body, len(rows)
+
+
+def _decode(raw):
+    """Raw file bytes -> (header, {column: numpy array}), seconds un-delta'd."""
+    import numpy as np
+
+    (length,) = _HEADER_LENGTH.unpack_from(raw)
+    header = serializer.loads(raw[_HEADER_LENGTH.size:_HEADER_LENGTH.size + length])
+    offset = _HEADER_LENGTH.size + length
+    columns = {}
+    for name, dtype, nbytes in header['columns']:
+        columns[name] = np.frombuffer(raw, dtype, nbytes // np.dtype(dtype).itemsize, offset)
+        offset += nbytes
+    columns['seconds'] = np.cumsum(columns['seconds'])
+    return header, columns
+
+
+def _records(header, columns):
+    """Decoded columns -> {user_id: [record]}, records as make_record() writes them."""
+    users, devices, types = header['users'], header['devices'], header['types']
+    by_user = {}
+    for u, seconds, t, status, collapsed, device in zip(
+            columns['user'].tolist(), columns['seconds'].tolist(), columns['type'].tolist(),
+            columns['status'].tolist(), columns['collapsed'].tolist(), columns['device'].tolist()):
+        user_id = users[u]
+        punch = Punch(user_id, _EPOCH + timedelta(seconds=seconds), status, devices[device], collapsed)
+        by_user.setdefault(user_id, []).append(make_record(punch, types[t]))
+    return by_user
+
+
+def _read_raw(month, archive_dir, entry=None):
+    entry = entry or load_index(archive_dir)[month]
+    with open(os.path.join(archive_dir, entry['file']), 'rb') as f:
+        data = f.read()
+    if hashlib.sha256(data).hexdigest() != entry['sha256']:
+        raise ValueError(f"Sealed month {month} is corrupt ({entry['file']}: checksum mismatch)")
+    return codec(entry['codec'])[2](data)
+
+
+# ─── Summary ───────────────────────────────────────────────────────
+
+def summarize(month, employees):
+    """Summary of one month; ``employees``: {user_id: {'profile', 'attendance': {month: [record]}}}."""
+    from biosync.analytics import PunchColumns, monthly_report
+
+    per_employee = {}
+    for user_id, data in sorted(employees.items()):
+        records = data['attendance'][month]
+        checkins = sum(1 for r in records if r['type'] == 'check-in')
+        checkouts = sum(1 for r in records if r['type'] == 'check-out')
+        per_employee[user_id] = {
+            'name': data['profile'].get('name', ''),
+            'records': len(records),
+            'checkins': checkins,
+            'checkouts': checkouts,
+            'punchHash': sum(punch_hash(user_id, r['timestamp']) for r in records),
+        }
+    return {
+        'records': sum(e['records'] for e in per_employee.values()),
+        'employees': len(per_employee),
+        'checkins': sum(e['checkins'] for e in per_employee.values()),
+        'checkouts': sum(e['checkouts'] for e in per_employee.values()),
+        'perEmployee': per_employee,
+        'report': monthly_report(PunchColumns.from_employees(employees, month), month),
+    }
+
+
+# ─── Sealing ───────────────────────────────────────────────────────
+
+def seal(data_dir=DATA_DIR, archive_dir=ARCHIVE_DIR, before=None, dry_run=False, codec_name=None):
+    """
+    Seals every month of ``data_dir`` before ``before`` ('YYYY-MM', default
+    seal_boundary()) and removes it from data_dir. Returns a list of
+    {month, records, employees, jsonBytes, bytes} for the months sealed.
+
+    A sealed month still in data_dir (an interrupted seal) is removed if it
+    matches the archive; otherwise it is left alone and reported as a conflict
+    (ValueError), like a month that does not survive the round trip.
+    """
+    before = before or seal_boundary()
+    name, compress, _ = codec(codec_name)
+    sealed = load_index(archive_dir)
+    employees = load_employees(data_dir)
+    months = sorted({m for data in employees.values() for m in data['attendance'] if m < before})
+
+    results = []
+    leftovers = []
+    for month in months:
+        members = {user_id: data for user_id, data in employees.items() if data['attendance'].get(month)}
+        if month in sealed:
+            stored = sealed[month]['summary']['perEmployee']
+            if any(stored.get(user_id, {}).get('punchHash') != sum(
+                    punch_hash(user_id, r['timestamp']) for r in data['attendance'][month])
+                    for user_id, data in members.items()):
+                raise ValueError(f"{month} is sealed but data/employees holds different records for it")
+            leftovers.append(month)
+            continue
+        if not members:
+            leftovers.append(month)  # only empty lists left
+            continue
+
+        records_by_user = {user_id: data['attendance'][month] for user_id, data in members.items()}
+        raw, count = _encode(month, records_by_user)
+        decoded = _records(*_decode(raw))
+        for user_id, records in records_by_user.items():
+            if decoded[user_id] != sorted(records, key=lambda r: r['timestamp']):
+                raise ValueError(f"{month}: employee {user_id}'s records do not round-trip; not sealed")
+
+        data = compress(raw)
+        json_bytes = sum(len(serializer.dumps(records)) for records in records_by_user.values())
+        results.append({'month': month, 'records': count, 'employees': len(members),
+                        'jsonBytes': json_bytes, 'bytes': len(data)})
+        if dry_run:
+            continue
+        filename = f"{month}.{_EXTENSIONS[name]}"
+        os.makedirs(archive_dir, exist_ok=True)
+        _atomic_write(os.path.join(archive_dir, filename), data)
+        sealed[month] = {
+            'file': filename,
+            'codec': name,
+            'records': count,
+            'employees': len(members),
+            'bytes': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'sealedAt': datetime.now().isoformat(timespec='seconds'),
+            'summary': summarize(month, members),
+        }
+        _save_index(sealed, archive_dir)
+
+    if not dry_run:
+        drop_months([r['month'] for r in results] + leftovers, data_dir)
+    return results
+
+
+# ─── Queries ───────────────────────────────────────────────────────
+
+def summary(month, archive_dir=ARCHIVE_DIR):
+    """Precomputed summary of a sealed month (no decompression), or None."""
+    entry = load_index(archive_dir).get(month)
+    return entry['summary'] if entry else None
+
+
+def read_month(month, archive_dir=ARCHIVE_DIR):
+    """{user_id: [record]} of a sealed month (KeyError if it is not sealed)."""
+    return _records(*_decode(_read_raw(month, archive_dir)))
+
+
+def punches(archive_dir=ARCHIVE_DIR, months=None):
+    """Every sealed punch (or those of ``months``), month by month (e.g. to rebuild data/punches.bin)."""
+    for month, entry in load_index(archive_dir).items():
+        if months is not None and month not in months:
+            continue
+        header, columns = _decode(_read_raw(month, archive_dir, entry))
+        users, devices = header['users'], header['devices']
+        for u, seconds, status, collapsed, device in zip(
+                columns['user'].tolist(), columns['seconds'].tolist(), columns['status'].tolist(),
+                columns['collapsed'].tolist(), columns['device'].tolist()):
+            yield Punch(users[u], _EPOCH + timedelta(seconds=seconds), status, devices[device], collapsed)
+
+
+def write_csv(month, path, archive_dir=ARCHIVE_DIR):
+    """A sealed month in py.py's Attendance_YYYY-MM.csv format (biosync.importer reads it back)."""
+    names = {user_id: e['name'] for user_id, e in summary(month, archive_dir)['perEmployee'].items()}
+    rows = [[user_id, names.get(user_id, 'Unknown'), f"{r['date']} {r['time']}", r['statusCode']]
+            for user_id, records in read_month(month, archive_dir).items() for r in records]
+    rows.sort(key=lambda row: row[2])
+    with open(path, mode='w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['رقم الموظف', 'الاسم', 'الوقت والتاريخ', 'الحالة'])
+        writer.writerows(rows)
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sealed-month archive (data/archive)')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    seal_cmd = sub.add_parser('seal', help='seal every closed month of data/employees')
+    seal_cmd.add_argument('--data-dir', default=DATA_DIR)
+    seal_cmd.add_argument('--before', help='YYYY-MM: seal the months before this one (default: closed months)')
+    seal_cmd.add_argument('--codec', choices=CODECS)
+    seal_cmd.add_argument('--dry-run', action='store_true')
+    sub.add_parser('list', help='sealed months')
+    show = sub.add_parser('show', help="a sealed month's summary, or one employee's records")
+    show.add_argument('month')
+    show.add_argument('--employee')
+    export = sub.add_parser('export', help='a sealed month as CSV/JSON')
+    export.add_argument('month')
+    export.add_argument('--csv')
+    export.add_argument('--json')
+    args = parser.parse_args(argv)
+
+    if args.command == 'seal':
+        results = seal(args.data_dir, args.archive_dir, args.before, args.dry_run, args.codec)
+        for r in results:
+            print(f"✓ {r['month']}: {r['records']} سجل، {r['employees']} موظف  "
+                  f"{r['jsonBytes']:,} -> {r['bytes']:,} bytes ({r['jsonBytes'] / max(r['bytes'], 1):.1f}x)")
+        print(f"{len(results)} شهر" + (" (تجربة فقط)" if args.dry_run else f" -> {args.archive_dir}"))
+        return 0
+
+    sealed = load_index(args.archive_dir)
+    if args.command == 'list':
+        for month, entry in sealed.items():
+            s = entry['summary']
+            print(f"{month}  {entry['records']:>7} سجل  {entry['employees']:>4} موظف  "
+                  f"دخول {s['checkins']:>6}  خروج {s['checkouts']:>6}  {entry['bytes']:>9,} bytes ({entry['codec']})")
+        print(f"{len(sealed)} شهر مغلق")
+        return 0
+
+    if args.month not in sealed:
+        print(f"✗ {args.month} غير مؤرشف")
+        return 1
+    if args.command == 'show':
+        if args.employee:
+            for r in read_month(args.month, args.archive_dir).get(args.employee, []):
+                print(f"{r['date']} {r['time']}  {r['type']:<10} status={r['statusCode']}")
+            return 0
+        for row in sealed[args.month]['summary']['report']:
+            print(f"{row['employeeId']:>6}  {row['employeeName'][:28]:<28} حضور: {row['daysPresent']:>2}  "
+                  f"تأخير: {row['lateDays']:>2}  ساعات: {row['totalHours']:>7.2f}  بدون خروج: {row['missingCheckouts']:>2}")
+        return 0
+
+    if args.csv:
+        print(f"✓ {write_csv(args.month, args.csv, args.archive_dir)} سجل -> {args.csv}")
+    if args.json:
+        with open(args.json, 'wb') as f:
+            f.write(serializer.dumps(read_month(args.month, args.archive_dir)))
+        print(f"✓ {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
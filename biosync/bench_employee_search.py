@@ -0,0 +1,115 @@
+"""
+Benchmark: employee search index
+================================
+Synthetic roster in the device's naming styles ("JanjanBaltazar",
+"mu_Suzan_Nia", "noor jahan mohammad", Arabic names), searched with the
+index and with the frontend's linear filter (lowercase substring on name
+and id, per keystroke).
+
+    python -m biosync.bench_employee_search
+    python -m biosync.bench_employee_search --employees 20000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from biosync.employee_search import EmployeeIndex
+
+FIRST = ['Anwar', 'Ghulam', 'Robi', 'Shamsu', 'Janjan', 'Irfan', 'Danilo', 'Muhammad', 'Raul',
+         'Ripon', 'Suzan', 'Noor', 'Abdul', 'Ahmed', 'Maria', 'أحمد', 'محمد', 'علي', 'فاطمة', 'خالد']
+LAST = ['Hussain', 'Ali', 'Uddin', 'Baltazar', 'Bashir', 'Bati', 'Anees', 'Maola', 'Tirao',
+        'Khondkakar', 'Nia', 'Jahan', 'Rahman', 'Santos', 'الحسين', 'العلي', 'الزهراني', 'عبدالله']
+SYLLABLES = ['ka', 'ro', 'mi', 'dan', 'sha', 'bal', 'ta', 'zar', 'nu', 'ri', 'han', 'lo', 'fa', 'qas',
+             'mo', 'ten', 'gul', 'ar', 'vi', 'sen']
+STYLES = [
+    lambda a, b: f"{a}{b}",
+    lambda a, b: f"{a.lower()}_{b}",
+    lambda a, b: f"{a} {b}",
+    lambda a, b: f"{a.lower()}  {b.lower()}",
+    lambda a, b: f"{a.upper()} {b}",
+]
+
+QUERIES = ['anw', 'ghulam hus', 'baltazar', 'suzan nia', 'tazar', 'baltasar', 'محمد', 'احمد',
+           '14', '1234', 'noor jahan', 'x']
+
+
+def _last_name(rnd):
+    if rnd.random() < 0.3:
+        return rnd.choice(LAST)
+    return ''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))).capitalize()
+
+
+def roster(count, seed=1):
+    rnd = random.Random(seed)
+    return [{
+        'id': str(i),
+        'name': rnd.choice(STYLES)(rnd.choice(FIRST), _last_name(rnd)),
+        'department': 'Not Specified',
+        'position': 'Staff',
+    } for i in range(1, count + 1)]
+
+
+def linear_filter(employees, term):
+    term = term.lower()
+    return [e for e in employees if term in e['name'].lower() or term in e['id'].lower()]
+
+
+def _latency(fn, queries, repeat):
+    times = []
+    for _ in range(repeat):
+        for query in queries:
+            t0 = time.perf_counter()
+            fn(query)
+            times.append(time.perf_counter() - t0)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99) - 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Employee search index benchmark')
+    parser.add_argument('--employees', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    employees = roster(args.employees)
+    t0 = time.perf_counter()
+    index = EmployeeIndex(employees)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index.refresh(employees)
+    unchanged = time.perf_counter() - t0
+
+    changed = [dict(e) for e in employees[5:]] + roster(5, seed=2)  # 5 removed, ids 1-5 re-added
+    for e in changed[:10]:
+        e['name'] += ' Jr'
+    t0 = time.perf_counter()
+    reindexed = index.refresh(changed)
+    incremental = time.perf_counter() - t0
+
+    print("="*70)
+    print(f"{args.employees:,} employees")
+    print(f"  build:                 {build * 1000:8.1f} ms")
+    print(f"  refresh (unchanged):   {unchanged * 1e6:8.1f} µs")
+    print(f"  refresh ({reindexed} changed):  {incremental * 1000:8.2f} ms")
+    print("="*70)
+    print(f"{'':<22}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for name, fn in (('index.search', lambda q: index.search(q, 20)),
+                     ('linear filter', lambda q: linear_filter(changed, q))):
+        p50, p99 = _latency(fn, QUERIES, args.repeat)
+        print(f"{name:<22}{p50 * 1000:>12.3f}{p99 * 1000:>12.3f}")
+    print("="*70)
+    for query in QUERIES[:8]:
+        top = index.search(query, 3)
+        print(f"{query!r:>14} -> " + ', '.join(f"{r['name']} ({r['score']})" for r in top))
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Benchmark: binary punch log vs data/employees/*.json
+====================================================
+Answers the dashboard's hot queries ("today", "this week", "one employee
+this week") both ways:
+
+    json  load every emp_*.json, then filter records by timestamp
+    log   PunchLog.range(): bisect on the mmapped epoch column
+
+Runs on a synthetic data set (written to a temp dir), or on the real
+data/employees with --real (the log is built from it first).
+
+    python -m biosync.bench_punch_log
+    python -m biosync.bench_punch_log --employees 500 --days 365
+    python -m biosync.bench_punch_log --real
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from biosync.employee_store import DATA_DIR, load_employees, new_employee, save_employee
+from biosync.punch_log import PunchLog, punches_from_employees
+from biosync.punches import Punch, make_record
+
+
+def generate(data_dir, employees, days, per_day, seed=1):
+    """Synthetic employee files: ``per_day`` punches per employee per day, oldest first."""
+    rnd = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    os.makedirs(data_dir, exist_ok=True)
+    for e in range(1, employees + 1):
+        data = new_employee(str(e), f"Employee {e}")
+        for d in range(days):
+            day = start + timedelta(days=d)
+            for seconds in sorted(rnd.sample(range(5 * 3600, 20 * 3600), per_day)):
+                ts = day + timedelta(seconds=seconds)
+                record_type = 'check-in' if ts.hour < 15 else 'check-out'
+                data['attendance'].setdefault(ts.strftime('%Y-%m'), []).append(
+                    make_record(Punch(str(e), ts, 15), record_type))
+        save_employee(data, data_dir)
+
+
+def _json_query(data_dir, start, end, user_id=None):
+    lo, hi = start.isoformat(), end.isoformat()
+    out = []
+    for emp_id, data in load_employees(data_dir).items():
+        if user_id is not None and emp_id != user_id:
+            continue
+        for records in data['attendance'].values():
+            out.extend(r for r in records if lo <= r['timestamp'] < hi)
+    return out
+
+
+def _timed(fn, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), len(result)
+
+
+def run(data_dir, log_path, repeat):
+    employees = load_employees(data_dir)
+    t0 = time.perf_counter()
+    log = PunchLog(log_path)
+    count = log.rebuild(punches_from_employees(employees))
+    build = time.perf_counter() - t0
+
+    last = max(r['timestamp'] for data in employees.values()
+               for records in data['attendance'].values() for r in records)
+    today = datetime.fromisoformat(last).replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+    week = today - timedelta(days=6)
+    some_user = next(iter(employees))
+    json_bytes = sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir))
+
+    print("="*70)
+    print(f"{len(employees)} employees, {count:,} punches")
+    print(f"  json: {json_bytes / 1e6:8.1f} MB in {len(employees)} files")
+    print(f"  log:  {os.path.getsize(log_path) / 1e6:8.1f} MB (built in {build:.2f}s)")
+    print("="*70)
+    print(f"{'query':<28}{'json (ms)':>12}{'log (ms)':>12}{'speedup':>10}{'rows':>8}")
+    queries = [
+        ('today', today, tomorrow, None),
+        ('this week', week, tomorrow, None),
+        (f'employee {some_user} this week', week, tomorrow, some_user),
+    ]
+    for name, start, end, user_id in queries:
+        t_json, n_json = _timed(lambda: _json_query(data_dir, start, end, user_id), repeat)
+        t_log, n_log = _timed(lambda: log.range(start, end, user_id), repeat)
+        assert n_json == n_log, (name, n_json, n_log)
+        print(f"{name:<28}{t_json * 1000:>12.2f}{t_log * 1000:>12.3f}{t_json / t_log:>9.0f}x{n_log:>8}")
+    print("="*70)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Binary punch log vs JSON range-query benchmark')
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--per-day', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--real', action='store_true', help=f'use {DATA_DIR} instead of synthetic data')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'punches.bin')
+        if args.real:
+            run(DATA_DIR, log_path, args.repeat)
+        else:
+            data_dir = os.path.join(tmp, 'employees')
+            print(f"Generating {args.employees} x {args.days} days x {args.per_day} punches...")
+            generate(data_dir, args.employees, args.days, args.per_day)
+            run(data_dir, log_path, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
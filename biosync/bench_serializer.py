@@ -0,0 +1,120 @@
+"""
+Benchmark: JSON serialization backends
+======================================
+A 100k-record export, encoded the old way and through biosync.serializer
+with every installed backend:
+
+    employee files   one document per employee (save_employee)
+    proxy payload    {"success": ..., "records": [...]} (/api/sync, /api/records)
+    parse            employee files read back (load_employees, importer)
+
+"before" is what the code did until now: json.dump(indent=2) for files,
+Flask's default jsonify (sorted keys, ASCII escapes) and json.dumps for
+the ASGI proxy.
+
+    python -m biosync.bench_serializer
+    python -m biosync.bench_serializer --records 500000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from biosync import serializer
+from biosync.employee_store import new_employee
+from biosync.punches import Punch, make_record
+
+
+def generate(records, employees=250):
+    """``records`` punches spread over ``employees`` employee documents."""
+    docs = [new_employee(str(e), f"موظف {e}") for e in range(1, employees + 1)]
+    start = datetime(2026, 1, 1, 6, 0)
+    for i in range(records):
+        data = docs[i % employees]
+        ts = start + timedelta(minutes=7 * (i // employees))
+        record_type = 'check-in' if ts.hour < 15 else 'check-out'
+        punch = Punch(data['profile']['id'], ts, 15, collapsed=1 if i % 17 == 0 else 0)
+        data['attendance'].setdefault(ts.strftime('%Y-%m'), []).append(make_record(punch, record_type))
+    return docs
+
+
+def _timed(fn, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def _size(result):
+    return sum(len(chunk) for chunk in result) if isinstance(result, list) else len(result)
+
+
+def run(records, repeat):
+    docs = generate(records)
+    payload = {
+        'success': True,
+        'records': [r for data in docs for month in data['attendance'].values() for r in month],
+        'timestamp': datetime.now().isoformat(),
+    }
+    files_pretty = [json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8') for data in docs]
+
+    cases = [
+        ('before', 'employee files', lambda: [json.dumps(d, ensure_ascii=False, indent=2).encode('utf-8')
+                                              for d in docs]),
+        ('before', 'proxy (flask)', lambda: json.dumps(payload, sort_keys=True, separators=(',', ':'))
+                                            .encode('utf-8')),
+        ('before', 'proxy (asgi)', lambda: json.dumps(payload, ensure_ascii=False).encode('utf-8')),
+        ('before', 'parse files', lambda: [json.loads(f) for f in files_pretty]),
+    ]
+    for backend in serializer.available():
+        serializer.use(backend)
+        dumps, loads = serializer.dumps, serializer.loads
+        files = [dumps(d) for d in docs]
+        cases += [
+            (backend, 'employee files', lambda dumps=dumps: [dumps(d) for d in docs]),
+            (backend, 'employee files (pretty)', lambda dumps=dumps: [dumps(d, pretty=True) for d in docs]),
+            (backend, 'proxy payload', lambda dumps=dumps: dumps(payload, pretty=False)),
+            (backend, 'parse files', lambda loads=loads, files=files: [loads(f) for f in files]),
+        ]
+    serializer.use()
+
+    print("="*70)
+    print(f"{len(payload['records']):,} records, {len(docs)} employees")
+    print("="*70)
+    print(f"{'backend':<10}{'case':<26}{'ms':>10}{'MB':>10}{'vs before':>12}")
+    before = {}
+    for backend, case, fn in cases:
+        seconds, result = _timed(fn, repeat)
+        key = 'employee files' if case.startswith('employee files') else case
+        key = 'proxy (flask)' if case == 'proxy payload' else key
+        if backend == 'before':
+            before.setdefault(key, seconds)
+            speedup = ''
+        else:
+            speedup = f"{before[key] / seconds:.1f}x"
+        size = '' if case == 'parse files' else f"{_size(result) / 1e6:.1f}"
+        print(f"{backend:<10}{case:<26}{seconds * 1000:>10.1f}{size:>10}{speedup:>12}")
+    print("="*70)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='JSON serialization benchmark (biosync.serializer)')
+    parser.add_argument('--records', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+    print(f"Backends: {', '.join(serializer.available())} (default: {serializer.BACKEND})")
+    run(args.records, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
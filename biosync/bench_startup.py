@@ -0,0 +1,118 @@
+"""
+Benchmark: CLI startup
+======================
+What each ``biosync`` command imports before it does any work, measured
+with ``python -X importtime`` in a fresh interpreter (the CLI plus the
+command's module, minus what a bare interpreter already loads), and the
+wall-clock cost of that startup.
+
+Fails (exit 1) when a command loads a heavy dependency it must not:
+``report``/``inspect`` never need zk, firebase_admin or numpy, and no
+command needs them at import time - they are imported inside the
+functions that talk to the device, Firestore or the archive columns.
+
+    python -m biosync.bench_startup
+    python -m biosync.bench_startup --budget-ms 60     # also fail above 60 ms of imports
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# command -> module it imports when it runs (biosync.cli handlers)
+COMMANDS = {
+    'pull': 'biosync.local_sync',
+    'export-json': 'biosync.local_sync',
+    'export-csv': 'biosync.csv_export',
+    'push-firestore': 'biosync.firestore_push',
+    'report': 'biosync.reports',
+    'inspect': 'biosync.reports',
+}
+HEAVY = ('zk', 'firebase_admin', 'google.cloud.firestore', 'numpy')
+
+
+def _importtime(code):
+    """{module: cumulative µs} for ``python -X importtime -c code``."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):  # top level only: nested imports are in its cumulative time
+            times[name.strip()] = int(cumulative)
+        else:
+            times.setdefault(name.strip(), 0)
+    return times
+
+
+def _wall_ms(code, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def profile(module, repeat=5, baseline=None):
+    """(import ms, wall ms above a bare interpreter, loaded modules) of ``biosync.cli`` + ``module``."""
+    baseline = baseline if baseline is not None else _importtime('pass')
+    code = f'import biosync.cli, {module}'
+    times = _importtime(code)
+    loaded = set(times) - set(baseline)
+    import_ms = sum(us for name, us in times.items() if name not in baseline) / 1000
+    wall_ms = _wall_ms(code, repeat) - _wall_ms('pass', repeat)
+    return import_ms, wall_ms, loaded
+
+
+def heavy_modules(loaded):
+    return [heavy for heavy in HEAVY if any(name == heavy or name.startswith(heavy + '.') for name in loaded)]
+
+
+def reference_ms(module):
+    """Import cost of a heavy dependency on its own (None if it is not installed)."""
+    try:
+        times = _importtime(f'import {module}')
+    except subprocess.CalledProcessError:
+        return None
+    baseline = _importtime('pass')
+    return sum(us for name, us in times.items() if name not in baseline) / 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Startup cost of each biosync command')
+    parser.add_argument('--repeat', type=int, default=5, help='wall-clock samples per command')
+    parser.add_argument('--budget-ms', type=float, help='fail when a command imports for longer than this')
+    args = parser.parse_args(argv)
+
+    baseline = _importtime('pass')
+    failures = []
+    print(f"{'command':<16}{'imports ms':>12}{'wall ms':>10}  heavy modules loaded")
+    for command, module in COMMANDS.items():
+        import_ms, wall_ms, loaded = profile(module, args.repeat, baseline)
+        heavy = heavy_modules(loaded)
+        print(f"{command:<16}{import_ms:>12.1f}{wall_ms:>10.1f}  {', '.join(heavy) or '-'}")
+        if heavy:
+            failures.append(f"{command}: imports {', '.join(heavy)} at startup")
+        if args.budget_ms is not None and import_ms > args.budget_ms:
+            failures.append(f"{command}: {import_ms:.1f} ms of imports > {args.budget_ms} ms")
+
+    print("\nWhat the lazy imports save (import on its own):")
+    for module in HEAVY:
+        ms = reference_ms(module)
+        print(f"  {module:<24}{'not installed' if ms is None else f'{ms:.1f} ms'}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+biosync command line
+====================
+One entry point for the jobs that used to be separate scripts:
+
+    biosync pull             device -> data/employees, smart check-in/out   (sync_smart.py)
+    biosync export-json      device -> data/employees, cutoff rule          (sync_simple.py)
+    biosync export-csv       device -> Attendance_<month>.csv + full report (py.py)
+    biosync push-firestore   device -> Firestore                            (sync_to_firebase.py)
+    biosync report           check-in/check-out report of the local store   (report_checkin_checkout.py)
+    biosync inspect          one employee's month                           (check_data.py)
+
+and the module tools (``biosync archive list`` = ``python -m biosync.archive list``):
+analytics, archive, import, punch-log, reconcile, scheduler.
+
+``python -m biosync ...`` works without installing; ``pip install -e .``
+adds the ``biosync`` command.
+
+Startup: this module imports only the standard library. Each command imports
+its own module when it runs, so ``zk``, ``firebase_admin`` and ``numpy``
+are only loaded by the commands that use them - ``report`` and ``inspect``
+never touch them. ``python -m biosync.bench_startup`` measures it with
+``-X importtime`` and fails when a command pulls in a module it must not.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+ZK_IP = '10.10.1.127'
+ZK_PORT = 4370
+START_FILTER = '2025-12-01'
+
+# module tools: command -> module whose main(argv) takes the remaining arguments
+TOOLS = {
+    'analytics': 'biosync.analytics',
+    'archive': 'biosync.archive',
+    'import': 'biosync.importer',
+    'punch-log': 'biosync.punch_log',
+    'reconcile': 'biosync.reconcile',
+    'scheduler': 'biosync.scheduler',
+}
+
+
+def _profile_argv(args):
+    """--profile[=MODE] back into the form Profiler.from_argv() reads."""
+    if args.profile is None:
+        return []
+    return ['--profile'] if args.profile == '' else [f'--profile={args.profile}']
+
+
+def _pull(args, method='smart'):
+    from biosync.local_sync import sync
+    return sync(args.ip, args.port, datetime.fromisoformat(args.since), method,
+                'sharded' if args.sharded else None, profile_argv=_profile_argv(args))
+
+
+def _export_json(args):
+    return _pull(args, method='simple')
+
+
+def _export_csv(args):
+    from biosync.csv_export import export
+    return export(args.ip, args.port, monthly=args.only != 'full', full=args.only != 'monthly',
+                  out_dir=args.out_dir)
+
+
+def _push_firestore(args):
+    from biosync.firestore_push import FIREBASE_KEY_PATH, push
+    return push(args.ip, args.port, datetime.fromisoformat(args.since),
+                args.firebase_key or FIREBASE_KEY_PATH, profile_argv=_profile_argv(args))
+
+
+def _report(args):
+    from biosync.reports import checkin_checkout
+    return checkin_checkout(args.data_dir, args.archive_dir)
+
+
+def _inspect(args):
+    from biosync.reports import inspect
+    return inspect(args.employee, args.month, args.limit, args.data_dir, args.archive_dir)
+
+
+def add_device_arguments(parser, since=True):
+    """--ip/--port (and --since) with the project defaults; also used by the module tools."""
+    parser.add_argument('--ip', default=ZK_IP)
+    parser.add_argument('--port', type=int, default=ZK_PORT)
+    if since:
+        parser.add_argument('--since', default=START_FILTER,
+                            help='YYYY-MM-DD (sealed months are skipped either way)')
+
+
+def _profile_mode(spec):
+    """argparse type of --profile: rejects an unknown mode before the command runs."""
+    from biosync.profiling import parse_mode  # only when --profile is given
+    try:
+        parse_mode(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
+
+
+def _profile_argument(parser):
+    parser.add_argument('--profile', nargs='?', const='', type=_profile_mode, metavar='MODE',
+                        help='profile the run (sample | cprofile, +alloc for tracemalloc), see biosync.profiling')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='biosync', description='BioSync jobs (READ-ONLY towards the device)')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    for name, handler, help_text in (
+            ('pull', _pull, 'device -> data/employees, smart check-in/check-out (sync_smart.py)'),
+            ('export-json', _export_json, 'device -> data/employees, cutoff rule (sync_simple.py)')):
+        sub = commands.add_parser(name, help=help_text)
+        add_device_arguments(sub)
+        sub.add_argument('--sharded', action='store_true', help='one file per employee per month')
+        _profile_argument(sub)
+        sub.set_defaults(handler=handler)
+
+    sub = commands.add_parser('export-csv', help='device -> monthly CSVs and the full report (py.py)')
+    add_device_arguments(sub, since=False)
+    sub.add_argument('--only', choices=('monthly', 'full'), help='write just one of the two exports')
+    sub.add_argument('--out-dir', default='.')
+    sub.set_defaults(handler=_export_csv)
+
+    sub = commands.add_parser('push-firestore', help='device -> Firestore (sync_to_firebase.py)')
+    add_device_arguments(sub)
+    sub.add_argument('--firebase-key', help='service account JSON')
+    _profile_argument(sub)
+    sub.set_defaults(handler=_push_firestore)
+
+    sub = commands.add_parser('report', help='check-in/check-out report of the local store')
+    sub.add_argument('--data-dir', default='data/employees')
+    sub.add_argument('--archive-dir', default='data/archive', help='sealed months of --data-dir')
+    sub.set_defaults(handler=_report)
+
+    sub = commands.add_parser('inspect', help="one employee's month from the store or the archive")
+    sub.add_argument('--employee', default='1')
+    sub.add_argument('--month', default=START_FILTER[:7], help='YYYY-MM')
+    sub.add_argument('--limit', type=int, default=10, help='check-outs to list')
+    sub.add_argument('--data-dir', default='data/employees')
+    sub.add_argument('--archive-dir', default='data/archive', help='sealed months of --data-dir')
+    sub.set_defaults(handler=_inspect)
+
+    for name, module in TOOLS.items():
+        commands.add_parser(name, help=f'python -m {module} ...', add_help=False)  # listed in --help only
+    return parser
+
+
+def main(argv=None):
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    if argv and argv[0] in TOOLS:
+        # the tool parses its own arguments (including --help)
+        from importlib import import_module
+        return import_module(TOOLS[argv[0]]).main(argv[1:])
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+CSV exports
+===========
+``biosync export-csv`` (py.py): the raw device log as spreadsheets, read
+in one device session.
+
+    monthly   Attendance_<YYYY-MM>.csv per month, from START_MONTHLY
+    full      Full_Attendance_Report_UpTo_<today>.csv, from START_FULL,
+              with the status code and its check-in/check-out meaning
+
+Sealed months are skipped (python -m biosync.archive export <month> --csv
+writes those). ``zk`` is imported by export() itself.
+"""
+
+import csv
+import os
+from datetime import datetime
+
+from biosync.archive import load_index, sync_start
+from biosync.firestore_store import record_type
+from biosync.metrics import Run
+from biosync.user_directory import UserDirectory
+
+START_MONTHLY = datetime(2026, 1, 1)
+START_FULL = datetime(2025, 12, 1)
+
+
+def write_monthly(attendances, user_map, out_dir, run):
+    """Attendance_<month>.csv per open month; returns {month: rows}."""
+    sealed = load_index()
+    start_date = sync_start(START_MONTHLY)
+    records_by_month = {}
+
+    for log in attendances:
+        if log.timestamp >= start_date:
+            # مفتاح الشهر (مثلاً: 2026-01)
+            month_key = log.timestamp.strftime('%Y-%m')
+            if month_key in sealed:
+                continue
+            # إضافة البيانات مع الاسم
+            records_by_month.setdefault(month_key, []).append([
+                log.user_id,
+                user_map.get(log.user_id, "Unknown"),
+                log.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                log.status
+            ])
+
+    for month, records in records_by_month.items():
+        filename = os.path.normpath(os.path.join(out_dir, f"Attendance_{month}.csv"))
+        with open(filename, mode='w', newline='', encoding='utf-8-sig') as file:
+            writer = csv.writer(file)
+            writer.writerow(['رقم الموظف', 'الاسم', 'الوقت والتاريخ', 'الحالة'])
+            writer.writerows(records)
+            run.size('csv_files', file.tell())
+        run.count('written_records', len(records))
+        print(f"✔ تم إنشاء ملف شهر {month} بنجاح: {len(records)} حركة.")
+    return {month: len(records) for month, records in records_by_month.items()}
+
+
+def write_full(attendances, user_map, out_dir, run):
+    """Full_Attendance_Report_UpTo_<today>.csv; returns (filename, rows)."""
+    sealed = load_index()
+    start_filter = sync_start(START_FULL)
+    # اسم الملف سيكون باسم اليوم لتعرف متى استخرجته
+    current_today = datetime.now().strftime('%Y-%m-%d')
+    filename = os.path.normpath(os.path.join(out_dir, f"Full_Attendance_Report_UpTo_{current_today}.csv"))
+
+    with open(filename, mode='w', newline='', encoding='utf-8-sig') as file:
+        writer = csv.writer(file)
+        writer.writerow(['رقم الموظف', 'الاسم', 'التاريخ', 'الساعة والوقت', 'الحالة برقمها', 'نوع الحركة'])
+
+        counter = 0
+        for log in attendances:
+            if log.timestamp >= start_filter and log.timestamp.strftime('%Y-%m') not in sealed:
+                writer.writerow([
+                    log.user_id,                         # ID
+                    user_map.get(log.user_id, "Unknown"), # الاسم
+                    log.timestamp.strftime('%Y-%m-%d'),  # اليوم
+                    log.timestamp.strftime('%H:%M:%S'),  # الساعة والدقيقة والثانية
+                    log.status,                          # الكود الأصلي للجهاز (للأمانة)
+                    record_type(log.status)[1]           # شرح الحالة (دخول/خروج)
+                ])
+                counter += 1
+        run.size('csv_files', file.tell())
+
+    run.count('written_records', counter)
+    print(f"✔ تم بنجاح! الملف جاهز باسم: {filename}")
+    print(f"✔ إجمالي السجلات المستخرجة: {counter} سجل.")
+    return filename, counter
+
+
+def export(ip, port, monthly=True, full=True, out_dir='.'):
+    """Reads the device once and writes the requested CSVs. Returns 0, or 1 on failure."""
+    from zk import ZK
+
+    zk = ZK(ip, port=port, timeout=15)
+    conn = None
+    run = Run('export_csv')
+
+    try:
+        print(f"Connecting to {ip}...")
+        conn = zk.connect()
+        run.lap('connect')
+
+        # 1. سحب الأسماء لربطها بالـ ID
+        print("Reading employee names...")
+        user_map = UserDirectory()
+        user_map.refresh(conn)
+        run.lap('get_users')
+
+        # 2. سحب جميع البصمات (قراءة فقط)
+        print("Reading attendance logs...")
+        attendances = conn.get_attendance()
+        run.lap('get_attendance')
+        run.count('device_records', len(attendances))
+
+        # 3. ترتيب البصمات زمنياً (من الأقدم للأحدث)
+        attendances.sort(key=lambda x: x.timestamp)
+
+        os.makedirs(out_dir, exist_ok=True)
+        if monthly:
+            write_monthly(attendances, user_map, out_dir, run)
+        if full:
+            write_full(attendances, user_map, out_dir, run)
+        run.lap('write')
+        print("\n--- انتهى العمل بنجاح ---")
+
+    except Exception as e:
+        print(f"❌ خطأ: {e}")
+        run.finish('error')
+    finally:
+        if conn:
+            conn.enable_device()  # التأكد أن الجهاز يعمل للموظفين
+            conn.disconnect()
+            print("Device connection closed safely.")
+        run.finish()
+        run.write_json_line()
+
+    return 0 if run.status == 'ok' else 1
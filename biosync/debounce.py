@@ -0,0 +1,96 @@
+"""
+Double-tap debounce
+===================
+Employees often tap twice within a few seconds. This stage collapses every
+punch by the same user with the same punch state (``Punch.punch_state``,
+the device's in/out code) within ``window`` seconds of the punch it keeps
+(the first tap) into that punch, and records how many taps it absorbed in
+``Punch.collapsed`` (stored as "collapsed" in the JSON record). A check-in
+followed by a check-out is never merged, however close together - unless
+both fall in the same second: a user's punches in one second are one punch
+whatever their states (records are identified by user + second), and the
+first one is kept.
+
+It is a single sweep over a time-sorted punch stream: a FIFO of held
+punches (at most one per user and state) is flushed as soon as their window
+has passed, so output stays time-sorted, work is O(n) and memory is O(users).
+
+Window: BIOSYNC_DEBOUNCE_SECONDS (default 60; 0 = exact same-second
+duplicates only). A value that is not a non-negative number is reported and
+the default is used.
+"""
+
+import math
+import os
+from collections import deque
+from datetime import timedelta
+
+DEFAULT_WINDOW = 60
+
+
+def window_from_env(var='BIOSYNC_DEBOUNCE_SECONDS', default=DEFAULT_WINDOW):
+    """Seconds from ``var``; unset/empty -> ``default``, invalid -> ``default`` with a warning."""
+    value = os.environ.get(var, '').strip()
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = math.nan
+    if not seconds >= 0 or math.isinf(seconds):
+        print(f"⚠️  {var}={value!r} is not a number of seconds, using {default}")
+        return default
+    return int(seconds) if seconds.is_integer() else seconds
+
+
+DEBOUNCE_SECONDS = window_from_env()
+
+
+class DebounceStats:
+    def __init__(self):
+        self.kept = 0
+        self.collapsed = 0
+
+    def as_dict(self):
+        return {'kept': self.kept, 'collapsed': self.collapsed}
+
+
+def debounce(punches, window=None, stats=None):
+    """
+    Yields the kept punches of a time-sorted stream, in time order, with
+    ``collapsed`` set to the number of taps merged into each (same state
+    within the window, or any state in the same second).
+    """
+    window = DEBOUNCE_SECONDS if window is None else window
+    stats = stats if stats is not None else DebounceStats()
+    span = timedelta(seconds=max(window, 0))
+    held = {}        # (user_id, punch_state) -> [punch, collapsed count]
+    queue = deque()  # held entries in the order they were opened = time order
+    last = {}        # user_id -> (second, entry) of the user's latest held punch
+
+    for punch in punches:
+        # Flush every held punch whose window closed before this one
+        while queue and punch.timestamp - queue[0][0].timestamp > span:
+            kept, count = queue.popleft()
+            del held[(kept.user_id, kept.punch_state)]
+            stats.kept += 1
+            yield kept._replace(collapsed=count) if count else kept
+
+        key = (punch.user_id, punch.punch_state)
+        entry = held.get(key)
+        second = punch.timestamp.replace(microsecond=0)
+        previous_second, previous = last.get(punch.user_id, (None, None))
+        if previous_second == second and previous is held.get((punch.user_id, previous[0].punch_state)):
+            entry = previous  # same second, other state: still the same record
+        if entry is not None:
+            entry[1] += 1 + punch.collapsed
+            stats.collapsed += 1
+            continue
+        entry = [punch, punch.collapsed]
+        held[key] = entry
+        queue.append(entry)
+        last[punch.user_id] = (second, entry)
+
+    for kept, count in queue:
+        stats.kept += 1
+        yield kept._replace(collapsed=count) if count else kept
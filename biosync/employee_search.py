@@ -0,0 +1,197 @@
+"""
+Employee search index
+=====================
+In-memory name/ID index over the cached user directory, for
+/api/employees/search.
+
+Device names are mixed Arabic/Latin with inconsistent case and spacing
+("JanjanBaltazar", "mu_Suzan_Nia", "noor_jahan_mohammad"), so names and
+queries are normalized the same way first: NFKC, camelCase and _/-/.
+split into words, case folded, Arabic diacritics and tatweel dropped,
+alef/yeh/teh marbuta variants folded, Arabic-Indic digits mapped to ASCII.
+
+Two structures answer a query:
+
+    prefixes   sorted (word, id) and id lists, bisected: "suz nia", "14"
+    trigrams   trigram -> ids over the name with spaces removed:
+               substrings ("tazar") and typos ("baltasar")
+
+Results are ranked:
+
+    100  exact ID                 70-75  every query word starts a name word
+     90  ID prefix                   50  substring of the name
+     80  exact name             up to 40  similar name (trigram overlap)
+
+refresh() takes the directory's employee list; an unchanged list is a
+no-op (identity check) and a changed one only re-indexes the employees that
+were added, renamed or removed. refresh() and search() hold the index's
+lock, so the threaded Flask proxy never searches a half-updated index.
+"""
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nsmallest
+
+_CAMEL = re.compile(r'(?<=[a-z])(?=[A-Z])')
+_SEPARATORS = re.compile(r'[\W_]+')
+_ARABIC_MARKS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+    **{chr(0x06F0 + d): str(d) for d in range(10)},  # Eastern Arabic-Indic digits
+})
+
+MIN_SIMILARITY = 0.4  # Dice coefficient of trigram sets for a fuzzy match
+
+
+def normalize(text):
+    """Name or query -> list of words: 'JanjanBaltazar' -> ['janjan', 'baltazar']."""
+    text = _CAMEL.sub(' ', unicodedata.normalize('NFKC', text))
+    text = _ARABIC_MARKS.sub('', text).translate(_FOLD).casefold()
+    return [word for word in _SEPARATORS.split(text) if word]
+
+
+def trigrams(compact):
+    return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+
+_AFTER = '\U0010ffff'  # sorts after any character: prefix + _AFTER bounds a prefix range
+
+
+def _prefix_slice(sorted_list, low, high):
+    lo = bisect_left(sorted_list, low)
+    return sorted_list[lo:bisect_left(sorted_list, high, lo)]
+
+
+class _Doc:
+    __slots__ = ('employee', 'words', 'compact', 'grams')
+
+    def __init__(self, employee):
+        self.employee = employee
+        self.words = normalize(employee['name'])
+        self.compact = ''.join(self.words)
+        self.grams = trigrams(self.compact)
+
+
+class EmployeeIndex:
+    def __init__(self, employees=()):
+        self._docs = {}     # id -> _Doc
+        self._words = []    # sorted (word, id)
+        self._ids = []      # sorted ids
+        self._grams = {}    # trigram -> set of ids
+        self._source = None
+        self._lock = threading.Lock()
+        self.refresh(employees)
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ─── Maintenance ───────────────────────────────────────────────
+
+    def refresh(self, employees):
+        """
+        Brings the index in line with ``employees`` (the directory's list of
+        {'id', 'name', ...}). Returns the number of employees re-indexed.
+        """
+        if employees is self._source:
+            return 0
+        with self._lock:
+            if employees is self._source:
+                return 0  # another thread indexed it while this one waited
+            current = {str(e['id']): e for e in employees}
+            changed = 0
+            for user_id in [uid for uid in self._docs if uid not in current]:
+                self._remove(user_id)
+                changed += 1
+            for user_id, employee in current.items():
+                doc = self._docs.get(user_id)
+                if doc is not None:
+                    if doc.employee['name'] == employee['name']:
+                        doc.employee = employee
+                        continue
+                    self._remove(user_id)
+                self._add(user_id, employee)
+                changed += 1
+            self._source = employees  # only once the index matches it
+            return changed
+
+    def _add(self, user_id, employee):
+        doc = _Doc(employee)
+        self._docs[user_id] = doc
+        insort(self._ids, user_id)
+        for word in set(doc.words):
+            insort(self._words, (word, user_id))
+        for gram in doc.grams:
+            self._grams.setdefault(gram, set()).add(user_id)
+
+    def _remove(self, user_id):
+        doc = self._docs.pop(user_id)
+        del self._ids[bisect_left(self._ids, user_id)]
+        for word in set(doc.words):
+            del self._words[bisect_left(self._words, (word, user_id))]
+        for gram in doc.grams:
+            ids = self._grams[gram]
+            ids.discard(user_id)
+            if not ids:
+                del self._grams[gram]
+
+    # ─── Queries ───────────────────────────────────────────────────
+
+    def search(self, query, limit=20):
+        """Best ``limit`` matches as employee dicts with a 'score', best first."""
+        words = normalize(query)
+        if not words:
+            return []
+        with self._lock:
+            return self._search(words, limit)
+
+    def _search(self, words, limit):
+        compact = ''.join(words)
+        scores = {}
+
+        def bump(user_id, score):
+            if score > scores.get(user_id, 0):
+                scores[user_id] = score
+
+        if compact.isdigit():
+            for user_id in _prefix_slice(self._ids, compact, compact + _AFTER):
+                bump(user_id, 100 if user_id == compact else 90)
+
+        # Every query word must start some word of the name
+        matches = None
+        for word in words:
+            found = {user_id for _, user_id in _prefix_slice(self._words, (word,), (word + _AFTER,))}
+            matches = found if matches is None else matches & found
+            if not matches:
+                break
+        for user_id in matches or ():
+            doc = self._docs[user_id]
+            if doc.words == words:
+                bump(user_id, 80)
+            else:
+                bump(user_id, 75 if doc.words[0].startswith(words[0]) else 70)
+
+        # Substrings, then typos, from trigrams - only while they can still make the top ``limit``
+        grams = trigrams(compact)
+        if grams and len(scores) < limit:
+            postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+            for user_id in postings[0].intersection(*postings[1:]):
+                if compact in self._docs[user_id].compact:
+                    bump(user_id, 50)
+        if grams and len(scores) < limit:
+            hits = Counter()
+            for ids in postings:
+                hits.update(ids)
+            for user_id, count in hits.items():
+                if user_id in scores:
+                    continue
+                similarity = 2 * count / (len(grams) + len(self._docs[user_id].grams))
+                if similarity >= MIN_SIMILARITY:
+                    scores[user_id] = round(40 * similarity, 1)
+
+        best = nsmallest(limit, scores.items(),
+                         key=lambda item: (-item[1], len(self._docs[item[0]].compact), item[0]))
+        return [{**self._docs[user_id].employee, 'score': score} for user_id, score in best]
@@ -0,0 +1,379 @@
+"""
+Per-employee JSON store
+=======================
+data/employees/, as written by sync_simple.py and sync_smart.py, in one of
+two layouts (BIOSYNC_STORE_LAYOUT, or --sharded on the sync scripts):
+
+flat (default) - one file per employee, rewritten whole on every save:
+
+    emp_<id>_<name>.json   {"profile": {...}, "attendance": {"2026-01": [record, ...], ...}}
+
+    (a renamed employee leaves one file per name; every reader takes the
+    newest one)
+
+sharded - one file per employee per month plus a small index:
+
+    emp_<id>/index.json    {"profile": {...}, "months": {"2026-01": {"records": 412, "digest": "...", "punchHash": ...}}}
+    emp_<id>/2026-01.json  [record, ...]
+
+A sharded save rewrites only the months whose records changed (compared by
+digest), so a sync writes the current month's shards and nothing else, and
+months no longer on the device are kept. open_employee() reads the index
+and each month on first access. An employee's flat file is migrated into
+shards on its first sharded save (python -m biosync.employee_store shard
+migrates them all).
+
+Every file is written to a temp file and renamed over the old one, so a
+reader never sees a half-written file.
+
+month_checksums() gives the per-(employee, month) record count and punch
+checksum (biosync.punches.punch_hash) used by biosync.reconcile; for
+sharded employees it comes straight from the index.
+
+drop_months() removes months from every employee once biosync.archive has
+sealed them; profiles stay, even when no month is left.
+"""
+
+import hashlib
+import os
+import sys
+from collections.abc import Mapping
+
+from biosync import serializer
+from biosync.punches import punch_hash
+
+DATA_DIR = os.path.join('data', 'employees')
+STORE_LAYOUT = os.environ.get('BIOSYNC_STORE_LAYOUT', 'flat')  # 'flat' | 'sharded'
+INDEX_NAME = 'index.json'
+
+
+def employee_filename(user_id, name):
+    safe_name = name.replace(' ', '_').replace('/', '_')
+    return f"emp_{user_id}_{safe_name}.json"
+
+
+def employee_dirname(user_id):
+    return f"emp_{user_id}"
+
+
+def new_employee(user_id, name):
+    return {
+        'profile': {
+            'id': user_id,
+            'name': name,
+            'department': 'Not Specified',
+            'position': 'Staff'
+        },
+        'attendance': {}
+    }
+
+
+def _write_json(path, obj):
+    """Atomic write (temp file + fsync + rename); returns the number of bytes written."""
+    data = serializer.dumps(obj)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def _read_json(path):
+    return serializer.load(path)
+
+
+def _digest(records):
+    return hashlib.sha1(serializer.dumps(records, pretty=False)).hexdigest()[:16]
+
+
+def _flat_files(data_dir, user_id=None):
+    """
+    {user_id: [flat file, ...] oldest first} (only ``user_id``'s if given).
+    A renamed employee leaves one file per name; the last one (newest
+    mtime, then name) is the current one for every reader.
+    """
+    if not os.path.isdir(data_dir):
+        return {}
+    prefix = 'emp_' if user_id is None else f"emp_{user_id}_"
+    files = {}
+    for filename in os.listdir(data_dir):
+        if filename.startswith(prefix) and filename.endswith('.json'):
+            file_id = filename[len('emp_'):].split('_', 1)[0]
+            files.setdefault(file_id, []).append(os.path.join(data_dir, filename))
+    for paths in files.values():
+        paths.sort(key=lambda path: (os.path.getmtime(path), path))
+    return files
+
+
+def _flat_paths(user_id, data_dir):
+    """The employee's flat files, oldest first (a renamed employee leaves one per name)."""
+    return _flat_files(data_dir, user_id).get(str(user_id), [])
+
+
+def _current_flat_files(data_dir):
+    """The current (newest) flat file of every employee."""
+    return [paths[-1] for paths in _flat_files(data_dir).values()]
+
+
+def _sharded_dirs(data_dir):
+    return [os.path.join(data_dir, filename) for filename in os.listdir(data_dir)
+            if filename.startswith('emp_') and os.path.isdir(os.path.join(data_dir, filename))]
+
+
+def _read_index(emp_dir):
+    try:
+        return _read_json(os.path.join(emp_dir, INDEX_NAME))
+    except FileNotFoundError:
+        return None
+
+
+# ─── Writing ───────────────────────────────────────────────────────
+
+def employee_layout(user_id, data_dir=DATA_DIR, layout=None):
+    """
+    Layout to save an employee in: 'sharded' once it is stored sharded (a flat
+    file next to the shards would never be read), else ``layout`` (default
+    STORE_LAYOUT).
+    """
+    if os.path.isfile(os.path.join(data_dir, employee_dirname(user_id), INDEX_NAME)):
+        return 'sharded'
+    return layout or STORE_LAYOUT
+
+
+def save_employee(data, data_dir=DATA_DIR, layout=None):
+    """
+    Writes one employee in ``layout`` (default STORE_LAYOUT; an employee
+    already stored sharded stays sharded); returns the number of bytes written.
+    """
+    if employee_layout(data['profile']['id'], data_dir, layout) == 'sharded':
+        return save_sharded(data, data_dir)
+    profile = data['profile']
+    return _write_json(os.path.join(data_dir, employee_filename(profile['id'], profile['name'])), data)
+
+
+def _checksum(user_id, records):
+    return sum(punch_hash(user_id, r['timestamp']) for r in records)
+
+
+def _write_months(emp_dir, user_id, months, attendance, force=False):
+    written = 0
+    for month, records in attendance.items():
+        digest = _digest(records)
+        entry = months.get(month)
+        if not force and entry is not None and entry['digest'] == digest:
+            continue
+        written += _write_json(os.path.join(emp_dir, f"{month}.json"), records)
+        months[month] = {'records': len(records), 'digest': digest, 'punchHash': _checksum(user_id, records)}
+    return written
+
+
+def save_sharded(data, data_dir=DATA_DIR, force=False):
+    """
+    Writes the months of ``data`` whose records changed since the last save
+    (``force``: all of them, e.g. over a shard edited by hand), then the
+    index if anything changed. Stored months that are not in ``data`` are
+    kept. Returns the number of bytes written.
+    """
+    profile = data['profile']
+    emp_dir = os.path.join(data_dir, employee_dirname(profile['id']))
+    index = _read_index(emp_dir)
+    flat_paths = []
+    written = 0
+    if index is None:
+        index = {'profile': profile, 'months': {}}
+        os.makedirs(emp_dir, exist_ok=True)
+        # Migration: the flat files' months become shards, then ``data`` updates them
+        flat_paths = _flat_paths(profile['id'], data_dir)
+        for flat_path in flat_paths:
+            written += _write_months(emp_dir, profile['id'], index['months'],
+                                     _read_json(flat_path)['attendance'])
+
+    written += _write_months(emp_dir, profile['id'], index['months'], data['attendance'], force)
+    if written or index['profile'] != profile or flat_paths:
+        index['profile'] = profile
+        index['months'] = dict(sorted(index['months'].items()))
+        written += _write_json(os.path.join(emp_dir, INDEX_NAME), index)
+    for flat_path in flat_paths:
+        os.remove(flat_path)
+    return written
+
+
+def drop_months(months, data_dir=DATA_DIR):
+    """
+    Removes ``months`` from every employee (both layouts); returns the number
+    of employees changed. Flat files without those months are not rewritten.
+    """
+    months = set(months)
+    changed = 0
+    if not months or not os.path.isdir(data_dir):
+        return changed
+    for filename in os.listdir(data_dir):
+        if not filename.startswith('emp_'):
+            continue
+        path = os.path.join(data_dir, filename)
+        if filename.endswith('.json'):
+            data = _read_json(path)
+            if months.isdisjoint(data['attendance']):
+                continue
+            data['attendance'] = {m: r for m, r in data['attendance'].items() if m not in months}
+            _write_json(path, data)
+            changed += 1
+            continue
+        index = _read_index(path) if os.path.isdir(path) else None
+        if index is None or months.isdisjoint(index['months']):
+            continue
+        dropped = [month for month in index['months'] if month in months]
+        for month in dropped:
+            del index['months'][month]
+        _write_json(os.path.join(path, INDEX_NAME), index)  # index first: a crash leaves orphan shards only
+        for month in dropped:
+            try:
+                os.remove(os.path.join(path, f"{month}.json"))
+            except FileNotFoundError:
+                pass
+        changed += 1
+    return changed
+
+
+# ─── Reading ───────────────────────────────────────────────────────
+
+class MonthShards(Mapping):
+    """
+    Attendance of a sharded employee: the months come from the index, each
+    month's records are read on first access.
+    """
+
+    def __init__(self, emp_dir, months):
+        self._dir = emp_dir
+        self._months = months
+        self._loaded = {}
+
+    def __getitem__(self, month):
+        if month not in self._months:
+            raise KeyError(month)
+        if month not in self._loaded:
+            self._loaded[month] = _read_json(os.path.join(self._dir, f"{month}.json"))
+        return self._loaded[month]
+
+    def __iter__(self):
+        return iter(self._months)
+
+    def __len__(self):
+        return len(self._months)
+
+    def record_count(self, month):
+        """Records in ``month``, from the index (no shard read)."""
+        return self._months[month]['records']
+
+
+def open_employee(user_id, data_dir=DATA_DIR):
+    """
+    One employee, or None if there is none. In the sharded layout
+    ``attendance[month]`` reads only that month's shard; a flat file is read
+    whole.
+    """
+    emp_dir = os.path.join(data_dir, employee_dirname(user_id))
+    index = _read_index(emp_dir)
+    if index is not None:
+        return {'profile': index['profile'], 'attendance': MonthShards(emp_dir, index['months'])}
+    flat_paths = _flat_paths(user_id, data_dir)
+    return _read_json(flat_paths[-1]) if flat_paths else None
+
+
+def load_employees(data_dir=DATA_DIR, months=None):
+    """
+    All employees (either layout), keyed by employee id. ``months`` (a
+    collection of 'YYYY-MM') keeps only those months; sharded employees then
+    read only those shards.
+    """
+    employees = {}
+    if not os.path.isdir(data_dir):
+        return employees
+    for path in _current_flat_files(data_dir):
+        data = _read_json(path)
+        if months is not None:
+            data['attendance'] = {m: r for m, r in data['attendance'].items() if m in months}
+        employees[str(data['profile']['id'])] = data
+
+    # Sharded copies win over a flat file left behind
+    for emp_dir in _sharded_dirs(data_dir):
+        index = _read_index(emp_dir)
+        if index is None:
+            continue
+        shards = MonthShards(emp_dir, index['months'])
+        employees[str(index['profile']['id'])] = {
+            'profile': index['profile'],
+            'attendance': {m: shards[m] for m in shards if months is None or m in months},
+        }
+    return employees
+
+
+def month_checksums(data_dir=DATA_DIR, read_shards=False):
+    """
+    {(user_id, month): (record count, punch checksum)} for every stored month.
+    Sharded employees are answered from their index (no shard read) unless
+    ``read_shards``.
+    """
+    flat = {}
+    sharded = {}
+    if not os.path.isdir(data_dir):
+        return sharded
+    for path in _current_flat_files(data_dir):
+        data = _read_json(path)
+        user_id = str(data['profile']['id'])
+        for month, records in data['attendance'].items():
+            flat[(user_id, month)] = (len(records), _checksum(user_id, records))
+    for path in _sharded_dirs(data_dir):
+        index = _read_index(path)
+        if index is None:
+            continue
+        user_id = str(index['profile']['id'])
+        for month, entry in index['months'].items():
+            if 'punchHash' in entry and not read_shards:
+                sharded[(user_id, month)] = (entry['records'], entry['punchHash'])
+            else:  # indexed before checksums existed
+                records = _read_json(os.path.join(path, f"{month}.json"))
+                sharded[(user_id, month)] = (len(records), _checksum(user_id, records))
+
+    # Sharded copies win over a flat file left behind
+    sharded_ids = {user_id for user_id, _ in sharded}
+    flat.update(sharded)
+    return {key: value for key, value in flat.items() if key in sharded or key[0] not in sharded_ids}
+
+
+def stored_keys(employees):
+    """Set of (user_id, ISO timestamp) already stored, for de-duplication."""
+    keys = set()
+    for user_id, data in employees.items():
+        for records in data['attendance'].values():
+            keys.update((user_id, r['timestamp']) for r in records)
+    return keys
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Per-employee JSON store (data/employees)')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('shard', help='migrate every flat emp_*.json file to the sharded layout')
+    args = parser.parse_args(argv)
+
+    employees = load_employees(args.data_dir)
+    migrated = 0
+    written = 0
+    for user_id, data in employees.items():
+        if _flat_paths(user_id, args.data_dir):
+            written += save_sharded(data, args.data_dir)
+            migrated += 1
+    print(f"✓ {migrated} موظف -> {args.data_dir}/emp_<id>/ ({written:,} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
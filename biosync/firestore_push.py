@@ -0,0 +1,210 @@
+"""
+Device -> Firestore
+===================
+``biosync push-firestore`` (sync_to_firebase.py): the same debounced
+punches as the local store, written under employees/<doc>/attendance/<month>
+(layout: biosync.firestore_store). The device is read from sync_start()
+on; sealed months Firestore has not received yet are uploaded from the
+archive and recorded in data/archive/sinks.json once the push succeeded,
+so sealing never skips a month Firestore is missing. Sealed months already
+pushed are not re-uploaded; ``biosync.reconcile --stores firestore --since ...``
+checks them when needed.
+
+``firebase_admin`` and ``zk`` are imported by push() itself: they are the
+slowest imports of the project and no other command needs them.
+"""
+
+from itertools import chain
+
+from biosync.archive import load_index, mark_pushed, punches as archive_punches, sync_start, unpushed_months
+from biosync.debounce import DebounceStats, debounce
+from biosync.firestore_store import employee_doc_id, record_document
+from biosync.metrics import Run
+from biosync.profiling import Profiler
+from biosync.punches import Punch
+from biosync.user_directory import UserDirectory
+
+FIREBASE_KEY_PATH = 'fingr-607a9-firebase-adminsdk-fbsvc-9844f0a730.json'
+
+
+def push(ip, port, start, key_path=FIREBASE_KEY_PATH, profile_argv=()):
+    """One device pull into Firestore. Returns 0, or 1 on failure."""
+    sealed_months = load_index()
+    unpushed = unpushed_months('firestore')
+    since = sync_start(start)
+
+    print("="*70)
+    print("مزامنة احترافية من جهاز البصمة إلى Firebase")
+    print("="*70)
+
+    run = Run('sync_to_firebase')
+    try:
+        profiler = Profiler.from_argv('sync_to_firebase', profile_argv)  # --profile / --profile=cprofile
+    except ValueError as e:
+        print(f"✗ {e}")
+        run.finish('error')
+        run.write_json_line()
+        return 1
+
+    # ═══════════════════════════════════════════════════════════
+    # 1. تهيئة Firebase
+    # ═══════════════════════════════════════════════════════════
+
+    print("\n[1/5] تهيئة Firebase...")
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(key_path)
+            firebase_admin.initialize_app(cred)
+        db = firestore.client()
+        run.lap('firebase_init')
+        print("      ✓ تم الاتصال بـ Firebase بنجاح")
+    except Exception as e:
+        print(f"      ✗ خطأ في Firebase: {e}")
+        run.finish('error')
+        run.write_json_line()
+        profiler.stop()
+        return 1
+
+    from zk import ZK
+
+    # ═══════════════════════════════════════════════════════════
+    # 2. الاتصال بجهاز البصمة
+    # ═══════════════════════════════════════════════════════════
+
+    print(f"\n[2/5] الاتصال بجهاز البصمة على {ip}...")
+    zk = ZK(ip, port=port, timeout=15)
+    conn = None
+
+    try:
+        conn = zk.connect()
+        print("      ✓ تم الاتصال بالجهاز بنجاح")
+        run.lap('connect')
+
+        # 3. قراءة أسماء الموظفين
+        print("\n[3/5] قراءة أسماء الموظفين...")
+        user_map = UserDirectory()
+        user_map.refresh(conn)
+        print(f"      ✓ تم قراءة {len(user_map)} موظف")
+        run.lap('get_users')
+
+        # 4. قراءة سجلات البصمات
+        print("\n[4/5] قراءة سجلات البصمات من الجهاز...")
+        attendances = conn.get_attendance()
+        run.lap('get_attendance')
+        run.count('device_records', len(attendances))
+
+        # ترتيب زمنياً
+        attendances.sort(key=lambda x: x.timestamp)
+        print(f"      ✓ تم قراءة {len(attendances)} سجل من الجهاز")
+
+        # فلترة حسب التاريخ
+        filtered_logs = [log for log in attendances if log.timestamp >= since]
+        print(f"      ✓ تمت فلترة {len(filtered_logs)} سجل من تاريخ {since.strftime('%Y-%m-%d')}")
+        run.count('filtered_records', len(filtered_logs))
+
+        # 5. حفظ في Firebase (منظمة حسب الموظف والشهر)
+        print("\n[5/5] حفظ البيانات في Firebase...")
+        print("      (منظمة حسب الموظف والشهر)\n")
+
+        # تنظيم البيانات حسب الموظف (بعد دمج البصمات المكررة خلال ثوانٍ)
+        employees_data = {}
+        debounce_stats = DebounceStats()
+
+        device_punches = (punch for punch in debounce((Punch.from_log(log) for log in filtered_logs),
+                                                       stats=debounce_stats)
+                          if punch.timestamp.strftime('%Y-%m') not in sealed_months)
+        # الأشهر المؤرشفة التي لم تُرفع بعد إلى Firebase تُقرأ من الأرشيف
+        seen = set()
+        for punch in chain(archive_punches(months=set(unpushed)), device_punches):
+            if (punch.user_id, punch.timestamp) in seen:
+                continue  # night shift of a sealed month, also on the device
+            seen.add((punch.user_id, punch.timestamp))
+            user_id = punch.user_id
+            if user_id not in employees_data:
+                employees_data[user_id] = {
+                    'name': user_map.get(user_id, f"Unknown_{user_id}"),
+                    'records': []
+                }
+            employees_data[user_id]['records'].append(punch)
+
+        run.lap('process')
+        run.count('collapsed_punches', debounce_stats.collapsed)
+        print(f"      ✓ دمج {debounce_stats.collapsed} بصمة مكررة")
+        if unpushed:
+            print(f"      ✓ أشهر مؤرشفة لم تُرفع بعد: {', '.join(unpushed)}")
+
+        total_saved = 0
+        for user_id, data in employees_data.items():
+            employee_name = data['name']
+            print(f"      → {employee_name} (ID: {user_id})")
+
+            # حفظ معلومات الموظف
+            emp_ref = db.collection('employees').document(employee_doc_id(user_id, employee_name))
+            emp_ref.set({
+                'profile': {
+                    'fullName': employee_name,
+                    'userId': user_id,
+                    'department': 'Not Specified',
+                    'position': 'Staff',
+                    'lastSyncedAt': firestore.SERVER_TIMESTAMP
+                }
+            }, merge=True)
+
+            # تنظيم السجلات حسب الشهر
+            records_by_month = {}
+            for punch in data['records']:
+                records_by_month.setdefault(punch.timestamp.strftime('%Y-%m'), []).append(punch)
+
+            for month, month_records in records_by_month.items():
+                month_ref = emp_ref.collection('attendance').document(month)
+                for punch in month_records:
+                    # معرف فريد للسجل + نوع الحركة حسب رمز الحالة (نفس المنطق في CSV)
+                    # punchHash: يسمح لـ biosync.reconcile بالتحقق من الشهر بدون قراءة سجلاته
+                    record_id, record = record_document(punch, firestore.SERVER_TIMESTAMP)
+                    month_ref.collection('records').document(record_id).set(record)
+                    total_saved += 1
+                print(f"        • شهر {month}: {len(month_records)} سجل")
+
+        # حفظ معلومات المزامنة
+        db.collection('sync-metadata').document('last-sync').set({
+            'timestamp': firestore.SERVER_TIMESTAMP,
+            'totalEmployees': len(employees_data),
+            'totalRecords': total_saved,
+            'startDate': start,
+            'deviceIp': ip,
+            'devicePort': port
+        })
+        run.lap('firestore_write')
+        run.count('written_records', total_saved)
+        mark_pushed('firestore', unpushed)
+
+        print("\n" + "="*70)
+        print("✓ تمت المزامنة بنجاح!")
+        print("="*70)
+        print(f"إجمالي الموظفين: {len(employees_data)}")
+        print(f"إجمالي السجلات: {total_saved}")
+        print(f"من تاريخ: {start.strftime('%Y-%m-%d')}")
+        print("="*70)
+        print("\nالآن افتح تطبيق React واضغط 'Sync Now' لرؤية البيانات!")
+        print("="*70 + "\n")
+
+    except Exception as e:
+        print(f"\n✗ خطأ: {e}")
+        import traceback
+        traceback.print_exc()
+        run.finish('error')
+
+    finally:
+        if conn:
+            print("\nإغلاق الاتصال بالجهاز...")
+            conn.enable_device()  # التأكد أن الجهاز يعمل للموظفين
+            conn.disconnect()
+            print("✓ تم إغلاق الاتصال بأمان")
+        run.finish()
+        run.write_json_line()
+        profiler.stop()
+
+    return 0 if run.status == 'ok' else 1
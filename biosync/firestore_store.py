@@ -0,0 +1,90 @@
+"""
+Firestore layout
+================
+What sync_to_firebase.py writes, and biosync.reconcile checks and repairs:
+
+    employees/emp_<id>_<name>                                    {"profile": {...}}
+        attendance/<YYYY-MM>/records/<YYYY-MM-DD>_<HHMMSS>_<type>  one punch
+
+Months are calendar months of the punch. Every record carries 'punchHash'
+(biosync.punches.punch_hash), so a month is verified with one aggregation
+query - count() and sum('punchHash') - instead of reading its records.
+Records written before punchHash existed make the sum differ, so the first
+reconcile --repair rewrites those months once.
+
+Only the functions taking ``db`` talk to Firestore (firebase_admin).
+"""
+
+from biosync.punches import punch_hash
+
+STATUS_TYPES = {
+    0: ('check-in', 'دخول'), 4: ('check-in', 'دخول'), 15: ('check-in', 'دخول'),
+    1: ('check-out', 'خروج'), 5: ('check-out', 'خروج'),
+}
+UNKNOWN_TYPE = ('unknown', 'غير محدد')
+WRITE_BATCH = 400  # Firestore allows 500 writes per batch
+
+
+def employee_doc_id(user_id, name):
+    safe_name = name.replace(' ', '_').replace('/', '_')
+    return f"emp_{user_id}_{safe_name}"
+
+
+def record_type(status):
+    """Device status code -> (type, Arabic description), same rule as the CSV exports."""
+    return STATUS_TYPES.get(status, UNKNOWN_TYPE)
+
+
+def record_document(punch, synced_at):
+    """Punch -> (document id, fields) under attendance/<month>/records."""
+    kind, desc = record_type(punch.status)
+    iso = punch.timestamp.isoformat()
+    date = iso[:10]
+    clock = iso[11:19]
+    return f"{date}_{clock.replace(':', '')}_{kind}", {
+        'timestamp': punch.timestamp,
+        'date': date,
+        'time': clock,
+        'type': kind,
+        'statusCode': punch.status,
+        'statusDesc': desc,
+        'collapsed': punch.collapsed,
+        'deviceId': punch.device_id,
+        'punchHash': punch_hash(punch.user_id, iso),
+        'syncedAt': synced_at,
+    }
+
+
+def records_collection(db, user_id, name, month):
+    return (db.collection('employees').document(employee_doc_id(user_id, name))
+            .collection('attendance').document(month).collection('records'))
+
+
+def month_checksum(db, user_id, name, month):
+    """(record count, punch checksum) of one month, from a single aggregation query."""
+    query = records_collection(db, user_id, name, month).count(alias='count').sum('punchHash', alias='punchHash')
+    values = {result.alias: result.value for result in query.get()[0]}
+    return int(values.get('count') or 0), int(values.get('punchHash') or 0)
+
+
+def write_month(db, user_id, name, month, punches, synced_at):
+    """
+    Makes one month hold exactly ``punches``: writes them all (with
+    punchHash) and deletes records that are not among them.
+    Returns (written, deleted).
+    """
+    collection = records_collection(db, user_id, name, month)
+    documents = dict(record_document(punch, synced_at) for punch in punches)
+    stale = [ref for ref in collection.list_documents() if ref.id not in documents]
+
+    operations = [(collection.document(doc_id), fields) for doc_id, fields in documents.items()]
+    operations += [(ref, None) for ref in stale]
+    for start in range(0, len(operations), WRITE_BATCH):
+        batch = db.batch()
+        for ref, fields in operations[start:start + WRITE_BATCH]:
+            if fields is None:
+                batch.delete(ref)
+            else:
+                batch.set(ref, fields)
+        batch.commit()
+    return len(documents), len(stale)
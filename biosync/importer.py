@@ -0,0 +1,359 @@
+"""
+Historical backfill importer
+============================
+Bulk-loads old exports into data/employees/*.json, de-duplicated against
+the punches already stored there (same user + same second = same punch).
+
+Understood formats (detected from the header / extension):
+    Attendance_YYYY-MM.csv            رقم الموظف, الاسم, الوقت والتاريخ, الحالة        (py.py)
+    Full_Attendance_Report_*.csv      رقم الموظف, الاسم, التاريخ, الساعة والوقت,
+                                      الحالة برقمها, نوع الحركة                          (py.py)
+    emp_<id>_<name>.json              per-employee JSON                                 (sync_*.py)
+English headers (user_id, name, timestamp, date, time, status) work too.
+UTF-8 with or without BOM. Punches of sealed months (biosync.archive) are
+skipped: sealed months are immutable. Closed months the import writes are
+sealed right away, as after a sync.
+
+Employees already stored sharded stay sharded; the others are written in
+STORE_LAYOUT, or sharded with --sharded (like ``biosync pull --sharded``). Later syncs keep the imported records that
+are older than the oldest punch on the device (biosync.local_sync).
+
+CSV files are parsed column-wise: csv (C reader) splits the rows, then each
+column is converted with a single map() instead of per-row Python logic.
+Several files are parsed in parallel processes (--jobs).
+
+Usage:
+    python -m biosync.importer Attendance_*.csv Full_Attendance_Report_*.csv
+    python -m biosync.importer old_exports/ --jobs 4 --dry-run
+    python -m biosync.importer old_exports/ --sharded
+    python -m biosync.importer old_exports/ --data-dir /srv/employees --archive-dir /srv/archive
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from biosync import serializer
+from biosync.archive import ARCHIVE_DIR, due_months, load_index, seal
+from biosync.debounce import DEBOUNCE_SECONDS, DebounceStats, debounce
+from biosync.employee_store import DATA_DIR, load_employees, new_employee, save_employee, stored_keys
+from biosync.punches import Punch, make_record
+from biosync.shifts import ShiftIndex, ShiftSchedule, classify_by_cutoff, epoch_seconds
+from biosync.user_directory import UserDirectory
+
+HEADER_ALIASES = {
+    'رقم الموظف': 'user_id',
+    'الاسم': 'name',
+    'الوقت والتاريخ': 'datetime',
+    'التاريخ': 'date',
+    'الساعة والوقت': 'time',
+    'الحالة': 'status',
+    'الحالة برقمها': 'status',
+    'user_id': 'user_id',
+    'userid': 'user_id',
+    'employee_id': 'user_id',
+    'employeeid': 'user_id',
+    'id': 'user_id',
+    'name': 'name',
+    'timestamp': 'datetime',
+    'datetime': 'datetime',
+    'date': 'date',
+    'time': 'time',
+    'status': 'status',
+    'statuscode': 'status',
+}
+
+
+class ParsedFile:
+    """Columns of one input file (ISO timestamps, so results pickle cheaply)."""
+
+    def __init__(self, path, user_ids, timestamps, statuses, names, rejected=0):
+        self.path = path
+        self.user_ids = user_ids
+        self.timestamps = timestamps
+        self.statuses = statuses
+        self.names = names
+        self.rejected = rejected
+
+    def __len__(self):
+        return len(self.user_ids)
+
+
+# ─── Parsers ───────────────────────────────────────────────────────
+
+def _iso_column(values):
+    """'2026-01-01 05:44:45' -> '2026-01-01T05:44:45' for a whole column; bad rows -> None."""
+    try:
+        return [ts.isoformat() for ts in map(datetime.fromisoformat, values)], 0
+    except ValueError:
+        pass
+    out = []
+    rejected = 0
+    for value in values:
+        try:
+            out.append(datetime.fromisoformat(value.strip()).isoformat())
+        except ValueError:
+            out.append(None)
+            rejected += 1
+    return out, rejected
+
+
+def _int_column(values):
+    try:
+        return list(map(int, values))
+    except ValueError:
+        return [int(v) if v.strip().lstrip('-').isdigit() else -1 for v in values]
+
+
+def parse_csv(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        return ParsedFile(path, [], [], [], {})
+
+    header = [HEADER_ALIASES.get(h.strip().lower(), h.strip()) for h in rows[0]]
+    body = [row for row in rows[1:] if len(row) >= len(header)]
+    columns = dict(zip(header, zip(*body))) if body else {}
+    if 'user_id' not in columns:
+        raise ValueError(f"{path}: no employee id column in header {rows[0]}")
+
+    if 'datetime' in columns:
+        stamps = columns['datetime']
+    elif 'date' in columns and 'time' in columns:
+        stamps = list(map(' '.join, zip(columns['date'], columns['time'])))
+    else:
+        raise ValueError(f"{path}: no timestamp columns in header {rows[0]}")
+
+    user_ids = [u.strip() for u in columns['user_id']]
+    timestamps, rejected = _iso_column(stamps)
+    statuses = _int_column(columns['status']) if 'status' in columns else [0] * len(user_ids)
+    names = dict(zip(user_ids, columns['name'])) if 'name' in columns else {}
+
+    if rejected:
+        keep = [i for i, ts in enumerate(timestamps) if ts is not None]
+        user_ids = [user_ids[i] for i in keep]
+        timestamps = [timestamps[i] for i in keep]
+        statuses = [statuses[i] for i in keep]
+    return ParsedFile(path, user_ids, timestamps, statuses, names, rejected)
+
+
+def parse_employee_json(path):
+    data = serializer.load(path)
+    user_id = str(data['profile']['id'])
+    timestamps = []
+    statuses = []
+    for records in data['attendance'].values():
+        timestamps.extend(r['timestamp'] for r in records)
+        statuses.extend(r.get('statusCode', 0) for r in records)
+    return ParsedFile(path, [user_id] * len(timestamps), timestamps, statuses,
+                      {user_id: data['profile'].get('name', '')})
+
+
+def parse_file(path):
+    if path.lower().endswith('.json'):
+        return parse_employee_json(path)
+    return parse_csv(path)
+
+
+def expand_inputs(inputs):
+    """Files, directories (all *.csv / emp_*.json inside) and glob patterns."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in sorted(os.listdir(item)):
+                if name.lower().endswith('.csv') or (name.startswith('emp_') and name.endswith('.json')):
+                    paths.append(os.path.join(item, name))
+        elif any(ch in item for ch in '*?['):
+            paths.extend(sorted(glob.glob(item)))
+        else:
+            paths.append(item)
+    return paths
+
+
+# ─── Import ────────────────────────────────────────────────────────
+
+def parse_all(paths, jobs=1):
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(parse_file, paths))
+    return [parse_file(path) for path in paths]
+
+
+def _near_stored(employees, window):
+    """
+    Predicate: is a punch within ``window`` seconds of one already stored?
+    (catches double taps split across two imports; per-user sorted times, bisect)
+    """
+    times = {}
+
+    def near(punch):
+        if punch.user_id not in times:
+            data = employees.get(punch.user_id)
+            times[punch.user_id] = sorted(
+                epoch_seconds(datetime.fromisoformat(r['timestamp']))
+                for records in (data['attendance'].values() if data else ())
+                for r in records
+            )
+        stored = times[punch.user_id]
+        seconds = epoch_seconds(punch.timestamp)
+        i = bisect_left(stored, seconds - window)
+        return i < len(stored) and stored[i] <= seconds + window
+
+    return near
+
+
+def import_files(paths, data_dir=DATA_DIR, jobs=1, dry_run=False, directory=None, schedule=None,
+                 window=None, archive_dir=ARCHIVE_DIR, layout=None):
+    """
+    Parses ``paths`` and merges every punch not already stored into ``data_dir``.
+    Double taps (``window`` seconds, default BIOSYNC_DEBOUNCE_SECONDS) are
+    collapsed, also against stored punches. Punches are classified and filed
+    by shift instance (``schedule``, default data/shifts.json) and
+    saved in ``layout`` (default STORE_LAYOUT; sharded employees stay
+    sharded). Closed months written are then sealed into ``archive_dir``.
+    Returns a stats dict.
+    """
+    window = DEBOUNCE_SECONDS if window is None else window
+    t0 = time.perf_counter()
+    parsed = parse_all(paths, jobs)
+    t_parse = time.perf_counter() - t0
+
+    employees = load_employees(data_dir)
+    sealed_months = load_index(archive_dir)
+    seen = stored_keys(employees)
+    directory = directory if directory is not None else UserDirectory()
+    schedule = schedule if schedule is not None else ShiftSchedule.load()
+    first = min((min(r.timestamps) for r in parsed if len(r)), default=None)
+    last = max((max(r.timestamps) for r in parsed if len(r)), default=None)
+    indexes = {}  # one ShiftIndex per shift pattern, shared by its employees
+
+    names = {}
+    for result in parsed:
+        names.update(result.names)
+
+    total = 0
+    duplicates = 0
+    fresh = []
+    for result in parsed:
+        total += len(result)
+        for user_id, ts, status in zip(result.user_ids, result.timestamps, result.statuses):
+            key = (user_id, ts)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            fresh.append((ts, user_id, status))
+
+    fresh.sort()
+    debounce_stats = DebounceStats()
+    near_stored = _near_stored(employees, window)
+    collapsed = 0
+    sealed = 0
+    touched = defaultdict(set)  # user_id -> months
+    punches = (Punch(user_id, datetime.fromisoformat(ts), status) for ts, user_id, status in fresh)
+    for punch in debounce(punches, window, debounce_stats):
+        user_id = punch.user_id
+        if near_stored(punch):
+            collapsed += 1  # its own merged taps are already in debounce_stats
+            continue
+
+        shifts = schedule.shifts_for(user_id)
+        if shifts not in indexes:
+            indexes[shifts] = ShiftIndex(shifts, datetime.fromisoformat(first).date(),
+                                         datetime.fromisoformat(last).date())
+        instance = indexes[shifts].locate(epoch_seconds(punch.timestamp))
+        month_key = instance.month
+        if month_key in sealed_months:
+            sealed += 1
+            continue
+        if user_id not in employees:
+            name = directory.get(user_id) or names.get(user_id) or f"Unknown_{user_id}"
+            employees[user_id] = new_employee(user_id, name)
+        employees[user_id]['attendance'].setdefault(month_key, []).append(
+            make_record(punch, classify_by_cutoff(punch, instance))
+        )
+        touched[user_id].add(month_key)
+
+    written_bytes = 0
+    if not dry_run:
+        os.makedirs(data_dir, exist_ok=True)
+        for user_id, months in touched.items():
+            attendance = employees[user_id]['attendance']
+            for month_key in months:
+                attendance[month_key].sort(key=lambda r: r['timestamp'])
+            employees[user_id]['attendance'] = dict(sorted(attendance.items()))
+            written_bytes += save_employee(employees[user_id], data_dir, layout)
+
+    sealed_now = []
+    if not dry_run and due_months({m for months in touched.values() for m in months}, archive_dir):
+        sealed_now = [r['month'] for r in seal(data_dir, archive_dir)]
+
+    elapsed = time.perf_counter() - t0
+    return {
+        'files': len(paths),
+        'rows': total,
+        'rejected': sum(r.rejected for r in parsed),
+        'duplicates': duplicates,
+        'collapsed': debounce_stats.collapsed + collapsed,
+        'sealed': sealed,
+        'sealedMonths': sealed_now,
+        'imported': total - duplicates - debounce_stats.collapsed - collapsed - sealed,
+        'employeesTouched': len(touched),
+        'bytesWritten': written_bytes,
+        'parseSeconds': round(t_parse, 3),
+        'totalSeconds': round(elapsed, 3),
+        'rowsPerMinute': int(total / elapsed * 60) if elapsed else 0,
+        'dryRun': dry_run,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Backfill old attendance exports into data/employees')
+    parser.add_argument('inputs', nargs='+', help='CSV/JSON files, directories or glob patterns')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='sealed months of --data-dir')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='parallel parser processes')
+    parser.add_argument('--dry-run', action='store_true', help='parse and de-duplicate, write nothing')
+    parser.add_argument('--sharded', action='store_true',
+                        help='one file per employee per month')
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("✗ لا توجد ملفات للاستيراد")
+        return 1
+
+    print("="*70)
+    print(f"استيراد البيانات القديمة - {len(paths)} ملف")
+    print("="*70)
+    stats = import_files(paths, args.data_dir, args.jobs, args.dry_run, archive_dir=args.archive_dir,
+                         layout='sharded' if args.sharded else None)
+    print(f"الصفوف: {stats['rows']}")
+    print(f"  • جديدة: {stats['imported']}")
+    print(f"  • مكررة: {stats['duplicates']}")
+    print(f"  • نقرات مزدوجة مدمجة: {stats['collapsed']}")
+    print(f"  • مرفوضة: {stats['rejected']}")
+    if stats['sealed']:
+        print(f"  • في أشهر مؤرشفة (تم تجاهلها): {stats['sealed']}")
+    print(f"الموظفين المحدثين: {stats['employeesTouched']}")
+    for month in stats['sealedMonths']:
+        print(f"  ✓ أرشفة شهر {month} -> {args.archive_dir}")
+    print(f"الوقت: {stats['totalSeconds']}s ({stats['rowsPerMinute']:,} صف/دقيقة)")
+    if args.dry_run:
+        print("(تجربة فقط - لم يتم حفظ أي شيء)")
+    print("="*70)
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
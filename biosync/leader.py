@@ -0,0 +1,137 @@
+"""
+Device-owner leader election
+============================
+When the proxy runs as several worker processes, exactly one of them may
+hold the ZK session (the uFace800 copes badly with concurrent sessions).
+
+LeaderLock is an exclusive file lock: whichever process holds it is the
+device owner. The OS drops the lock when that process dies, and another
+worker takes over on its next poll. acquire() is the blocking form, for
+short critical sections shared by several processes (biosync.punch_log).
+
+DeviceOwner is the background thread each worker runs: it keeps trying to
+take the lock, and while it holds it, it serves pending sync requests from
+the SnapshotStore with a single device pull.
+"""
+
+import os
+import threading
+import time
+import traceback
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LeaderLock:
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def try_acquire(self):
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def acquire(self):
+        """Blocks until the lock is held. One LeaderLock per holder: it is not reentrant."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.01)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        return self
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class DeviceOwner:
+    """
+    Background loop run by every worker. ``pull()`` must return
+    ``(employees, records)`` or raise; it is only ever called by the leader.
+    """
+
+    def __init__(self, store, lock, pull, poll_interval=0.2):
+        self.store = store
+        self.lock = lock
+        self.pull = pull
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self.lock.held
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='biosync-device-owner', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.lock.release()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if self.lock.held or self.lock.try_acquire():
+                self.serve_pending()
+            self._stop.wait(self.poll_interval)
+
+    def serve_pending(self):
+        """One device pull covering every request queued so far."""
+        covers = self.store.pending_request()
+        if covers is None:
+            return False
+        try:
+            employees, records = self.pull()
+            self.store.publish(covers, employees, records, datetime.now().isoformat())
+        except Exception as e:
+            traceback.print_exc()
+            self.store.publish_error(covers, str(e))
+        return True
@@ -0,0 +1,257 @@
+"""
+Device -> local JSON store
+==========================
+The pull behind ``biosync pull`` (sync_smart.py) and ``biosync export-json``
+(sync_simple.py): punches since the first open month, debounced, mirrored
+to data/punches.bin, grouped into shifts (data/shifts.json) and written to
+data/employees; months past the seal boundary are archived afterwards.
+
+    smart    first punch of a shift = check-in, last = check-out, the ones
+             in between by the shift's middle cutoff (default day shift: 12:00)
+    simple   every punch by the shift's cutoff
+
+Stored records older than the oldest punch the pull saw (imported history,
+punches cleared from the device) are kept; from there on the device is
+authoritative.
+
+``zk`` is imported by sync() itself, so importing this module is cheap.
+"""
+
+import os
+from datetime import datetime
+
+from biosync import serializer
+from biosync.archive import ARCHIVE_DIR, due_months, load_index, seal, sync_start
+from biosync.debounce import DEBOUNCE_SECONDS, DebounceStats, debounce
+from biosync.employee_store import DATA_DIR, STORE_LAYOUT, new_employee, open_employee, save_employee
+from biosync.metrics import Run
+from biosync.profiling import Profiler
+from biosync.punch_log import PunchLog
+from biosync.punches import Punch, make_record
+from biosync.shifts import ShiftSchedule, assign_shifts, classify_by_cutoff, classify_first_last
+from biosync.user_directory import UserDirectory
+
+METADATA_PATH = os.path.join('data', 'sync_metadata.json')
+
+METHODS = {
+    # method -> (run name, title)
+    'smart': ('sync_smart', "مزامنة ذكية - تحديد الدخول/الخروج تلقائياً"),
+    'simple': ('sync_simple', "مزامنة بسيطة - حفظ في ملفات JSON"),
+}
+
+
+def _classify(method, punches, instance):
+    if method == 'smart':
+        # 1. أول بصمة في الوردية = دخول
+        # 2. آخر بصمة في الوردية = خروج
+        # 3. البصمات في الوسط: حسب موعد الفصل في الوردية (الوردية الافتراضية: 12:00)
+        return classify_first_last(punches, instance)
+    # قبل موعد الفصل (الوردية الافتراضية: 15:00) = دخول، بعده = خروج
+    return [classify_by_cutoff(punch, instance) for punch in punches]
+
+
+def _with_history(data, data_dir, window_start):
+    """
+    Adds the employee's stored records from before ``window_start`` (the
+    oldest punch of the pull) to ``data``: a flat save rewrites the whole
+    file, and a sharded one the months the pull covers.
+    """
+    stored = open_employee(data['profile']['id'], data_dir)
+    if stored is None:
+        return data
+    cutoff = window_start.isoformat()
+    attendance = data['attendance']
+    for month in stored['attendance']:
+        if month > cutoff[:7]:
+            continue  # starts after the cutoff: the pull has all of it
+        older = [r for r in stored['attendance'][month] if r['timestamp'] < cutoff]
+        if not older:
+            continue
+        pulled = attendance.get(month, [])
+        seen = {r['timestamp'] for r in pulled}
+        attendance[month] = sorted(pulled + [r for r in older if r['timestamp'] not in seen],
+                                   key=lambda r: r['timestamp'])
+    data['attendance'] = dict(sorted(attendance.items()))
+    return data
+
+
+def sync(ip, port, start, method='smart', layout=None, data_dir=DATA_DIR, profile_argv=(), device=None,
+         archive_dir=ARCHIVE_DIR):
+    """
+    One pull into ``data_dir``. ``layout`` 'sharded' writes one file per
+    employee per month (only changed months are rewritten); default
+    STORE_LAYOUT. ``device``: a ZK-like object to read instead of
+    ``zk.ZK(ip, port)``. Closed months are sealed into ``archive_dir``, the
+    archive of ``data_dir``. Returns 0, or 1 if the pull failed.
+    """
+    run_name, title = METHODS[method]
+    layout = layout or STORE_LAYOUT
+    # الأشهر المغلقة مؤرشفة في data/archive ولا تُعاد معالجتها (biosync.archive)
+    sealed_months = load_index(archive_dir)
+    since = sync_start(start, archive_dir)
+    steps = 5 if method == 'smart' else 4
+
+    os.makedirs(data_dir, exist_ok=True)
+
+    print("="*70)
+    print(title)
+    print("="*70)
+
+    if device is None:
+        from zk import ZK
+        device = ZK(ip, port=port, timeout=15)
+    conn = None
+    run = Run(run_name)
+    try:
+        profiler = Profiler.from_argv(run_name, profile_argv)  # --profile / --profile=cprofile
+    except ValueError as e:
+        print(f"✗ {e}")
+        run.finish('error')
+        run.write_json_line()
+        return 1
+
+    try:
+        print(f"\n[1/{steps}] الاتصال بالجهاز {ip}...")
+        conn = device.connect()
+        print("      ✓ متصل")
+        run.lap('connect')
+
+        print(f"\n[2/{steps}] قراءة الموظفين...")
+        user_map = UserDirectory()
+        user_map.refresh(conn)
+        print(f"      ✓ {len(user_map)} موظف")
+        run.lap('get_users')
+
+        print(f"\n[3/{steps}] قراءة البصمات...")
+        attendances = conn.get_attendance()
+        run.lap('get_attendance')
+        run.count('device_records', len(attendances))
+        attendances.sort(key=lambda x: x.timestamp)
+        filtered = [log for log in attendances if log.timestamp >= since]
+        print(f"      ✓ {len(filtered)} سجل")
+        run.count('filtered_records', len(filtered))
+
+        if method == 'smart':
+            print(f"\n[4/{steps}] تحديد الدخول/الخروج بذكاء...")
+        else:
+            print(f"\n[4/{steps}] حفظ في ملفات JSON...")
+
+        # تنظيم حسب الموظف والوردية (وردية ليلية 22:00 → 06:00 = يوم واحد)
+        schedule = ShiftSchedule.load()
+        # دمج البصمات المكررة (نقرتين خلال ثوانٍ = بصمة واحدة)
+        debounce_stats = DebounceStats()
+        punches = list(debounce((Punch.from_log(log) for log in filtered), stats=debounce_stats))
+        run.count('collapsed_punches', debounce_stats.collapsed)
+        print(f"      ✓ دمج {debounce_stats.collapsed} بصمة مكررة (خلال {DEBOUNCE_SECONDS} ثانية)")
+
+        # نسخة ثنائية للاستعلام السريع حسب الوقت (data/punches.bin)
+        run.count('punch_log_appended', PunchLog().append(punches))
+        by_shift = assign_shifts(punches, schedule)
+
+        employees_data = {}
+        for user_id, shifts in by_shift.items():
+            user_name = user_map.get(user_id, f"Unknown_{user_id}")
+            employees_data[user_id] = new_employee(user_id, user_name)
+
+            for instance, shift_punches in shifts:
+                if instance.month in sealed_months:
+                    continue  # وردية ليلية بدأت في شهر مؤرشف
+                # تنظيم حسب شهر بداية الوردية (وردية ليلية 31 يناير تبقى في يناير)
+                month_records = employees_data[user_id]['attendance'].setdefault(instance.month, [])
+                existing_ids = {r['id'] for r in month_records}
+
+                for punch, record_type in zip(shift_punches, _classify(method, shift_punches, instance)):
+                    record = make_record(punch, record_type)
+                    # تجنب التكرار
+                    if record['id'] not in existing_ids:
+                        existing_ids.add(record['id'])
+                        month_records.append(record)
+
+        if method == 'smart':
+            run.lap('classify')
+            print(f"\n[5/{steps}] حفظ في ملفات JSON...")
+        else:
+            run.lap('process')
+
+        # حفظ كل موظف في ملف منفصل (اسم ملف آمن: emp_<id>_<name>.json)
+        total_files = 0
+        total_checkins = 0
+        total_checkouts = 0
+
+        for user_id, data in employees_data.items():
+            # السجلات الأقدم من أول بصمة على الجهاز (بيانات مستوردة أو ممسوحة من الجهاز) تبقى
+            _with_history(data, data_dir, punches[0].timestamp)
+            run.size('employee_files', save_employee(data, data_dir, layout))
+
+            checkins = sum(1 for records in data['attendance'].values()
+                           for r in records if r['type'] == 'check-in')
+            checkouts = sum(len(records) for records in data['attendance'].values()) - checkins
+            total_checkins += checkins
+            total_checkouts += checkouts
+            total_files += 1
+
+            if method == 'smart':
+                print(f"      ✓ {data['profile']['name']}: {checkins} دخول, {checkouts} خروج")
+            else:
+                print(f"      ✓ {data['profile']['name']}: {checkins + checkouts} سجل")
+
+        total_records = total_checkins + total_checkouts
+
+        # حفظ معلومات المزامنة
+        metadata = {
+            'lastSync': datetime.now().isoformat(),
+            'totalEmployees': total_files,
+            'totalRecords': total_records,
+        }
+        if method == 'smart':
+            metadata['totalCheckins'] = total_checkins
+            metadata['totalCheckouts'] = total_checkouts
+        metadata.update({
+            'startDate': start.isoformat(),
+            'openSince': since.isoformat(),
+            'deviceIp': ip,
+        })
+        if method == 'smart':
+            metadata['method'] = 'smart_detection'
+
+        with open(METADATA_PATH, 'wb') as f:
+            f.write(serializer.dumps(metadata))
+        run.lap('write')
+        run.count('written_records', total_records)
+
+        # أرشفة الأشهر التي أُغلقت (مرة واحدة لكل شهر)
+        months_written = {m for data in employees_data.values() for m in data['attendance']}
+        if due_months(months_written, archive_dir):
+            for sealed in seal(data_dir, archive_dir):
+                print(f"      ✓ أرشفة شهر {sealed['month']}: {sealed['records']} سجل -> {archive_dir}")
+            run.lap('seal')
+
+        print("\n" + "="*70)
+        print("✓ تمت المزامنة بنجاح!")
+        print("="*70)
+        print(f"الموظفين: {total_files}")
+        if method == 'smart':
+            print(f"إجمالي السجلات: {total_records}")
+            print(f"  • دخول: {total_checkins}")
+            print(f"  • خروج: {total_checkouts}")
+        else:
+            print(f"السجلات: {total_records}")
+        print(f"المجلد: {data_dir} ({layout})")
+        print("="*70 + "\n")
+
+    except Exception as e:
+        print(f"\n✗ خطأ: {e}")
+        import traceback
+        traceback.print_exc()
+        run.finish('error')
+
+    finally:
+        if conn:
+            conn.enable_device()
+            conn.disconnect()
+            print("✓ تم إغلاق الاتصال بأمان\n")
+        run.finish()
+        run.write_json_line()
+        profiler.stop()
+
+    return 0 if run.status == 'ok' else 1
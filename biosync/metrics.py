@@ -0,0 +1,207 @@
+"""
+Per-stage timing instrumentation
+================================
+A sync is split into stages (connect, get_users, get_attendance, process,
+serialize, ...). Each run records how long every stage took, how many
+records went through it and how many bytes were produced.
+
+Only a couple of ``perf_counter()`` calls happen per *stage*; nothing is
+recorded per record, so the hot loops are untouched.
+
+Usage (proxy - cumulative, exported as Prometheus text):
+    metrics = Metrics()
+    with metrics.run('proxy_sync') as run:
+        with run.stage('get_attendance'):
+            logs = conn.get_attendance()
+        run.count('device_records', len(logs))
+    metrics.render_prometheus()
+
+Usage (CLI scripts - one JSON line per run):
+    run = Run('sync_simple')
+    conn = zk.connect()
+    run.lap('connect')                  # time since the previous lap
+    ...
+    run.finish()
+    run.write_json_line()
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from biosync import serializer
+
+RUNS_LOG_PATH = os.path.join('data', 'sync_runs.jsonl')
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB .. 64 MiB
+
+
+class Run:
+    """Timings, counts and sizes of a single sync run."""
+
+    def __init__(self, name, registry=None):
+        self.name = name
+        self.registry = registry
+        self.started_at = datetime.now()
+        self.status = 'running'
+        self.stages = {}
+        self.counts = {}
+        self.sizes = {}
+        self._t0 = time.perf_counter()
+        self._last_lap = self._t0
+        self._total = None
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.stages[name] = self.stages.get(name, 0.0) + (now - t0)
+            self._last_lap = now
+
+    def lap(self, name):
+        """Record the time since the previous lap/stage as stage ``name``."""
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._last_lap)
+        self._last_lap = now
+
+    def count(self, name, n):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def size(self, name, nbytes):
+        self.sizes[name] = self.sizes.get(name, 0) + nbytes
+
+    def finish(self, status='ok'):
+        if self._total is not None:
+            return
+        self._total = time.perf_counter() - self._t0
+        self.status = status
+        if self.registry is not None:
+            self.registry.record(self)
+
+    @property
+    def total(self):
+        return self._total if self._total is not None else time.perf_counter() - self._t0
+
+    def as_dict(self):
+        return {
+            'run': self.name,
+            'startedAt': self.started_at.isoformat(),
+            'status': self.status,
+            'totalSeconds': round(self.total, 6),
+            'stages': {k: round(v, 6) for k, v in self.stages.items()},
+            'counts': self.counts,
+            'bytes': self.sizes
+        }
+
+    def write_json_line(self, path=RUNS_LOG_PATH):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(serializer.dumps(self.as_dict(), pretty=False) + b'\n')
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+    def render(self, metric, labels):
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {self.total}')
+        lines.append(f'{metric}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{metric}_count{{{labels}}} {self.total}')
+        return lines
+
+
+class Metrics:
+    """Cumulative registry of finished runs, rendered as Prometheus text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stage_seconds = {}
+        self._run_seconds = {}
+        self._payload_bytes = {}
+        self._records = {}
+        self._runs = {}
+        self.last_run = None
+
+    @contextmanager
+    def run(self, name):
+        run = Run(name, registry=self)
+        try:
+            yield run
+        except Exception:
+            run.finish('error')
+            raise
+        else:
+            run.finish(run.status if run.status != 'running' else 'ok')
+
+    def record(self, run):
+        with self._lock:
+            for stage, seconds in run.stages.items():
+                self._histogram(self._stage_seconds, (run.name, stage), SECONDS_BUCKETS).observe(seconds)
+            self._histogram(self._run_seconds, (run.name,), SECONDS_BUCKETS).observe(run.total)
+            for name, nbytes in run.sizes.items():
+                self._histogram(self._payload_bytes, (run.name, name), BYTES_BUCKETS).observe(nbytes)
+            for name, n in run.counts.items():
+                key = (run.name, name)
+                self._records[key] = self._records.get(key, 0) + n
+            key = (run.name, run.status)
+            self._runs[key] = self._runs.get(key, 0) + 1
+            self.last_run = run.as_dict()
+
+    @staticmethod
+    def _histogram(table, key, buckets):
+        if key not in table:
+            table[key] = Histogram(buckets)
+        return table[key]
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            lines.append('# HELP biosync_runs_total Finished runs by status.')
+            lines.append('# TYPE biosync_runs_total counter')
+            for (run, status), n in sorted(self._runs.items()):
+                lines.append(f'biosync_runs_total{{run="{run}",status="{status}"}} {n}')
+
+            lines.append('# HELP biosync_run_seconds Total duration of a run.')
+            lines.append('# TYPE biosync_run_seconds histogram')
+            for (run,), hist in sorted(self._run_seconds.items()):
+                lines.extend(hist.render('biosync_run_seconds', f'run="{run}"'))
+
+            lines.append('# HELP biosync_stage_seconds Duration of each stage of a run.')
+            lines.append('# TYPE biosync_stage_seconds histogram')
+            for (run, stage), hist in sorted(self._stage_seconds.items()):
+                lines.extend(hist.render('biosync_stage_seconds', f'run="{run}",stage="{stage}"'))
+
+            lines.append('# HELP biosync_payload_bytes Size of payloads produced by a run.')
+            lines.append('# TYPE biosync_payload_bytes histogram')
+            for (run, name), hist in sorted(self._payload_bytes.items()):
+                lines.extend(hist.render('biosync_payload_bytes', f'run="{run}",payload="{name}"'))
+
+            lines.append('# HELP biosync_records_total Records processed, by kind.')
+            lines.append('# TYPE biosync_records_total counter')
+            for (run, name), n in sorted(self._records.items()):
+                lines.append(f'biosync_records_total{{run="{run}",kind="{name}"}} {n}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,272 @@
+"""
+Built-in profiling mode
+=======================
+Wraps a sync run (or a single proxy /api/sync request) in a profiler and
+writes the results next to the data output (``data/profiles/`` by default):
+
+    <name>_<stamp>.collapsed   flamegraph-ready collapsed stacks (sample mode)
+    <name>_<stamp>.pstats      raw cProfile stats (cprofile mode)
+    <name>_<stamp>_top.txt     top-N hotspots (+ top-N allocation sites with +alloc)
+
+Modes:
+    sample    a background thread samples the profiled thread's stack every
+              few milliseconds; low overhead, safe on the production box
+    cprofile  deterministic cProfile; exact call counts, higher overhead
+    +alloc    either mode plus tracemalloc allocation sites (``sample+alloc``).
+              Opt-in: tracemalloc is process-wide and slows every allocation
+              in the process several times over while it runs
+
+Sync scripts:   python sync_smart.py --profile            (or --profile=cprofile+alloc)
+Proxy:          BIOSYNC_PROFILE=sample python proxy_server.py, then profile
+                single requests with /api/sync?profile=1
+
+Render a flamegraph with e.g. ``flamegraph.pl x.collapsed > x.svg`` or speedscope.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.path.join('data', 'profiles')
+MODES = ('sample', 'cprofile')
+DEFAULT_MODE = 'sample'
+DEFAULT_INTERVAL = 0.005  # seconds between stack samples
+DEFAULT_TOP = 25
+ALLOC_SUFFIX = '+alloc'
+
+# tracemalloc is process-wide: concurrent profilers share one tracing session
+_alloc_lock = threading.Lock()
+_alloc_users = 0
+_alloc_owned = False
+
+
+def parse_mode(spec):
+    """'sample' / 'cprofile+alloc' / '' -> (mode, trace_alloc); ValueError when unknown."""
+    spec = spec.strip().lower()
+    trace_alloc = spec.endswith(ALLOC_SUFFIX)
+    mode = spec[:-len(ALLOC_SUFFIX)] if trace_alloc else spec
+    mode = mode or DEFAULT_MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode '{spec}' (expected one of {', '.join(MODES)}, "
+                         f"optionally with {ALLOC_SUFFIX})")
+    return mode, trace_alloc
+
+
+def mode_from_env(var='BIOSYNC_PROFILE'):
+    """(mode, trace_alloc) from an env var, or None when unset/off.
+
+    Read once at startup: an invalid value is reported and leaves profiling off
+    instead of failing the requests it was meant to profile."""
+    spec = os.environ.get(var, '').strip().lower()
+    if spec in ('', '0', 'off', 'false'):
+        return None
+    if spec in ('1', 'on', 'true'):
+        spec = DEFAULT_MODE
+    try:
+        return parse_mode(spec)
+    except ValueError as e:
+        print(f"⚠️  {var} ignored, profiling stays off: {e}")
+        return None
+
+
+def _alloc_acquire():
+    global _alloc_users, _alloc_owned
+    with _alloc_lock:
+        if _alloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _alloc_owned = True
+        _alloc_users += 1
+
+
+def _alloc_release():
+    """Snapshot of the shared session; tracing stops with the last profiler that started it."""
+    global _alloc_users, _alloc_owned
+    with _alloc_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _alloc_users -= 1
+        if _alloc_users == 0 and _alloc_owned:
+            tracemalloc.stop()
+            _alloc_owned = False
+    return snapshot
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _function_of(label):
+    """'name (file.py:42)' -> 'name (file.py)'"""
+    return label.rsplit(':', 1)[0] + ')'
+
+
+class Profiler:
+    def __init__(self, name, mode=DEFAULT_MODE, out_dir=PROFILE_DIR,
+                 interval=DEFAULT_INTERVAL, top=DEFAULT_TOP, trace_alloc=False, enabled=True):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' (expected one of {', '.join(MODES)})")
+        self.name = name
+        self.mode = mode
+        self.out_dir = out_dir
+        self.interval = interval
+        self.top = top
+        self.trace_alloc = trace_alloc
+        self.enabled = enabled
+        self.stacks = Counter()
+        self.samples = 0
+        self.paths = []
+        self._thread_id = None
+        self._sampler = None
+        self._stop_event = threading.Event()
+        self._cprofile = None
+        self._tracing_alloc = False
+        self._t0 = None
+
+    @classmethod
+    def from_argv(cls, name, argv=None, **kwargs):
+        """``--profile`` / ``--profile=cprofile[+alloc]`` on the command line; disabled otherwise."""
+        argv = sys.argv[1:] if argv is None else argv
+        for arg in argv:
+            if arg == '--profile':
+                return cls(name, **kwargs).start()
+            if arg.startswith('--profile='):
+                mode, trace_alloc = parse_mode(arg.split('=', 1)[1])
+                return cls(name, mode=mode, trace_alloc=trace_alloc, **kwargs).start()
+        return cls(name, enabled=False, **kwargs)
+
+    @classmethod
+    def from_mode(cls, name, mode, **kwargs):
+        """Profiler for a ``mode_from_env()`` result; disabled when it is None."""
+        if mode is None:
+            return cls(name, enabled=False, **kwargs)
+        return cls(name, mode=mode[0], trace_alloc=mode[1], **kwargs)
+
+    # ─── Start / stop ──────────────────────────────────────────────
+
+    def start(self):
+        if not self.enabled:
+            return self
+        self._t0 = time.perf_counter()
+        if self.trace_alloc:
+            _alloc_acquire()
+            self._tracing_alloc = True
+
+        if self.mode == 'cprofile':
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            self._thread_id = threading.get_ident()
+            self._stop_event.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name='biosync-profiler', daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        """Stops profiling and writes the output files. Returns their paths."""
+        if not self.enabled or self._t0 is None:
+            return []
+        elapsed = time.perf_counter() - self._t0
+        self._t0 = None
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._stop_event.set()
+            self._sampler.join()
+            self._sampler = None
+
+        alloc_snapshot = None
+        if self._tracing_alloc:
+            # includes what concurrent profiled runs allocated in the meantime
+            alloc_snapshot = _alloc_release()
+            self._tracing_alloc = False
+
+        self.paths = self._write(elapsed, alloc_snapshot)
+        for path in self.paths:
+            print(f"🔬 Profile written: {path}")
+        return self.paths
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # ─── Sampling ──────────────────────────────────────────────────
+
+    def _sample_loop(self):
+        target = self._thread_id
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[';'.join(stack)] += 1
+            self.samples += 1
+
+    # ─── Output ────────────────────────────────────────────────────
+
+    def _write(self, elapsed, alloc_snapshot):
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        paths = []
+        report = [f"Profile: {self.name}  mode={self.mode}  wall={elapsed:.3f}s", ""]
+
+        if self.mode == 'cprofile':
+            import io
+            import pstats
+            stats_path = base + '.pstats'
+            self._cprofile.dump_stats(stats_path)
+            paths.append(stats_path)
+            buffer = io.StringIO()
+            pstats.Stats(self._cprofile, stream=buffer).sort_stats('tottime').print_stats(self.top)
+            report.append(buffer.getvalue())
+        else:
+            collapsed_path = base + '.collapsed'
+            with open(collapsed_path, 'w', encoding='utf-8') as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(collapsed_path)
+            report.extend(self._hotspot_table())
+
+        if alloc_snapshot is not None:
+            report.append("")
+            report.append(f"Top {self.top} allocation sites (tracemalloc):")
+            for stat in alloc_snapshot.statistics('lineno')[:self.top]:
+                report.append(f"  {stat}")
+
+        top_path = base + '_top.txt'
+        with open(top_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(report) + '\n')
+        paths.append(top_path)
+        return paths
+
+    def _hotspot_table(self):
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for label in {_function_of(label) for label in frames}:
+                inclusive[label] += count
+
+        total = max(self.samples, 1)
+        lines = [f"{self.samples} samples every {self.interval * 1000:.1f} ms", ""]
+        lines.append(f"Top {self.top} by own time (line that was executing):")
+        for label, count in own.most_common(self.top):
+            lines.append(f"  {count * 100 / total:6.2f}%  {count:7d}  {label}")
+        lines.append("")
+        lines.append(f"Top {self.top} functions by inclusive time:")
+        for label, count in inclusive.most_common(self.top):
+            lines.append(f"  {count * 100 / total:6.2f}%  {count:7d}  {label}")
+        return lines
@@ -0,0 +1,316 @@
+"""
+Binary punch log
+================
+data/punches.bin: an append-only, time-sorted file of fixed-size punch
+records, kept by the syncs as a read-optimized mirror of the device log.
+
+    header  4096 bytes   magic, version, record size, device table (JSON)
+    record    24 bytes   epoch int64 | user_id 9s | status u8 |
+                         punch_state u8 | collapsed u8 | device u16 | pad
+
+Readers mmap the file and bisect on the epoch column, so a range query
+("today", "this week") touches only the pages holding that range and does
+no JSON parsing. Epochs are naive wall-clock seconds
+(biosync.shifts.epoch_seconds); user_id is at most 9 ASCII characters, the
+device's own limit.
+
+Writers (the proxy, the syncs, the scheduler's jobs - several processes)
+take an exclusive lock (<path>.lock) around reading the tail and writing.
+append() writes punches newer than the last record at the end of the file.
+Punches older than that which the log does not hold yet (a backfill, or a
+sync with an earlier window than the process that created the log) are
+merged in by an atomic rebuild() instead. A torn last record left by a
+crashed writer is cut off before the next append. Every query maps the
+current file, so readers see all of it.
+
+    python -m biosync.punch_log rebuild            # from data/employees + data/archive
+    python -m biosync.punch_log query --from 2026-01-05 --to 2026-01-06 [--employee 144]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from biosync.leader import LeaderLock
+from biosync.punches import DEVICE_ID, Punch
+from biosync.shifts import epoch_seconds
+
+PUNCH_LOG_PATH = os.path.join('data', 'punches.bin')
+
+MAGIC = b'BIOPUNCH'
+VERSION = 1
+HEADER_SIZE = 4096
+RECORD = struct.Struct('<q9sBBBH2x')
+_HEADER_FIXED = struct.Struct('<8sHHI')  # magic, version, record size, device table length
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _EpochColumn:
+    """Sequence view of the epoch column, for bisect (reads 8 bytes per probe)."""
+
+    def __init__(self, buf, count):
+        self._buf = buf
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return struct.unpack_from('<q', self._buf, HEADER_SIZE + i * RECORD.size)[0]
+
+
+class PunchLog:
+    def __init__(self, path=PUNCH_LOG_PATH):
+        self.path = path
+        self.devices = [DEVICE_ID]
+
+    # ─── Reading ───────────────────────────────────────────────────
+
+    @contextmanager
+    def _mapped(self):
+        """
+        Read-only map of the current file, or None if it is missing/empty.
+        Mapped per query: appends and rebuilds are always seen, and no map is
+        held open across queries (Windows cannot replace a mapped file).
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            yield None
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= HEADER_SIZE:
+                yield None
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                self.devices = self._read_devices(buf)
+                yield buf
+
+    @staticmethod
+    def _read_devices(buf):
+        magic, version, record_size, table_len = _HEADER_FIXED.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"Not a v{VERSION} punch log")
+        return json.loads(bytes(buf[_HEADER_FIXED.size:_HEADER_FIXED.size + table_len]))
+
+    @staticmethod
+    def _count(buf):
+        return (len(buf) - HEADER_SIZE) // RECORD.size  # ignores a torn last record
+
+    @staticmethod
+    def _bounds(buf, start, end):
+        epochs = _EpochColumn(buf, PunchLog._count(buf))
+        lo = 0 if start is None else bisect_left(epochs, start)
+        hi = len(epochs) if end is None else bisect_left(epochs, end, lo)
+        return lo, hi
+
+    def __len__(self):
+        with self._mapped() as buf:
+            return 0 if buf is None else self._count(buf)
+
+    def count(self, start=None, end=None):
+        """Number of records with start <= epoch < end (epoch seconds), found by bisect only."""
+        with self._mapped() as buf:
+            if buf is None:
+                return 0
+            lo, hi = self._bounds(buf, start, end)
+            return hi - lo
+
+    def read(self, start=None, end=None):
+        """Raw records with start <= epoch < end (epoch seconds), as bytes."""
+        with self._mapped() as buf:
+            if buf is None:
+                return b''
+            lo, hi = self._bounds(buf, start, end)
+            return buf[HEADER_SIZE + lo * RECORD.size:HEADER_SIZE + hi * RECORD.size]
+
+    def range(self, start=None, end=None, user_id=None):
+        """Punches with start <= timestamp < end (datetimes), oldest first."""
+        raw = self.read(
+            None if start is None else epoch_seconds(start),
+            None if end is None else epoch_seconds(end),
+        )
+        want = None if user_id is None else str(user_id).encode('ascii')
+        devices = self.devices
+        punches = []
+        for epoch, user, status, state, collapsed, device in RECORD.iter_unpack(raw):
+            user = user.rstrip(b'\0')
+            if want is not None and user != want:
+                continue
+            punches.append(Punch(user.decode('ascii'), _EPOCH + timedelta(seconds=epoch), status,
+                                 devices[device], collapsed, state))
+        return punches
+
+    def last_epoch(self):
+        with self._mapped() as buf:
+            if buf is None or not self._count(buf):
+                return None
+            return _EpochColumn(buf, self._count(buf))[self._count(buf) - 1]
+
+    def _keys(self, start):
+        """{(epoch, user_id bytes)} of the records from ``start`` (epoch seconds) on."""
+        return {(epoch, user.rstrip(b'\0')) for epoch, user, *_ in RECORD.iter_unpack(self.read(start))}
+
+    # ─── Writing ───────────────────────────────────────────────────
+
+    def _header(self):
+        table = json.dumps(self.devices).encode('utf-8')
+        header = _HEADER_FIXED.pack(MAGIC, VERSION, RECORD.size, len(table)) + table
+        if len(header) > HEADER_SIZE:
+            raise ValueError("Device table does not fit in the punch log header")
+        return header.ljust(HEADER_SIZE, b'\0')
+
+    def _encode(self, punches):
+        out = bytearray()
+        for punch in punches:
+            if punch.device_id not in self.devices:
+                self.devices.append(punch.device_id)
+            out += RECORD.pack(
+                epoch_seconds(punch.timestamp), punch.user_id.encode('ascii'),
+                punch.status & 0xFF, punch.punch_state & 0xFF, min(punch.collapsed, 255),
+                self.devices.index(punch.device_id),
+            )
+        return out
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock shared with every other writer of this file (any process)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock = LeaderLock(f"{self.path}.lock").acquire()
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def _trim_torn_tail(self):
+        """Cuts a partial last record (a writer died mid-append); False if there is no usable log."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return False
+        if size < HEADER_SIZE:
+            return False
+        torn = (size - HEADER_SIZE) % RECORD.size
+        if torn:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size - torn)
+        return True
+
+    def append(self, punches):
+        """
+        Writes the punches (time-sorted) that the log does not hold yet (same
+        user + same second = same punch): appended when they are newer than
+        the last record, merged by a rebuild when some are older. Returns how
+        many were written.
+        """
+        punches = list(punches)
+        with self._locked():
+            if not self._trim_torn_tail() or self.last_epoch() is None:
+                return self._rebuild(punches)
+            if not punches:
+                return 0
+
+            epochs = [epoch_seconds(punch.timestamp) for punch in punches]
+            stored = self._keys(min(epochs))
+            new = []
+            for punch, epoch in zip(punches, epochs):
+                key = (epoch, punch.user_id.encode('ascii'))
+                if key not in stored:
+                    stored.add(key)
+                    new.append((epoch, punch))
+            if not new:
+                return 0
+            if min(epoch for epoch, _ in new) < self.last_epoch():
+                self._rebuild([*self.range(), *(punch for _, punch in new)])
+                return len(new)
+            new = [punch for _, punch in new]
+
+            devices_before = len(self.devices)
+            data = self._encode(new)
+            with open(self.path, 'r+b') as f:
+                if len(self.devices) != devices_before:
+                    f.write(self._header())
+                f.seek(0, os.SEEK_END)
+                f.write(data)
+            return len(new)
+
+    def rebuild(self, punches):
+        """Rewrites the whole log from ``punches`` (any order), atomically."""
+        with self._locked():
+            return self._rebuild(punches)
+
+    def _rebuild(self, punches):
+        punches = sorted(punches, key=lambda p: p.timestamp)
+        self.devices = [DEVICE_ID]
+        data = self._encode(punches)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._header())
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        return len(punches)
+
+
+def punches_from_employees(employees):
+    """Stored JSON records (load_employees()) back to Punch tuples."""
+    for user_id, data in employees.items():
+        for records in data['attendance'].values():
+            for r in records:
+                yield Punch(user_id, datetime.fromisoformat(r['timestamp']), r.get('statusCode', 0),
+                            r.get('deviceId', DEVICE_ID), r.get('collapsed', 0))
+
+
+def main(argv=None):
+    from biosync.archive import ARCHIVE_DIR, punches as sealed_punches
+    from biosync.employee_store import DATA_DIR, load_employees
+
+    parser = argparse.ArgumentParser(description='Binary punch log (data/punches.bin)')
+    parser.add_argument('--path', default=PUNCH_LOG_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+    rebuild = sub.add_parser('rebuild', help='rewrite the log from data/employees and the sealed months')
+    rebuild.add_argument('--data-dir', default=DATA_DIR)
+    rebuild.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    query = sub.add_parser('query', help='print punches in a time range')
+    query.add_argument('--from', dest='start', help='YYYY-MM-DD[THH:MM:SS]')
+    query.add_argument('--to', dest='end', help='YYYY-MM-DD[THH:MM:SS] (exclusive)')
+    query.add_argument('--employee')
+    args = parser.parse_args(argv)
+
+    log = PunchLog(args.path)
+    if args.command == 'rebuild':
+        count = log.rebuild([*sealed_punches(args.archive_dir),
+                             *punches_from_employees(load_employees(args.data_dir))])
+        print(f"✓ {count} بصمة -> {args.path} ({os.path.getsize(args.path):,} bytes)")
+        return 0
+
+    start = datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.fromisoformat(args.end) if args.end else None
+    count = 0
+    for punch in log.range(start, end, args.employee):
+        print(f"{punch.user_id:>6}  {punch.timestamp.isoformat()}  status={punch.status}"
+              + (f"  collapsed={punch.collapsed}" if punch.collapsed else ""))
+        count += 1
+    print(f"{count} بصمة")
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
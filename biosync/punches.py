@@ -0,0 +1,62 @@
+"""
+Punch model
+===========
+One fingerprint/face punch as read from the device (or from an old export),
+and the JSON record shape the sync scripts store in data/employees.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import NamedTuple
+
+DEVICE_ID = 'uFace800-Main'
+PUNCH_HASH_BITS = 48  # a month's sum of hashes stays far below 2**63 (Firestore sum())
+
+
+class Punch(NamedTuple):
+    user_id: str
+    timestamp: datetime
+    status: int
+    device_id: str = DEVICE_ID
+    collapsed: int = 0  # double taps merged into this punch (biosync.debounce)
+    punch_state: int = 0  # device punch code (0/1 = in, 2/3 = out on most firmwares)
+
+    @classmethod
+    def from_log(cls, log):
+        """From a pyzk Attendance object."""
+        return cls(str(log.user_id), log.timestamp, log.status, punch_state=log.punch)
+
+    @property
+    def key(self):
+        """Dedup key: same user, same second."""
+        return (self.user_id, self.timestamp.isoformat())
+
+
+def punch_hash(user_id, iso_timestamp):
+    """
+    Checksum term of one punch (user + second). A month's checksum is the
+    sum of its punches' terms: order-independent, and every store can compute
+    it the same way (Firestore: a sum() aggregation over 'punchHash').
+    """
+    digest = hashlib.blake2b(f"{user_id}|{iso_timestamp}".encode('utf-8'), digest_size=PUNCH_HASH_BITS // 8)
+    return int.from_bytes(digest.digest(), 'big')
+
+
+def make_record(punch, record_type):
+    """JSON record as stored under attendance[<YYYY-MM>] in data/employees/*.json."""
+    # Sliced from one isoformat() call instead of three strftime() calls
+    iso = punch.timestamp.isoformat()
+    date = iso[:10]
+    clock = iso[11:19]
+    record = {
+        'id': f"{date[:4]}{date[5:7]}{date[8:10]}_{clock[:2]}{clock[3:5]}{clock[6:8]}_{record_type}",
+        'date': date,
+        'time': clock,
+        'timestamp': iso,
+        'type': record_type,
+        'statusCode': punch.status,
+        'deviceId': punch.device_id
+    }
+    if punch.collapsed:
+        record['collapsed'] = punch.collapsed
+    return record
@@ -0,0 +1,374 @@
+"""
+Device vs. store reconciliation
+===============================
+Checks that every store holds exactly the device's punches, one
+(employee, month) at a time, without re-uploading or re-reading everything:
+
+    device      punches since --since, debounced like the syncs, grouped
+                per store's month rule -> (count, checksum) per employee-month
+    local       data/employees: the sharded index already holds both numbers
+                (--deep re-reads the shards); flat files are parsed; sealed
+                months (biosync.archive) are immutable and skipped
+    log         data/punches.bin (one sequential scan)
+    firestore   one count()/sum('punchHash') aggregation query per
+                employee-month, employees queried concurrently
+
+The checksum of a month is the sum of biosync.punches.punch_hash(user,
+second) over its punches: independent of order, of record layout and of
+how the punch was classified, and computable server-side by Firestore.
+
+Every employee-month ends up as one of
+
+    ok        same count and checksum
+    mismatch  both have the month, with different punches
+    missing   the device has the month, the store does not
+    extra     the store has the month, the device does not (e.g. the
+              device log was cleared); reported, never repaired
+
+--repair rewrites only the mismatched and missing months, from the device.
+
+    python -m biosync.reconcile                          # local + log
+    python -m biosync.reconcile --stores local,firestore --repair
+    python -m biosync.reconcile --data-dir /srv/employees --archive-dir /srv/archive
+
+Device address, --since and the Firestore key default to the ``biosync``
+CLI's (biosync.cli, biosync.firestore_push).
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from biosync import serializer
+from biosync.archive import ARCHIVE_DIR, load_index
+from biosync.cli import add_device_arguments
+from biosync.debounce import DebounceStats, debounce
+from biosync.employee_store import (DATA_DIR, MonthShards, month_checksums, new_employee, open_employee,
+                                    save_employee, save_sharded)
+from biosync.metrics import Run
+from biosync.punch_log import PUNCH_LOG_PATH, PunchLog
+from biosync.punches import Punch, make_record, punch_hash
+from biosync.shifts import ShiftSchedule, assign_shifts, classify_by_cutoff, classify_first_last
+
+STORES = ('local', 'log', 'firestore')
+REPAIRABLE = ('mismatch', 'missing')
+
+
+def checksum(punches):
+    """(count, checksum) of a group of punches."""
+    return len(punches), sum(punch_hash(p.user_id, p.timestamp.isoformat()) for p in punches)
+
+
+def by_calendar_month(punches):
+    groups = defaultdict(list)
+    for punch in punches:
+        groups[(punch.user_id, punch.timestamp.strftime('%Y-%m'))].append(punch)
+    return groups
+
+
+def compare(device, stored, since_month):
+    """
+    device: {(user_id, month): [Punch]}, stored: {(user_id, month): (count, checksum)}.
+    Returns {(user_id, month): status} for every employee-month that is not ok.
+    """
+    diffs = {}
+    for key, punches in device.items():
+        if key not in stored:
+            diffs[key] = 'missing'
+        elif checksum(punches) != tuple(stored[key]):
+            diffs[key] = 'mismatch'
+    for key in stored:
+        if key not in device and key[1] >= since_month:
+            diffs[key] = 'extra'
+    return diffs
+
+
+# ─── Stores ────────────────────────────────────────────────────────
+
+class LocalStore:
+    """data/employees (either layout); months are shift months, like the syncs."""
+    name = 'local'
+
+    def __init__(self, data_dir=DATA_DIR, schedule=None, smart=False, names=None, deep=False,
+                 archive_dir=ARCHIVE_DIR):
+        self.data_dir = data_dir
+        self.schedule = schedule or ShiftSchedule.load()
+        self.smart = smart
+        self.names = names or {}
+        self.deep = deep
+        self.sealed = load_index(archive_dir)
+
+    def group(self, punches):
+        groups = defaultdict(list)
+        for user_id, shifts in assign_shifts(punches, self.schedule).items():
+            for instance, shift_punches in shifts:
+                if instance.month not in self.sealed:
+                    groups[(user_id, instance.month)].extend(shift_punches)
+        return groups
+
+    def checksums(self, keys):
+        return month_checksums(self.data_dir, read_shards=self.deep)
+
+    def _records(self, user_id, punches):
+        records = []
+        for instance, shift_punches in assign_shifts(punches, self.schedule).get(user_id, []):
+            if self.smart:
+                types = classify_first_last(shift_punches, instance)  # sync_smart.py
+            else:
+                types = [classify_by_cutoff(p, instance) for p in shift_punches]  # sync_simple.py
+            records.extend(make_record(p, t) for p, t in zip(shift_punches, types))
+        return records
+
+    def repair(self, keys, groups):
+        by_user = defaultdict(list)
+        for user_id, month in keys:
+            by_user[user_id].append(month)
+        for user_id, months in by_user.items():
+            data = open_employee(user_id, self.data_dir)
+            if data is None:
+                data = new_employee(user_id, self.names.get(user_id, f"Unknown_{user_id}"))
+            sharded = isinstance(data['attendance'], MonthShards)
+            # Sharded: only the repaired months are passed (and rewritten); flat: the whole file
+            attendance = {} if sharded else dict(data['attendance'])
+            for month in months:
+                attendance[month] = self._records(user_id, groups[(user_id, month)])
+            repaired = {'profile': data['profile'], 'attendance': dict(sorted(attendance.items()))}
+            if sharded:
+                save_sharded(repaired, self.data_dir, force=True)
+            else:
+                save_employee(repaired, self.data_dir)
+
+
+class PunchLogStore:
+    """data/punches.bin; calendar months. Repair rebuilds the file (it is append-only)."""
+    name = 'log'
+
+    def __init__(self, path=PUNCH_LOG_PATH):
+        self.log = PunchLog(path)
+
+    def group(self, punches):
+        return by_calendar_month(punches)
+
+    def checksums(self, keys):
+        return {key: checksum(punches) for key, punches in by_calendar_month(self.log.range()).items()}
+
+    def repair(self, keys, groups):
+        keys = set(keys)
+        kept = [p for p in self.log.range() if (p.user_id, p.timestamp.strftime('%Y-%m')) not in keys]
+        self.log.rebuild(kept + [p for key in keys for p in groups[key]])
+
+
+class FirestoreStore:
+    """
+    Firestore (biosync.firestore_store); calendar months. Only the device's
+    employee-months are queried, so months that exist only in Firestore are
+    not reported.
+    """
+    name = 'firestore'
+
+    def __init__(self, db, names, workers=16):
+        self.db = db
+        self.names = names
+        self.workers = workers
+
+    def _name(self, user_id):
+        return self.names.get(user_id, f"Unknown_{user_id}")
+
+    def group(self, punches):
+        return by_calendar_month(punches)
+
+    def _per_employee(self, keys, fn):
+        """Runs fn(user_id, months) concurrently, one task per employee."""
+        by_user = defaultdict(list)
+        for user_id, month in keys:
+            by_user[user_id].append(month)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda item: fn(*item), by_user.items()))
+
+    def checksums(self, keys):
+        from biosync.firestore_store import month_checksum
+
+        def employee(user_id, months):
+            name = self._name(user_id)
+            return {(user_id, month): month_checksum(self.db, user_id, name, month) for month in months}
+
+        stored = {}
+        for result in self._per_employee(keys, employee):
+            stored.update((key, value) for key, value in result.items() if value[0])
+        return stored
+
+    def repair(self, keys, groups):
+        from firebase_admin import firestore
+
+        from biosync.firestore_store import write_month
+
+        def employee(user_id, months):
+            name = self._name(user_id)
+            for month in months:
+                write_month(self.db, user_id, name, month, groups[(user_id, month)], firestore.SERVER_TIMESTAMP)
+
+        self._per_employee(keys, employee)
+
+
+# ─── Reconciliation ────────────────────────────────────────────────
+
+def device_punches(attendance, since, window=None):
+    """Device log -> the punches the syncs store: since ``since``, time-sorted, debounced."""
+    recent = sorted((log for log in attendance if log.timestamp >= since), key=lambda log: log.timestamp)
+    return list(debounce((Punch.from_log(log) for log in recent), window, DebounceStats()))
+
+
+def reconcile(punches, stores, since, repair=False, run=None):
+    """Checks (and optionally repairs) every store; returns a report dict per store."""
+    since_month = since.strftime('%Y-%m')
+    report = {}
+    for store in stores:
+        t0 = time.perf_counter()
+        groups = store.group(punches)
+        stored = store.checksums(groups.keys())
+        diffs = compare(groups, stored, since_month)
+        checked = len(set(groups) | {key for key in stored if key[1] >= since_month})
+        elapsed = time.perf_counter() - t0
+
+        repaired = [key for key, status in diffs.items() if status in REPAIRABLE]
+        if repair and repaired:
+            store.repair(repaired, groups)
+        if run is not None:
+            run.lap(f"check_{store.name}")
+            run.count(f"{store.name}_mismatched_months", len(diffs))
+
+        report[store.name] = {
+            'employeeMonths': checked,
+            'seconds': round(elapsed, 3),
+            'ok': checked - len(diffs),
+            'differences': [
+                {
+                    'employeeId': user_id,
+                    'month': month,
+                    'status': status,
+                    'device': list(checksum(groups[(user_id, month)])) if (user_id, month) in groups else None,
+                    'store': list(stored[(user_id, month)]) if (user_id, month) in stored else None,
+                }
+                for (user_id, month), status in sorted(diffs.items())
+            ],
+            'repaired': len(repaired) if repair else 0,
+        }
+    return report
+
+
+def _firestore_client(key_path):
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(key_path))
+    return firestore.client()
+
+
+def main(argv=None):
+    from zk import ZK
+
+    from biosync.firestore_push import FIREBASE_KEY_PATH
+    from biosync.user_directory import UserDirectory
+
+    parser = argparse.ArgumentParser(description='Reconcile the device with the local/Firestore stores')
+    parser.add_argument('--stores', default='local,log', help=f"comma-separated: {', '.join(STORES)}")
+    add_device_arguments(parser)
+    parser.add_argument('--repair', action='store_true', help='rewrite mismatched/missing months from the device')
+    parser.add_argument('--smart', action='store_true', help='classify repaired local months like sync_smart.py')
+    parser.add_argument('--deep', action='store_true', help='local: read the shards instead of trusting the index')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='sealed months of --data-dir')
+    parser.add_argument('--punch-log', default=PUNCH_LOG_PATH)
+    parser.add_argument('--firebase-key', default=FIREBASE_KEY_PATH, help='service account JSON')
+    parser.add_argument('--workers', type=int, default=16, help='concurrent Firestore employees')
+    parser.add_argument('--json', help='write the full report to this file')
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.stores.split(',') if name.strip()]
+    unknown = [name for name in names if name not in STORES]
+    if unknown:
+        parser.error(f"unknown store(s): {', '.join(unknown)}")
+    since = datetime.fromisoformat(args.since)
+
+    print("="*70)
+    print("مطابقة الجهاز مع المخازن" + (" (مع الإصلاح)" if args.repair else ""))
+    print("="*70)
+
+    run = Run('reconcile')
+    conn = None
+    try:
+        print(f"\n[1/2] قراءة البصمات من الجهاز {args.ip}...")
+        conn = ZK(args.ip, port=args.port, timeout=15).connect()
+        run.lap('connect')
+        directory = UserDirectory()
+        directory.refresh(conn)
+        attendance = conn.get_attendance()
+        run.lap('get_attendance')
+    except Exception as e:
+        print(f"      ✗ خطأ في الاتصال بالجهاز: {e}")
+        run.finish('error')
+        run.write_json_line()
+        return 1
+    finally:
+        if conn:
+            conn.enable_device()
+            conn.disconnect()
+
+    punches = device_punches(attendance, since)
+    run.count('device_punches', len(punches))
+    print(f"      ✓ {len(punches)} بصمة منذ {since.date()}")
+
+    employee_names = {user_id: directory.get(user_id) for user_id in {p.user_id for p in punches}}
+    employee_names = {user_id: name for user_id, name in employee_names.items() if name}
+    stores = []
+    for name in names:
+        if name == 'local':
+            stores.append(LocalStore(args.data_dir, smart=args.smart, names=employee_names, deep=args.deep,
+                                     archive_dir=args.archive_dir))
+        elif name == 'log':
+            stores.append(PunchLogStore(args.punch_log))
+        else:
+            stores.append(FirestoreStore(_firestore_client(args.firebase_key), employee_names, args.workers))
+
+    print("\n[2/2] المطابقة...")
+    report = reconcile(punches, stores, since, args.repair, run)
+
+    clean = True
+    for store_name, result in report.items():
+        counts = defaultdict(int)
+        for diff in result['differences']:
+            counts[diff['status']] += 1
+        print(f"\n  {store_name}: {result['employeeMonths']} موظف-شهر في {result['seconds']}s"
+              f" | ok {result['ok']} | mismatch {counts['mismatch']} | missing {counts['missing']}"
+              f" | extra {counts['extra']}")
+        for diff in result['differences'][:20]:
+            device = diff['device'][0] if diff['device'] else 0
+            store = diff['store'][0] if diff['store'] else 0
+            print(f"    {diff['status']:<9} {diff['employeeId']:>6} {diff['month']}  "
+                  f"device {device:>5}  store {store:>5}")
+        if len(result['differences']) > 20:
+            print(f"    ... و {len(result['differences']) - 20} أخرى")
+        if result['repaired']:
+            print(f"    ✓ تم إصلاح {result['repaired']} موظف-شهر")
+        elif any(d['status'] in REPAIRABLE for d in result['differences']):
+            clean = False
+
+    if args.json:
+        with open(args.json, 'wb') as f:
+            f.write(serializer.dumps(report))
+        print(f"\n✓ {args.json}")
+    run.finish()
+    run.write_json_line()
+    print("="*70)
+    return 0 if clean else 1
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Store reports
+=============
+Read-only views of the local store, no device and no numpy:
+
+    checkin_checkout()   ``biosync report`` (report_checkin_checkout.py):
+                         check-ins vs check-outs per employee, sealed months
+                         taken from the archive summaries
+    inspect(id, month)   ``biosync inspect`` (check_data.py): one employee's
+                         month, from the archive if the month is sealed
+"""
+
+from biosync.archive import ARCHIVE_DIR, load_index, read_month
+from biosync.employee_store import DATA_DIR, load_employees, open_employee
+
+
+def checkin_checkout(data_dir=DATA_DIR, archive_dir=ARCHIVE_DIR):
+    print("="*70)
+    print("تقرير الدخول والخروج - جميع الموظفين")
+    print("="*70)
+
+    total_checkins = 0
+    total_checkouts = 0
+    employees_with_no_checkouts = []
+
+    # الأشهر المؤرشفة: من الملخص المحسوب مسبقاً (بدون فك ضغط أي شهر)
+    sealed_counts = {}
+    for entry in load_index(archive_dir).values():
+        for emp_id, summary in entry['summary']['perEmployee'].items():
+            counts = sealed_counts.setdefault(emp_id, {'name': summary['name'], 'checkins': 0, 'checkouts': 0})
+            counts['checkins'] += summary['checkins']
+            counts['checkouts'] += summary['checkouts']
+
+    # الأشهر المفتوحة: الملفات المسطحة أو المقسّمة حسب الشهر
+    employees = load_employees(data_dir)
+    for emp_id, counts in sealed_counts.items():
+        employees.setdefault(emp_id, {'profile': {'name': counts['name']}, 'attendance': {}})
+
+    for emp_id, data in employees.items():
+        emp_name = data['profile']['name']
+        sealed = sealed_counts.get(emp_id, {})
+        emp_checkins = sealed.get('checkins', 0)
+        emp_checkouts = sealed.get('checkouts', 0)
+
+        for records in data['attendance'].values():
+            for record in records:
+                if record['type'] == 'check-in':
+                    emp_checkins += 1
+                elif record['type'] == 'check-out':
+                    emp_checkouts += 1
+
+        total_checkins += emp_checkins
+        total_checkouts += emp_checkouts
+
+        if emp_checkouts == 0:
+            employees_with_no_checkouts.append(emp_name)
+
+        if emp_checkouts > 0:  # فقط الموظفين اللي عندهم خروج
+            print(f"\n{emp_name}:")
+            print(f"  دخول: {emp_checkins}")
+            print(f"  خروج: {emp_checkouts}")
+            print(f"  نسبة الخروج: {(emp_checkouts/emp_checkins*100):.1f}%")
+
+    print("\n" + "="*70)
+    print("الإحصائيات الإجمالية")
+    print("="*70)
+    print(f"إجمالي الدخول: {total_checkins}")
+    print(f"إجمالي الخروج: {total_checkouts}")
+    print(f"نسبة الخروج: {(total_checkouts/total_checkins*100):.1f}%")
+
+    print(f"\nالموظفين بدون أي تسجيل خروج: {len(employees_with_no_checkouts)}")
+    if employees_with_no_checkouts:
+        print("\nقائمة الموظفين بدون خروج:")
+        for name in employees_with_no_checkouts[:10]:  # أول 10 فقط
+            print(f"  - {name}")
+        if len(employees_with_no_checkouts) > 10:
+            print(f"  ... و {len(employees_with_no_checkouts) - 10} موظف آخر")
+
+    print("\n" + "="*70)
+    print("التوصيات")
+    print("="*70)
+    print("1. الموظفون يسجلون دخول أكثر من خروج")
+    print("2. قد يكون الجهاز مضبوط على تسجيل كل بصمة كـ 'دخول'")
+    print("3. تحقق من إعدادات الجهاز لتفعيل تسجيل الخروج التلقائي")
+    print("="*70 + "\n")
+    return 0
+
+
+def inspect(employee_id='1', month='2025-12', limit=10, data_dir=DATA_DIR, archive_dir=ARCHIVE_DIR):
+    # قراءة موظف واحد (في التخزين المقسّم حسب الشهر يُقرأ الشهر المطلوب فقط)
+    data = open_employee(employee_id, data_dir)
+
+    # من الأرشيف إذا كان الشهر مؤرشفاً
+    records = data['attendance'].get(month) if data else None
+    if records is None:
+        records = read_month(month, archive_dir).get(employee_id, []) if month in load_index(archive_dir) else []
+
+    checkins = [r for r in records if r['type'] == 'check-in']
+    checkouts = [r for r in records if r['type'] == 'check-out']
+
+    print(f"إجمالي السجلات: {len(records)}")
+    print(f"Check-ins (دخول): {len(checkins)}")
+    print(f"Check-outs (خروج): {len(checkouts)}")
+    print(f"\nأول {limit} سجلات خروج:")
+    print("-" * 60)
+
+    for r in checkouts[:limit]:
+        print(f"{r['date']} {r['time']} - Status Code: {r['statusCode']}")
+    return 0
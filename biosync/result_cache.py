@@ -0,0 +1,192 @@
+"""
+Result cache
+============
+Versioned LRU cache for the proxy's report-style endpoints
+(/api/reports/monthly, /api/records), so repeat dashboard loads are served
+from memory instead of being recomputed from every punch of the last sync.
+
+    DataVersions   a counter per (employee, month), bumped when a new
+                   snapshot changes that employee's punches in that month
+    ResultCache    encoded response bodies keyed by (endpoint, normalized
+                   params), each stored with the versions it was computed
+                   from; a lookup whose versions have moved on is a miss
+
+Invalidation is as narrow as the change: one new punch bumps one
+employee-month, which invalidates that employee's views of the month and
+the all-employee report of the month, and nothing else. A punch within a
+day of a month boundary also bumps the neighbouring month, because
+overnight shifts are reported in the month they start in
+(biosync.analytics keeps a day of margin for the same reason).
+
+Bodies are bounded by BIOSYNC_RESULT_CACHE_MB (default 64, 0 disables);
+the least recently used are evicted first.
+"""
+
+import os
+import threading
+from collections import Counter, OrderedDict
+from datetime import date, timedelta
+
+DEFAULT_MAX_MB = 64
+_HASH_MASK = (1 << 64) - 1
+
+
+def _months_of(day):
+    """'YYYY-MM-DD' -> months whose report can see a punch of that day."""
+    month = day[:7]
+    current = date.fromisoformat(day)
+    before = (current - timedelta(days=1)).isoformat()[:7]
+    after = (current + timedelta(days=1)).isoformat()[:7]
+    return tuple(dict.fromkeys((before, month, after)))
+
+
+def month_range(first, last):
+    """Inclusive 'YYYY-MM' range: month_range('2025-11', '2026-01') -> 3 months."""
+    year, month = int(first[:4]), int(first[5:7])
+    end = (int(last[:4]), int(last[5:7]))
+    months = []
+    while (year, month) <= end:
+        months.append(f'{year:04d}-{month:02d}')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def digest(records):
+    """
+    Proxy records -> {(employeeId, month): (count, hash sum)}.
+    Order-independent, and covers every field a cached result shows.
+    """
+    digests = {}
+    months_by_day = {}
+    for r in records:
+        day = r['timestamp'][:10]
+        months = months_by_day.get(day)
+        if months is None:
+            months = months_by_day[day] = _months_of(day)
+        h = hash((r['timestamp'], r['type'], r['employeeName'], r['deviceId'], r.get('collapsed', 0)))
+        for month in months:
+            key = (r['employeeId'], month)
+            count, total = digests.get(key, (0, 0))
+            digests[key] = (count + 1, (total + h) & _HASH_MASK)
+    return digests
+
+
+class DataVersions:
+    """Version counters per (employee, month), per employee, per month and overall."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = None
+        self._digests = {}
+        self._cells = Counter()
+        self._employees = Counter()
+        self._months = Counter()
+        self.total = 0
+
+    def observe(self, records):
+        """
+        Bumps every (employee, month) whose punches differ from the last
+        observed records, and returns those keys. The same list object again
+        is a no-op, so this can run on every request.
+        """
+        with self._lock:
+            if records is self._records:
+                return []
+            digests = digest(records)
+            changed = [key for key in digests.keys() | self._digests.keys()
+                       if digests.get(key) != self._digests.get(key)]
+            for employee, month in changed:
+                self._cells[employee, month] += 1
+                self._employees[employee] += 1
+                self._months[month] += 1
+            if changed:
+                self.total += 1
+            self._records = records
+            self._digests = digests
+            return changed
+
+    def stamp(self, employee=None, months=None):
+        """Hashable version of the data a result reads: one employee and/or some months, or everything."""
+        with self._lock:
+            if months is None:
+                return self._employees[employee] if employee else self.total
+            if employee:
+                return tuple(self._cells[employee, month] for month in months)
+            return tuple(self._months[month] for month in months)
+
+
+class ResultCache:
+    """Thread-safe LRU of encoded bodies under a byte budget, with hit/miss counters."""
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('BIOSYNC_RESULT_CACHE_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (stamp, body)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # misses on an entry whose data changed since
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, stamp):
+        """Cached body for ``key`` if it was computed at ``stamp``, else None (a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            if entry is not None:
+                self.stale += 1
+                self._drop(key)
+            return None
+
+    def put(self, key, stamp, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (stamp, body)
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        _stamp, body = self._entries.pop(key)
+        self.bytes -= len(body)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries), 'bytes': self.bytes, 'maxBytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'stale': self.stale, 'evictions': self.evictions,
+            }
+
+    def render_prometheus(self):
+        stats = self.stats()
+        return '\n'.join([
+            '# HELP biosync_result_cache_requests_total Report lookups answered from / missing the result cache.',
+            '# TYPE biosync_result_cache_requests_total counter',
+            f'biosync_result_cache_requests_total{{result="hit"}} {stats["hits"]}',
+            f'biosync_result_cache_requests_total{{result="miss"}} {stats["misses"]}',
+            '# HELP biosync_result_cache_stale_total Misses on an entry invalidated by new data.',
+            '# TYPE biosync_result_cache_stale_total counter',
+            f'biosync_result_cache_stale_total {stats["stale"]}',
+            '# HELP biosync_result_cache_evictions_total Entries evicted to stay under the memory cap.',
+            '# TYPE biosync_result_cache_evictions_total counter',
+            f'biosync_result_cache_evictions_total {stats["evictions"]}',
+            '# HELP biosync_result_cache_bytes Encoded bytes currently cached.',
+            '# TYPE biosync_result_cache_bytes gauge',
+            f'biosync_result_cache_bytes {stats["bytes"]}',
+            '# HELP biosync_result_cache_entries Results currently cached.',
+            '# TYPE biosync_result_cache_entries gauge',
+            f'biosync_result_cache_entries {stats["entries"]}',
+        ]) + '\n'
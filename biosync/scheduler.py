@@ -0,0 +1,370 @@
+"""
+Sync scheduler
+==============
+Runs the device pull and its sinks on a schedule, instead of someone
+running the scripts by hand:
+
+    python -m biosync.scheduler --daemon      # run forever (START.bat starts it)
+    python -m biosync.scheduler               # run every job once (cron / Task Scheduler)
+    python -m biosync.scheduler --plan        # the poll interval over a day
+    python -m biosync.scheduler --history     # per-job timing history
+
+data/scheduler.json (optional - without it only the pull runs):
+
+    {
+      "jobs": {
+        "pull":      {"command": ["-m", "biosync", "pull"]},
+        "firestore": {"command": ["-m", "biosync", "push-firestore"], "every": 900, "enabled": false},
+        "csv":       {"command": ["-m", "biosync", "export-csv"], "every": 3600, "enabled": false}
+      },
+      "peaks": [["06:00", "08:30"], ["16:00", "18:00"]],
+      "minInterval": 30, "maxInterval": 300, "targetBacklog": 1, "timeout": 600
+    }
+
+    command    arguments to the Python interpreter, run from the current directory
+    every      fixed period in seconds; without it the job polls adaptively
+
+Adaptive polling: the interval is what it takes for ``targetBacklog``
+punches to arrive, clamped to [minInterval, maxInterval]. The arrival rate
+per 15-minute slot of the day is learned from the last 14 days of
+data/punches.bin, and raised by the rate the last pull actually saw
+(its punch_log_appended count), so an unusual burst is followed too. The
+``peaks`` windows always poll at minInterval. A sleep never runs past the
+start of a busier slot. On the Attendance_2026-01/02 data that is 30 s
+from 05:45 (the real morning rush, before the configured peak) to 08:30
+and 16:00-18:00, 90 s until 18:15, and maxInterval the rest of the day.
+
+Jobs run one after another in one process, so two device sessions never
+overlap; a lock file (data/scheduler.lock) keeps a second scheduler out.
+A run that is late - the previous job ran long, the PC was asleep - is
+run once, and the ticks it replaces are counted as coalesced. Failures
+back off (interval doubled per consecutive failure, up to maxInterval).
+
+Every run is appended to data/scheduler_runs.jsonl (biosync.metrics.Run
+format: status, seconds, coalesced ticks, lateness, new punches, next interval).
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from biosync import serializer
+from biosync.leader import LeaderLock
+from biosync.metrics import RUNS_LOG_PATH, Run
+from biosync.punch_log import PUNCH_LOG_PATH, PunchLog
+
+SCHEDULER_PATH = os.path.join('data', 'scheduler.json')
+HISTORY_PATH = os.path.join('data', 'scheduler_runs.jsonl')
+LOCK_PATH = os.path.join('data', 'scheduler.lock')
+
+SLOT_MINUTES = 15
+SLOTS = 24 * 60 // SLOT_MINUTES
+HISTORY_DAYS = 14
+PROFILE_MAX_AGE = 3600  # seconds between re-reads of the punch log
+
+DEFAULT_CONFIG = {
+    'jobs': {'pull': {'command': ['-m', 'biosync', 'pull']}},
+    'peaks': [['06:00', '08:30'], ['16:00', '18:00']],
+    'minInterval': 30,
+    'maxInterval': 300,
+    'targetBacklog': 1,
+    'timeout': 600,
+}
+
+
+def load_config(path=SCHEDULER_PATH):
+    """data/scheduler.json over DEFAULT_CONFIG."""
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(path):
+        config.update(serializer.load(path))
+    return config
+
+
+def _minute(hhmm):
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def _minute_of_day(when):
+    return when.hour * 60 + when.minute + when.second / 60
+
+
+# ─── Arrival rate ──────────────────────────────────────────────────
+
+class ArrivalProfile:
+    """Punches per minute by time of day, in SLOT_MINUTES slots."""
+
+    def __init__(self, rates=None):
+        self.rates = list(rates) if rates is not None else [0.0] * SLOTS
+
+    @classmethod
+    def from_punch_log(cls, log, now=None, days=HISTORY_DAYS):
+        """Average over the days of the last ``days`` that have punches at all."""
+        now = now or datetime.now()
+        counts = [0] * SLOTS
+        seen_days = set()
+        for punch in log.range(now - timedelta(days=days), now):
+            ts = punch.timestamp
+            counts[(ts.hour * 60 + ts.minute) // SLOT_MINUTES] += 1
+            seen_days.add(ts.date())
+        if not seen_days:
+            return cls()
+        return cls(count / len(seen_days) / SLOT_MINUTES for count in counts)
+
+    def rate(self, when):
+        return self.rates[int(_minute_of_day(when)) // SLOT_MINUTES]
+
+
+class Policy:
+    """Poll interval at a given time: peaks, learned rate, live rate, backoff."""
+
+    def __init__(self, config, profile=None):
+        self.peaks = [(_minute(start), _minute(end)) for start, end in config['peaks']]
+        self.min_interval = float(config['minInterval'])
+        self.max_interval = float(config['maxInterval'])
+        self.target_backlog = float(config['targetBacklog'])
+        self.profile = profile or ArrivalProfile()
+
+    def in_peak(self, when):
+        minute = _minute_of_day(when)
+        return any(start <= minute < end for start, end in self.peaks)
+
+    def interval_at(self, when, live_rate=0.0):
+        if self.in_peak(when):
+            return self.min_interval
+        rate = max(self.profile.rate(when), live_rate)
+        if rate <= 0:
+            return self.max_interval
+        return min(max(self.target_backlog / rate * 60, self.min_interval), self.max_interval)
+
+    def delay(self, now, live_rate=0.0, failures=0):
+        """
+        Seconds until the next poll after ``now``. Woken early at the start
+        of a slot or peak that wants a shorter interval.
+        """
+        delay = self.interval_at(now, live_rate)
+        if failures:
+            return min(delay * 2 ** failures, max(self.max_interval, delay))
+        minute = _minute_of_day(now)
+        next_slot = (int(minute) // SLOT_MINUTES + 1) * SLOT_MINUTES
+        boundaries = list(range(next_slot, int(minute + delay / 60) + 1, SLOT_MINUTES))
+        boundaries += [start + (24 * 60 if start <= minute else 0) for start, _ in self.peaks]
+        for boundary in sorted(boundaries):
+            ahead = (boundary - minute) * 60
+            if ahead >= delay:
+                break
+            if self.interval_at(now + timedelta(seconds=ahead)) < delay:
+                return max(ahead, 1.0)
+        return delay
+
+
+# ─── Jobs ──────────────────────────────────────────────────────────
+
+class Job:
+    def __init__(self, name, command, every=None, timeout=None):
+        self.name = name
+        self.command = list(command)
+        self.every = every
+        self.timeout = timeout
+        self.next_due = 0.0          # time.time(); 0 = due now
+        self.last_interval = None
+        self.last_run_at = None
+        self.failures = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return [cls(name, spec['command'], spec.get('every'), spec.get('timeout', config['timeout']))
+                for name, spec in config['jobs'].items() if spec.get('enabled', True)]
+
+
+def _child_runs(path, offset):
+    """biosync.metrics lines the job's scripts appended to data/sync_runs.jsonl."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return [serializer.loads(line) for line in f.read().splitlines() if line.strip()]
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+class Scheduler:
+    def __init__(self, config, history_path=HISTORY_PATH, runs_log=RUNS_LOG_PATH,
+                 punch_log_path=PUNCH_LOG_PATH, echo=print):
+        self.config = config
+        self.jobs = Job.from_config(config)
+        self.history_path = history_path
+        self.runs_log = runs_log
+        self.punch_log_path = punch_log_path
+        self.echo = echo
+        self.policy = Policy(config)
+        self._profile_at = None
+
+    def refresh_profile(self, now=None):
+        now = now or time.time()
+        if self._profile_at is not None and now - self._profile_at < PROFILE_MAX_AGE:
+            return
+        self._profile_at = now
+        if os.path.exists(self.punch_log_path):
+            self.policy.profile = ArrivalProfile.from_punch_log(PunchLog(self.punch_log_path))
+
+    def run_job(self, job):
+        """Runs ``job`` now (blocking) and schedules its next run. Returns the history entry."""
+        started = time.time()
+        coalesced = 0
+        if job.last_interval and started > job.next_due:
+            coalesced = int((started - job.next_due) // job.last_interval)
+        late = max(started - job.next_due, 0.0) if job.next_due else 0.0
+
+        run = Run(job.name)
+        offset = _size(self.runs_log)
+        status = 'ok'
+        try:
+            result = subprocess.run([sys.executable, *job.command], timeout=job.timeout,
+                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    env={**os.environ, 'PYTHONIOENCODING': 'utf-8'})
+            if result.returncode != 0:
+                status = 'error'
+            output = result.stdout.decode('utf-8', 'replace')
+        except subprocess.TimeoutExpired as e:
+            status = 'timeout'
+            output = (e.stdout or b'').decode('utf-8', 'replace')
+        run.lap('run')
+
+        children = _child_runs(self.runs_log, offset)
+        if any(child.get('status') != 'ok' for child in children):
+            status = 'error'  # the sync scripts log device errors and still exit 0
+        new_punches = sum(child.get('counts', {}).get('punch_log_appended', 0) for child in children)
+
+        finished = time.time()
+        job.failures = job.failures + 1 if status != 'ok' else 0
+        if job.every:
+            interval = float(job.every)
+        else:
+            live_rate = 0.0
+            if job.last_run_at is not None and new_punches:
+                live_rate = new_punches / max((finished - job.last_run_at) / 60, 1e-6)
+            interval = self.policy.delay(datetime.fromtimestamp(finished), live_rate, job.failures)
+        job.last_run_at = started
+        job.last_interval = interval
+        job.next_due = finished + interval
+
+        run.count('coalesced', coalesced)
+        run.count('late_ms', int(late * 1000))
+        run.count('new_punches', new_punches)
+        run.count('next_interval_s', int(interval))
+        run.finish(status)
+        run.write_json_line(self.history_path)
+
+        self.echo(f"[{datetime.fromtimestamp(started):%H:%M:%S}] {job.name:<10} {status:<7} "
+                  f"{run.total:6.1f}s  +{new_punches} بصمة"
+                  + (f"  (دمج {coalesced} تشغيل فائت)" if coalesced else "")
+                  + f"  التالي بعد {interval:.0f}s")
+        if status != 'ok':
+            self.echo('    ' + '\n    '.join(output.strip().splitlines()[-5:]))
+        return run.as_dict()
+
+    def run_due(self):
+        """Runs every job that is due, in config order; returns their history entries."""
+        self.refresh_profile()
+        return [self.run_job(job) for job in self.jobs if job.next_due <= time.time()]
+
+    def seconds_to_next(self):
+        return max(min(job.next_due for job in self.jobs) - time.time(), 0.0) if self.jobs else None
+
+    def serve(self, stop=None):
+        """Runs until ``stop`` (a threading.Event) is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.run_due()
+            wait = self.seconds_to_next()
+            if wait is None:
+                return
+            stop.wait(wait)
+
+
+# ─── CLI ───────────────────────────────────────────────────────────
+
+def print_plan(policy):
+    """Poll interval through the day, one line per run of slots with the same interval."""
+    print(f"{'الوقت':<14}{'الفاصل (ث)':>12}{'بصمة/دقيقة':>14}")
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    slots = [day + timedelta(minutes=slot * SLOT_MINUTES) for slot in range(SLOTS)]
+    start = 0
+    for i in range(1, SLOTS + 1):
+        if i < SLOTS and policy.interval_at(slots[i]) == policy.interval_at(slots[start]):
+            continue
+        end = f"{slots[i]:%H:%M}" if i < SLOTS else '24:00'
+        peak_rate = max(policy.profile.rate(when) for when in slots[start:i])
+        print(f"{slots[start]:%H:%M}-{end}   {policy.interval_at(slots[start]):>8.0f}"
+              f"{peak_rate:>14.3f}" + ('  ذروة' if policy.in_peak(slots[start]) else ''))
+        start = i
+
+
+def print_history(path=HISTORY_PATH):
+    by_job = {}
+    for entry in _child_runs(path, 0):
+        by_job.setdefault(entry['run'], []).append(entry)
+    print(f"{'job':<12}{'runs':>6}{'ok%':>6}{'p50':>8}{'p95':>8}{'max':>8}{'coalesced':>11}  last")
+    for name, entries in by_job.items():
+        seconds = sorted(entry['totalSeconds'] for entry in entries)
+        ok = sum(1 for entry in entries if entry['status'] == 'ok')
+        p95 = seconds[min(int(len(seconds) * 0.95), len(seconds) - 1)]
+        coalesced = sum(entry['counts'].get('coalesced', 0) for entry in entries)
+        print(f"{name:<12}{len(entries):>6}{ok * 100 // len(entries):>5}%{statistics.median(seconds):>7.1f}s"
+              f"{p95:>7.1f}s{seconds[-1]:>7.1f}s{coalesced:>11}  {entries[-1]['startedAt'][:19]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scheduled device pulls with adaptive polling')
+    parser.add_argument('--daemon', action='store_true', help='run until interrupted')
+    parser.add_argument('--config', default=SCHEDULER_PATH)
+    parser.add_argument('--plan', action='store_true', help='print the poll interval over a day')
+    parser.add_argument('--history', action='store_true', help='print per-job timing history')
+    args = parser.parse_args(argv)
+
+    if args.history:
+        print_history()
+        return 0
+    scheduler = Scheduler(load_config(args.config))
+    if args.plan:
+        scheduler.refresh_profile()
+        print_plan(scheduler.policy)
+        return 0
+
+    os.makedirs(os.path.dirname(LOCK_PATH), exist_ok=True)
+    lock = LeaderLock(LOCK_PATH)
+    if not lock.try_acquire():
+        print(f"✗ مجدول آخر يعمل بالفعل ({LOCK_PATH})")
+        return 1
+    try:
+        if not args.daemon:
+            scheduler.run_due()
+            return 0
+        print("="*70)
+        print("المجدول يعمل: " + ', '.join(job.name for job in scheduler.jobs) + "  (Ctrl+C للإيقاف)")
+        print("="*70)
+        scheduler.serve()
+    except KeyboardInterrupt:
+        print("\n✓ تم إيقاف المجدول")
+    finally:
+        lock.release()
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+JSON serialization
+==================
+Every JSON file the syncs and exporters write, and every proxy response,
+goes through dumps()/loads() here. The fastest installed backend is used:
+
+    orjson   (pip install orjson)
+    msgspec  (pip install msgspec)
+    json     standard library fallback
+
+BIOSYNC_JSON=orjson|msgspec|json forces one (benchmarks, debugging).
+
+All backends produce the same document (UTF-8 bytes, non-ASCII kept as
+is, compact) and raise ValueError on invalid input. Pretty-printing
+(2-space indent, like the old files) is opt-in: BIOSYNC_JSON_PRETTY=1, or
+pretty=True per call.
+"""
+
+import codecs
+import json
+import os
+
+PRETTY = os.environ.get('BIOSYNC_JSON_PRETTY', '') not in ('', '0')
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+BACKEND = None
+
+
+def _pretty(pretty):
+    return PRETTY if pretty is None else pretty
+
+
+def _orjson():
+    import orjson
+
+    compact = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    indented = compact | orjson.OPT_INDENT_2
+
+    def dumps(obj, pretty=None):
+        return orjson.dumps(obj, option=indented if _pretty(pretty) else compact)
+
+    return dumps, orjson.loads
+
+
+def _msgspec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj, pretty=None):
+        data = encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if _pretty(pretty) else data
+
+    def loads(data):
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return dumps, loads
+
+
+def _stdlib():
+    def dumps(obj, pretty=None):
+        if _pretty(pretty):
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    return dumps, json.loads
+
+
+_FACTORIES = {'orjson': _orjson, 'msgspec': _msgspec, 'json': _stdlib}
+
+
+def use(name=None):
+    """
+    Switches the backend (None = the first installed one) and returns its
+    name. Raises ImportError if ``name`` is not installed.
+    """
+    global BACKEND, dumps, loads
+    if name and name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON backend '{name}', expected one of {BACKENDS}")
+    for candidate in (name,) if name else BACKENDS:
+        try:
+            dumps, loads = _FACTORIES[candidate]()
+        except ImportError:
+            if name:
+                raise
+            continue
+        BACKEND = candidate
+        return candidate
+
+
+def available():
+    """Installed backends, fastest first."""
+    found = []
+    for name in BACKENDS:
+        try:
+            _FACTORIES[name]()
+        except ImportError:
+            continue
+        found.append(name)
+    return found
+
+
+def load(path):
+    """Parses a JSON file (a UTF-8 BOM, as Excel writes it, is skipped)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return loads(data[len(codecs.BOM_UTF8):] if data.startswith(codecs.BOM_UTF8) else data)
+
+
+use(os.environ.get('BIOSYNC_JSON') or None)
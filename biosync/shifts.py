@@ -0,0 +1,281 @@
+"""
+Shift schedules
+===============
+Maps every punch to the shift instance it belongs to, so that night staff
+whose punches span midnight (22:00 -> 06:00) are grouped, classified and
+summarised per shift instead of per calendar day.
+
+data/shifts.json (optional - without it everyone works the default day shift):
+
+    {
+      "shifts": {
+        "day":     {"start": "08:00", "end": "16:00", "grace": 30, "cutoff": "15:00", "middle": "12:00"},
+        "night":   {"start": "22:00", "end": "06:00", "grace": 15},
+        "morning": {"start": "07:00", "end": "11:00"},
+        "evening": {"start": "17:00", "end": "21:00"}
+      },
+      "default": "day",
+      "groups": {
+        "guards": {"shifts": ["night"], "employees": ["12", "13"]}
+      },
+      "employees": {
+        "45": ["morning", "evening"]
+      }
+    }
+
+    start/end   clock times; end <= start means the shift crosses midnight
+    grace       minutes after start that still count as on time
+    cutoff      punches before this clock time are check-ins (default: middle
+                of the shift)
+    middle      the same for the punches between the first and the last of a
+                shift instance, which sync_smart.py classifies by time
+                (default: cutoff)
+    employees   per-employee shifts override group shifts; several shifts per
+                day = split shift
+
+Each employee's shift instances are laid out on a timeline and every
+instance owns the window from the middle of the gap before it to the middle
+of the gap after it. Those window starts form a sorted index: a punch is
+located by bisection, and a sorted stream of punches is assigned in one
+forward sweep (linear in punches + days).
+
+The default day shift (08:00-16:00, cutoff 15:00, middle 12:00) tiles the
+timeline at midnight, so it reproduces the old calendar-day grouping, the
+"before 15:00 = check-in" rule of sync_simple.py and the "middle punches
+before 12:00 = check-in" rule of sync_smart.py exactly. Other splits only
+come from data/shifts.json.
+"""
+
+import json
+import os
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+SHIFTS_PATH = os.path.join('data', 'shifts.json')
+
+_DAY = 86400
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _clock(hhmm):
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 3600 + int(minutes) * 60
+
+
+def epoch_seconds(timestamp):
+    """Naive wall-clock datetime -> int seconds (same scale as numpy datetime64[s])."""
+    delta = timestamp - _EPOCH
+    return delta.days * _DAY + delta.seconds
+
+
+class Shift(NamedTuple):
+    name: str
+    start: str
+    end: str
+    grace: int = 0
+    cutoff: str = None
+    middle: str = None
+
+    @property
+    def cross_midnight(self):
+        return _clock(self.end) <= _clock(self.start)
+
+    @property
+    def start_offset(self):
+        """Seconds from the shift's calendar date to its start."""
+        return _clock(self.start)
+
+    @property
+    def duration(self):
+        return (_clock(self.end) - _clock(self.start)) % _DAY or _DAY
+
+    @property
+    def cutoff_offset(self):
+        """Seconds from shift start; punches before it are check-ins."""
+        if self.cutoff is None:
+            return self.duration // 2
+        return (_clock(self.cutoff) - _clock(self.start)) % _DAY
+
+    @property
+    def middle_offset(self):
+        """Seconds from shift start; middle punches (first/last rule) before it are check-ins."""
+        if self.middle is None:
+            return self.cutoff_offset
+        return (_clock(self.middle) - _clock(self.start)) % _DAY
+
+
+DEFAULT_SHIFT = Shift('day', '08:00', '16:00', grace=30, cutoff='15:00', middle='12:00')
+
+
+class ShiftInstance(NamedTuple):
+    """One occurrence of a shift; ``start``/``end`` are epoch seconds."""
+    shift: Shift
+    date: date
+    start: int
+    end: int
+
+    @property
+    def key(self):
+        return f"{self.date.isoformat()}_{self.shift.name}"
+
+    @property
+    def month(self):
+        return self.date.strftime('%Y-%m')
+
+    @property
+    def late_after(self):
+        return self.start + self.shift.grace * 60
+
+    @property
+    def cutoff(self):
+        return self.start + self.shift.cutoff_offset
+
+    @property
+    def middle_cutoff(self):
+        return self.start + self.shift.middle_offset
+
+
+class ShiftIndex:
+    """
+    Shift instances of one employee between two dates, with the sorted
+    window starts used to locate punches.
+    """
+
+    def __init__(self, shifts, first_day, last_day):
+        # One day of margin on both sides: a 22:00 shift owns punches of the next morning
+        epoch_day = (first_day - _EPOCH.date()).days - 1
+        last_epoch_day = (last_day - _EPOCH.date()).days + 1
+        layout = [(shift, shift.start_offset, shift.duration) for shift in shifts]
+        instances = []
+        day = first_day - timedelta(days=1)
+        for day_number in range(epoch_day, last_epoch_day + 1):
+            base = day_number * _DAY
+            for shift, offset, duration in layout:
+                start = base + offset
+                instances.append(ShiftInstance(shift, day, start, start + duration))
+            day += timedelta(days=1)
+        instances.sort(key=lambda instance: instance.start)
+
+        self.instances = instances
+        self.window_starts = [instances[0].start - _DAY] + [
+            (prev.end + cur.start) // 2 for prev, cur in zip(instances, instances[1:])
+        ]
+
+    def locate(self, seconds):
+        """Instance owning a punch at ``seconds`` (epoch seconds), by bisection."""
+        return self.instances[bisect_right(self.window_starts, seconds) - 1]
+
+    def assign_sorted(self, seconds_list):
+        """Instance of each punch in an already sorted stream, in one forward sweep."""
+        if not seconds_list:
+            return []
+        starts = self.window_starts
+        last = len(starts) - 1
+        i = bisect_right(starts, seconds_list[0]) - 1
+        out = []
+        for seconds in seconds_list:
+            while i < last and starts[i + 1] <= seconds:
+                i += 1
+            out.append(self.instances[i])
+        return out
+
+
+class ShiftSchedule:
+    def __init__(self, shifts=None, default=DEFAULT_SHIFT.name, employees=None):
+        self.shifts = dict(shifts or {DEFAULT_SHIFT.name: DEFAULT_SHIFT})
+        if default not in self.shifts:
+            raise ValueError(f"Unknown default shift '{default}'")
+        self.default = (self.shifts[default],)
+        self.employees = {}
+        for user_id, names in (employees or {}).items():
+            unknown = [name for name in names if name not in self.shifts]
+            if unknown:
+                raise ValueError(f"Employee {user_id}: unknown shift(s) {unknown}")
+            self.employees[str(user_id)] = tuple(self.shifts[name] for name in names)
+
+    @classmethod
+    def from_dict(cls, config):
+        shifts = {
+            name: Shift(name, spec['start'], spec['end'], int(spec.get('grace', 0)), spec.get('cutoff'),
+                        spec.get('middle'))
+            for name, spec in config.get('shifts', {}).items()
+        }
+        shifts.setdefault(DEFAULT_SHIFT.name, DEFAULT_SHIFT)
+
+        employees = {}
+        for group in config.get('groups', {}).values():
+            for user_id in group.get('employees', []):
+                employees[str(user_id)] = group['shifts']
+        for user_id, names in config.get('employees', {}).items():
+            employees[str(user_id)] = [names] if isinstance(names, str) else names
+
+        return cls(shifts, config.get('default', DEFAULT_SHIFT.name), employees)
+
+    @classmethod
+    def load(cls, path=SHIFTS_PATH):
+        """data/shifts.json, or the default day shift for everyone if there is none."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def shifts_for(self, user_id):
+        return self.employees.get(str(user_id), self.default)
+
+
+# ─── Pipeline stages ───────────────────────────────────────────────
+
+def assign_shifts(punches, schedule):
+    """
+    Groups punches by employee and shift instance:
+        {user_id: [(ShiftInstance, [Punch, ...]), ...]}
+    Instances and the punches inside them are in time order.
+    """
+    by_user = defaultdict(list)
+    for punch in punches:
+        by_user[punch.user_id].append(punch)
+    if not by_user:
+        return {}
+    for user_punches in by_user.values():
+        user_punches.sort(key=lambda p: p.timestamp)  # ~linear: device logs are almost sorted
+
+    # One index per shift pattern over the whole range, shared by its employees
+    first = min(user_punches[0].timestamp for user_punches in by_user.values())
+    last = max(user_punches[-1].timestamp for user_punches in by_user.values())
+    indexes = {}
+
+    grouped = {}
+    for user_id, user_punches in by_user.items():
+        shifts = schedule.shifts_for(user_id)
+        if shifts not in indexes:
+            indexes[shifts] = ShiftIndex(shifts, first.date(), last.date())
+        instances = indexes[shifts].assign_sorted([epoch_seconds(p.timestamp) for p in user_punches])
+
+        groups = []
+        for instance, punch in zip(instances, user_punches):
+            if not groups or groups[-1][0] is not instance:
+                groups.append((instance, []))
+            groups[-1][1].append(punch)
+        grouped[user_id] = groups
+    return grouped
+
+
+def classify_by_cutoff(punch, instance):
+    """Before the shift's cutoff = check-in, after = check-out."""
+    return 'check-in' if epoch_seconds(punch.timestamp) < instance.cutoff else 'check-out'
+
+
+def classify_first_last(punches, instance):
+    """
+    First punch of the shift = check-in, last = check-out (if there is more
+    than one), punches in between by the shift's middle cutoff. ``punches``
+    must be sorted.
+    """
+    middle = instance.middle_cutoff
+    types = ['check-in' if epoch_seconds(punch.timestamp) < middle else 'check-out' for punch in punches]
+    types[0] = 'check-in'
+    if len(punches) > 1:
+        types[-1] = 'check-out'
+    return types
@@ -0,0 +1,151 @@
+"""
+Shared snapshot store (SQLite)
+==============================
+Lets several proxy worker processes share one device session:
+
+- any worker asks for a sync with ``request_sync()``
+- the device-owner worker (see leader.py) pulls once for all pending
+  requests and ``publish()``es the result
+- every worker serves reads from ``latest()`` (decoded once per version
+  and cached in-process) and waits for its own request with ``wait_for()``
+
+The database runs in WAL mode so readers never block the writer.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from biosync import serializer
+
+KEEP_SNAPSHOTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    requested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    covers_request INTEGER NOT NULL,
+    ok INTEGER NOT NULL,
+    error TEXT,
+    timestamp TEXT,
+    employees TEXT,
+    records TEXT
+);
+"""
+
+
+class SnapshotStore:
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._local = threading.local()
+        self._cached = (None, None)  # (snapshot id, decoded snapshot)
+        with self._db() as db:
+            db.executescript(SCHEMA)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    # ─── Requests ──────────────────────────────────────────────────
+
+    def request_sync(self):
+        """Queues a sync request; returns its id."""
+        with self._db() as db:
+            cursor = db.execute('INSERT INTO sync_requests (requested_at) VALUES (?)', (time.time(),))
+            return cursor.lastrowid
+
+    def pending_request(self):
+        """Highest request id not yet covered by a published result (None if nothing pending)."""
+        row = self._db().execute(
+            'SELECT MAX(id) FROM sync_requests WHERE id > '
+            '(SELECT COALESCE(MAX(covers_request), 0) FROM snapshots)'
+        ).fetchone()
+        return row[0]
+
+    # ─── Results ───────────────────────────────────────────────────
+
+    def publish(self, covers_request, employees, records, timestamp):
+        return self._insert(covers_request, True, None, timestamp, employees, records)
+
+    def publish_error(self, covers_request, error):
+        return self._insert(covers_request, False, error, None, None, None)
+
+    def _insert(self, covers_request, ok, error, timestamp, employees, records):
+        with self._db() as db:
+            cursor = db.execute(
+                'INSERT INTO snapshots (created_at, covers_request, ok, error, timestamp, employees, records) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (time.time(), covers_request, int(ok), error, timestamp,
+                 None if employees is None else serializer.dumps(employees, pretty=False),
+                 None if records is None else serializer.dumps(records, pretty=False))
+            )
+            snapshot_id = cursor.lastrowid
+            # Keep a few recent results (and always the latest good one)
+            db.execute(
+                'DELETE FROM snapshots WHERE id <= ? '
+                'AND id != (SELECT COALESCE(MAX(id), 0) FROM snapshots WHERE ok = 1)',
+                (snapshot_id - KEEP_SNAPSHOTS,)
+            )
+            db.execute('DELETE FROM sync_requests WHERE id <= ?', (covers_request,))
+        return snapshot_id
+
+    def latest(self):
+        """Latest successful snapshot as a dict, or None. Decoded once per version."""
+        row = self._db().execute('SELECT MAX(id) FROM snapshots WHERE ok = 1').fetchone()
+        snapshot_id = row[0]
+        if snapshot_id is None:
+            return None
+        cached_id, cached = self._cached
+        if cached_id == snapshot_id:
+            return cached
+        snapshot = self._load(snapshot_id)
+        if snapshot is not None:
+            self._cached = (snapshot_id, snapshot)
+        return snapshot
+
+    def _load(self, snapshot_id):
+        row = self._db().execute(
+            'SELECT id, ok, error, timestamp, employees, records FROM snapshots WHERE id = ?',
+            (snapshot_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'version': row[0],
+            'ok': bool(row[1]),
+            'error': row[2],
+            'timestamp': row[3],
+            'employees': serializer.loads(row[4]) if row[4] is not None else [],
+            'records': serializer.loads(row[5]) if row[5] is not None else [],
+        }
+
+    def wait_for(self, request_id, timeout=120.0, poll_interval=0.1):
+        """Blocks until a result covering ``request_id`` is published; None on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            row = self._db().execute(
+                'SELECT id, ok FROM snapshots WHERE covers_request >= ? ORDER BY id LIMIT 1',
+                (request_id,)
+            ).fetchone()
+            if row is not None:
+                if row[1]:
+                    latest = self.latest()
+                    if latest is not None and latest['version'] >= row[0]:
+                        return latest
+                return self._load(row[0])
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
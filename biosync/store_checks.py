@@ -0,0 +1,345 @@
+"""
+Store checks
+============
+End-to-end scenarios for the local stores, run against an in-memory device
+in a scratch directory (the working directory is switched to it, so the
+real data/ is never touched). Each check prints PASS or FAIL; the exit code
+is 1 when one failed.
+
+    backfill_survives_sync    imported months are still there after a pull
+                              whose device only holds later months
+                              (flat and sharded)
+    import_keeps_layout       importing into a sharded employee writes
+                              shards, not a flat file the store ignores
+    imported_history_sealed   closed months an import writes are sealed, and
+                              stay due for Firestore until marked pushed
+    import_own_archive        an import into another --data-dir seals into its
+                              --archive-dir, not the working directory's
+    punch_log_backfill        punches older than the log's tail are merged,
+                              not dropped
+    punch_log_torn_tail       an append after a crash mid-record stays aligned
+    punch_log_writers         concurrent writer processes neither duplicate
+                              nor lose punches
+    renamed_employee          after a rename leaves two flat files, every
+                              reader takes the newest one
+
+    python -m biosync.store_checks
+    python -m biosync.store_checks --check backfill_survives_sync
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from biosync.archive import load_index, mark_pushed, punches as archive_punches, read_month, unpushed_months
+from biosync.employee_store import (DATA_DIR, load_employees, month_checksums, new_employee, open_employee,
+                                    save_employee)
+from biosync.punch_log import PUNCH_LOG_PATH, RECORD, PunchLog
+from biosync.punches import Punch
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+class ScratchDevice:
+    """ZK-like device holding ``punches`` [(user_id, datetime, status, punch)]; connect() returns itself."""
+
+    def __init__(self, punches, names):
+        self.punches = punches
+        self.names = names
+        self.users = len(names)
+        self.fingers = self.cards = self.faces = 0
+
+    def connect(self):
+        return self
+
+    def read_sizes(self):
+        return True
+
+    def get_users(self):
+        return [SimpleNamespace(user_id=user_id, name=name) for user_id, name in self.names.items()]
+
+    def get_attendance(self):
+        return [SimpleNamespace(user_id=user_id, timestamp=ts, status=status, punch=punch)
+                for user_id, ts, status, punch in self.punches]
+
+    def enable_device(self):
+        return True
+
+    def disconnect(self):
+        return True
+
+
+@contextlib.contextmanager
+def scratch():
+    """Runs the block inside an empty temporary working directory."""
+    cwd = os.getcwd()
+    path = tempfile.mkdtemp(prefix='biosync_check_')
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def workdays(month_start, days, users):
+    """In at 07:00 and out at 16:00 for ``users`` on the first ``days`` days of the month."""
+    punches = []
+    for day in range(days):
+        base = month_start + timedelta(days=day)
+        for user_id in users:
+            punches.append((user_id, base.replace(hour=7), 15, 0))
+            punches.append((user_id, base.replace(hour=16), 1, 1))
+    return punches
+
+
+def write_export(path, punches, names):
+    """Attendance_<month>.csv as py.py writes it."""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['رقم الموظف', 'الاسم', 'الوقت والتاريخ', 'الحالة'])
+        for user_id, ts, status, _punch in punches:
+            writer.writerow([user_id, names[user_id], ts.strftime('%Y-%m-%d %H:%M:%S'), status])
+
+
+def stored_records(user_id, month):
+    """The employee's records of ``month``, from the store or the sealed archive."""
+    if month in load_index():
+        return read_month(month).get(user_id, [])
+    data = open_employee(user_id)
+    return list(data['attendance'].get(month, [])) if data else []
+
+
+def _quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+# ─── Checks ────────────────────────────────────────────────────────
+
+def check_backfill_survives_sync():
+    from biosync.importer import import_files
+    from biosync.local_sync import sync
+
+    names = {'1': 'Anwar', '2': 'Robi'}
+    old, new = datetime(2026, 9, 1), datetime(2026, 10, 1)
+    for layout in ('flat', 'sharded'):
+        with scratch():
+            write_export('Attendance_2026-09.csv', workdays(old, 5, names), names)
+            stats = _quiet(import_files, ['Attendance_2026-09.csv'], layout=layout)
+            expect(stats['imported'] == 20, f"{layout}: imported {stats['imported']} of 20 punches")
+
+            device = ScratchDevice(workdays(new, 3, names), names)
+            status = _quiet(sync, None, None, datetime(2025, 12, 1), layout=layout, device=device)
+            expect(status == 0, f"{layout}: sync failed")
+            for user_id in names:
+                expect(len(stored_records(user_id, '2026-09')) == 10,
+                       f"{layout}: employee {user_id} lost imported 2026-09 "
+                       f"({len(stored_records(user_id, '2026-09'))} of 10 records left)")
+                expect(len(stored_records(user_id, '2026-10')) == 6,
+                       f"{layout}: employee {user_id} has {len(stored_records(user_id, '2026-10'))} "
+                       f"2026-10 records, expected 6")
+
+
+def check_import_keeps_layout():
+    from biosync.importer import import_files
+    from biosync.local_sync import sync
+
+    names = {'1': 'Anwar'}
+    with scratch():
+        _quiet(sync, None, None, datetime(2025, 12, 1), layout='sharded',
+               device=ScratchDevice(workdays(datetime(2026, 10, 1), 3, names), names))
+        write_export('Attendance_2026-08.csv', workdays(datetime(2026, 8, 1), 2, names), names)
+        _quiet(import_files, ['Attendance_2026-08.csv'])  # default layout: flat
+
+        flat_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.json')]
+        expect(not flat_files, f"import wrote flat files next to the shards: {flat_files}")
+        months = load_employees()['1']['attendance']
+        expect(len(months.get('2026-08', [])) == 4 or '2026-08' in load_index(),
+               f"imported 2026-08 is not readable ({len(months.get('2026-08', []))} of 4 records)")
+
+
+def _months_ago(n):
+    month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(n):
+        month = (month - timedelta(days=1)).replace(day=1)
+    return month
+
+
+def check_imported_history_sealed():
+    from biosync.importer import import_files
+
+    names = {'1': 'Anwar', '2': 'Robi'}
+    older, old = _months_ago(4), _months_ago(3)
+    months = [older.strftime('%Y-%m'), old.strftime('%Y-%m')]
+    with scratch():
+        # the newer month is imported (and sealed) first, the older one later
+        write_export('new.csv', workdays(old, 3, names), names)
+        write_export('old.csv', workdays(older, 2, names), names)
+        stats = _quiet(import_files, ['new.csv'])
+        expect(stats['sealedMonths'] == months[1:], f"import sealed {stats['sealedMonths']}, expected {months[1:]}")
+        expect(unpushed_months('firestore') == months[1:],
+               f"firestore is due {unpushed_months('firestore')}, expected {months[1:]}")
+        mark_pushed('firestore', months[1:])
+
+        _quiet(import_files, ['old.csv'])
+        expect(sorted(load_index()) == months, f"sealed months {sorted(load_index())}, expected {months}")
+        expect(unpushed_months('firestore') == months[:1],
+               f"after sealing an older month firestore is due {unpushed_months('firestore')}, "
+               f"expected {months[:1]}")
+        pending = list(archive_punches(months=set(unpushed_months('firestore'))))
+        expect(len(pending) == 8, f"the archive yields {len(pending)} punches of {months[0]}, expected 8")
+        mark_pushed('firestore', months[:1])
+        expect(unpushed_months('firestore') == [], f"firestore still due {unpushed_months('firestore')}")
+
+
+def check_import_own_archive():
+    from biosync.importer import main as import_main
+
+    names = {'1': 'Anwar'}
+    with scratch():
+        write_export('old.csv', workdays(_months_ago(3), 2, names), names)
+        status = _quiet(import_main, ['old.csv', '--jobs', '1', '--data-dir', os.path.join('other', 'employees'),
+                                      '--archive-dir', os.path.join('other', 'archive')])
+        expect(status == 0, "import failed")
+        expect(not os.path.exists(os.path.join('data', 'archive')), "the import sealed into ./data/archive")
+        sealed = load_index(os.path.join('other', 'archive'))
+        expect(list(sealed) == [_months_ago(3).strftime('%Y-%m')], f"--archive-dir holds {list(sealed)}")
+
+
+def _log_punches(month_start, days, users):
+    return [Punch(user_id, ts, status, punch_state=state)
+            for user_id, ts, status, state in sorted(workdays(month_start, days, users), key=lambda p: p[1])]
+
+
+def _keys(punches):
+    return [(p.user_id, p.timestamp) for p in punches]
+
+
+def check_punch_log_backfill():
+    users = ['1', '2']
+    recent, history = _log_punches(datetime(2026, 1, 1), 3, users), _log_punches(datetime(2025, 12, 1), 3, users)
+    with scratch():
+        log = PunchLog()
+        log.append(recent)  # e.g. the proxy (2026-only window) creates the log
+        written = log.append(history + recent)  # a sync with the 2025-12 window
+        expect(written == len(history), f"append wrote {written} punches, expected {len(history)}")
+        stored = _keys(log.range())
+        expect(stored == sorted(_keys(history + recent), key=lambda k: k[1]) and len(stored) == len(set(stored)),
+               f"log holds {len(stored)} punches, expected {len(history) + len(recent)} in time order")
+
+
+def check_punch_log_torn_tail():
+    users = ['1', '2']
+    first, second = _log_punches(datetime(2026, 1, 1), 2, users), _log_punches(datetime(2026, 1, 3), 2, users)
+    with scratch():
+        log = PunchLog()
+        log.append(first)
+        with open(PUNCH_LOG_PATH, 'ab') as f:
+            f.write(b'\x01' * (RECORD.size // 2))  # writer killed mid-record
+        log.append(second)
+        stored = _keys(log.range())
+        expect(stored == _keys(first + second), f"after a torn record the log reads {len(stored)} punches "
+                                                f"({stored[len(first):len(first) + 2]} ...), expected {len(first + second)}")
+
+
+def _append_batch(args):
+    cwd, start_day = args
+    os.chdir(cwd)
+    users = [str(i) for i in range(1, 21)]
+    for day in range(start_day, start_day + 6):
+        PunchLog().append(_log_punches(datetime(2026, 1, 1) + timedelta(days=day), 1, users))
+
+
+def check_punch_log_writers():
+    users = [str(i) for i in range(1, 21)]
+    expected = _log_punches(datetime(2026, 1, 1), 9, users)
+    with scratch() as cwd:
+        # four writers, overlapping days, interleaved appends
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(_append_batch, [(cwd, start) for start in (0, 1, 2, 3)]))
+        stored = _keys(PunchLog().range())
+        expect(len(stored) == len(set(stored)), f"{len(stored) - len(set(stored))} duplicated punches")
+        expect(sorted(stored, key=lambda k: k[1]) == stored, "log is not time-sorted")
+        expect(set(stored) == set(_keys(expected)),
+               f"log holds {len(set(stored))} distinct punches, expected {len(expected)}")
+
+
+def check_renamed_employee():
+    from biosync.punches import make_record
+
+    users = [str(i) for i in range(1, 9)]
+    with scratch():
+        os.makedirs(DATA_DIR)
+        for i, user_id in enumerate(users):
+            stale, current = new_employee(user_id, f"Old Name {user_id}"), new_employee(user_id, f"New {user_id}")
+            stale['attendance']['2026-01'] = [make_record(Punch(user_id, datetime(2026, 1, 5, 7), 15), 'check-in')]
+            current['attendance']['2026-01'] = [make_record(Punch(user_id, datetime(2026, 1, 5, 7), 15), 'check-in'),
+                                                make_record(Punch(user_id, datetime(2026, 1, 5, 16), 1), 'check-out')]
+            # creation order alternates, so directory order cannot be what picks the file
+            order = [(stale, 1_000_000), (current, 2_000_000)]
+            for data, mtime in (order if i % 2 else order[::-1]):
+                save_employee(data, layout='flat')
+                path = os.path.join(DATA_DIR, f"emp_{user_id}_{data['profile']['name'].replace(' ', '_')}.json")
+                os.utime(path, (mtime, mtime))
+
+        employees = load_employees()
+        checksums = month_checksums()
+        for user_id in users:
+            expect(employees[user_id]['profile']['name'] == f"New {user_id}",
+                   f"load_employees() read {employees[user_id]['profile']['name']!r} for employee {user_id}")
+            expect(checksums[(user_id, '2026-01')][0] == 2,
+                   f"month_checksums() counted the stale file of employee {user_id}")
+            expect(open_employee(user_id)['profile']['name'] == f"New {user_id}",
+                   f"open_employee() read a stale file for employee {user_id}")
+
+
+CHECKS = {
+    'backfill_survives_sync': check_backfill_survives_sync,
+    'import_keeps_layout': check_import_keeps_layout,
+    'imported_history_sealed': check_imported_history_sealed,
+    'import_own_archive': check_import_own_archive,
+    'punch_log_backfill': check_punch_log_backfill,
+    'punch_log_torn_tail': check_punch_log_torn_tail,
+    'punch_log_writers': check_punch_log_writers,
+    'renamed_employee': check_renamed_employee,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='End-to-end store checks in a scratch directory')
+    parser.add_argument('--check', action='append', choices=list(CHECKS), help='repeatable (default: all)')
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for name in args.check or CHECKS:
+        try:
+            CHECKS[name]()
+        except CheckFailed as e:
+            failed += 1
+            print(f"FAIL {name}: {e}")
+        except Exception as e:  # the scenario itself broke (e.g. a corrupted store)
+            failed += 1
+            print(f"FAIL {name}: {type(e).__name__}: {e}")
+        else:
+            print(f"PASS {name}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
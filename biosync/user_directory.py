@@ -0,0 +1,126 @@
+"""
+User directory cache
+====================
+The roster on the device changes rarely, but every sync used to call
+``conn.get_users()`` (a full user-table transfer) just to map IDs to names.
+
+UserDirectory keeps the roster on disk and only reloads it when the device's
+cheap size counters (users / fingers / cards / faces, read with
+``read_sizes()``) change, or when the cache is older than ``max_age``
+(renames do not change any counter).
+
+Usage:
+    directory = UserDirectory()
+    directory.refresh(conn)             # reloads only when needed
+    name = directory.get(log.user_id, 'Unknown')
+"""
+
+import os
+import time
+
+from biosync import serializer
+
+DEFAULT_CACHE_PATH = os.path.join('data', 'user_directory.json')
+DEFAULT_MAX_AGE = 24 * 60 * 60  # seconds
+
+
+def device_fingerprint(conn):
+    """Cheap roster fingerprint from the device's size counters (no user transfer)."""
+    conn.read_sizes()
+    return [conn.users, conn.fingers, conn.cards, getattr(conn, 'faces', 0)]
+
+
+class UserDirectory:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.fingerprint = None
+        self.loaded_at = 0.0
+        self._names = {}
+        self._employees = []
+        self._load()
+
+    # ─── Lookups (O(1)) ────────────────────────────────────────────
+
+    def get(self, user_id, default=None):
+        """Resolve a device user ID (int or str) to its name."""
+        return self._names.get(str(user_id), default)
+
+    def __contains__(self, user_id):
+        return str(user_id) in self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    def employees(self):
+        """Employee list in the format the frontend expects (prebuilt, shared)."""
+        return self._employees
+
+    # ─── Refresh ───────────────────────────────────────────────────
+
+    def is_stale(self, fingerprint):
+        return (
+            not self._names
+            or fingerprint != self.fingerprint
+            or time.time() - self.loaded_at > self.max_age
+        )
+
+    def refresh(self, conn, force=False):
+        """
+        Reload users from the device only if the roster looks changed.
+        Returns True when a full get_users() transfer was done.
+        """
+        try:
+            fingerprint = device_fingerprint(conn)
+        except Exception:
+            fingerprint = None
+        if not force and fingerprint is not None and not self.is_stale(fingerprint):
+            return False
+
+        users = conn.get_users()
+        self.update([(u.user_id, u.name) for u in users], fingerprint)
+        return True
+
+    def update(self, users, fingerprint=None):
+        """Replace the roster with ``(user_id, name)`` pairs and persist it."""
+        names = {str(user_id): name for user_id, name in users}
+        self._employees = [self._format_employee(user_id, name) for user_id, name in names.items()]
+        self._names = names
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        self._save()
+
+    @staticmethod
+    def _format_employee(user_id, name):
+        return {
+            'id': user_id,
+            'name': name if name else f"User {user_id}",
+            'department': 'Not Specified',
+            'position': 'Staff'
+        }
+
+    # ─── Persistence ───────────────────────────────────────────────
+
+    def _load(self):
+        try:
+            cached = serializer.load(self.path)
+        except (OSError, ValueError):
+            return
+        names = cached.get('users', {})
+        self._employees = [self._format_employee(user_id, name) for user_id, name in names.items()]
+        self._names = names
+        self.fingerprint = cached.get('fingerprint')
+        self.loaded_at = cached.get('loadedAt', 0.0)
+
+    def _save(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(serializer.dumps({
+                'fingerprint': self.fingerprint,
+                'loadedAt': self.loaded_at,
+                'users': self._names
+            }))
+        os.replace(tmp_path, self.path)
@@ -1,26 +1,13 @@
 # -*- coding: utf-8 -*-
-import json
-import sys
-
-if sys.platform == 'win32':
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
-# قراءة ملف موظف واحد
-with open('data/employees/emp_1_Anwar_hussain.json', encoding='utf-8') as f:
-    data = json.load(f)
+"""
+فحص سجلات موظف واحد لشهر واحد (الافتراضي: الموظف 1، ديسمبر 2025)
+=================================================================
+نفس الأمر: python -m biosync inspect [--employee 1] [--month 2025-12]   (biosync.reports)
+"""
 
-# فحص ديسمبر 2025
-records = data['attendance']['2025-12']
-
-checkins = [r for r in records if r['type'] == 'check-in']
-checkouts = [r for r in records if r['type'] == 'check-out']
+import sys
 
-print(f"إجمالي السجلات: {len(records)}")
-print(f"Check-ins (دخول): {len(checkins)}")
-print(f"Check-outs (خروج): {len(checkouts)}")
-print("\nأول 10 سجلات خروج:")
-print("-" * 60)
+from biosync.cli import main
 
-for r in checkouts[:10]:
-    print(f"{r['date']} {r['time']} - Status Code: {r['statusCode']}")
+if __name__ == '__main__':
+    sys.exit(main(['inspect'] + sys.argv[1:]))